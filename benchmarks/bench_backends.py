@@ -0,0 +1,116 @@
+# benchmarks/bench_backends.py
+# Phase 2 DataFrame backends (src/backends.py): pandas vs. polars. The
+# backends differ in the row selection only (job ID dedup, title and
+# salary filters), so that is what is timed, at full size, on just the
+# columns it reads. Parity is checked on the edge cases of the row filters,
+# on the mask of every size, and on the whole clean frame of a synthetic
+# raw file (the steps after the selection are shared, so a smaller file is
+# enough).
+#
+#   uv sync --extra polars
+#   uv run python -m benchmarks.bench_backends --rows 1000000 10000000
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.backends import BACKENDS, SALARY_COLS, row_mask
+from src.config import JOB_ID_COL
+from src.data_cleaning import clean_and_transform
+from src.data_ingestion import load_raw_data, parse_categories_column
+from src.synthetic import write_raw_csv
+
+
+def check_edge_cases() -> None:
+    """Duplicate IDs whose first posting is filtered out, missing IDs, titles and salaries."""
+    df = pd.DataFrame(
+        {
+            JOB_ID_COL: pd.array(["a", "a", "b", "c", "c", None, None, "d", "e"], dtype="string"),
+            "title": pd.array([None, "x", "y", "z", "w", "n", "m", "q", "r"], dtype="string"),
+            "salary_minimum": pd.array([1, 1, 0, 5, 5, 1, 1, None, 2], dtype="Int64"),
+            "salary_maximum": pd.array([1, 1, 3, 5, 5, 1, 1, 4, 2], dtype="Int64"),
+        }
+    )
+    expected = np.array([False, False, False, True, False, True, False, False, True])
+    for backend in BACKENDS:
+        np.testing.assert_array_equal(row_mask(df, backend), expected, err_msg=backend)
+        np.testing.assert_array_equal(
+            row_mask(df[["title"]], backend), df["title"].notna().to_numpy(), err_msg=backend
+        )
+
+
+def selection_columns(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    The columns the row selection reads, with the dtypes Phase 1 gives
+    them: ~2% repeated job IDs, ~1% missing titles and ~2% missing or
+    non-positive salaries.
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n_rows)
+    repeated = rng.random(n_rows) < 0.02
+    ids[repeated] = rng.integers(0, n_rows, repeated.sum())
+    titles = rng.integers(0, 5_000, n_rows).astype(str).astype(object)
+    titles[rng.random(n_rows) < 0.01] = None
+    df = pd.DataFrame(
+        {
+            JOB_ID_COL: pd.array(np.char.add("MCF-", ids.astype(str)), dtype="string[pyarrow]"),
+            "title": pd.array(titles, dtype="string[pyarrow]"),
+        }
+    )
+    for col in SALARY_COLS:
+        salary = pd.array(rng.integers(1_000, 20_000, n_rows), dtype="Int64")
+        salary[rng.random(n_rows) < 0.01] = 0
+        salary[rng.random(n_rows) < 0.01] = pd.NA
+        df[col] = salary
+    return df
+
+
+def timed(fn, *args, repeats: int = 1, **kwargs):
+    """Result and best wall time of `repeats` calls."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def check_clean_frames(n_rows: int) -> None:
+    """The whole Phase 2 output of each backend on a synthetic raw file."""
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = write_raw_csv(Path(tmp) / "SGJobData.csv", n_rows)
+        structured = parse_categories_column(load_raw_data(raw_path))
+    expected = clean_and_transform(structured.copy())
+    for backend in BACKENDS:
+        clean = clean_and_transform(structured.copy(), backend=backend)
+        pd.testing.assert_frame_equal(clean, expected, obj=f"{backend} clean frame")
+    print(f"{n_rows:,} raw rows -> {len(expected):,} clean rows: identical clean frames on all backends")
+
+
+def main(sizes, clean_rows: int, repeats: int = 3) -> None:
+    check_edge_cases()
+    print("Row filter edge cases: identical on all backends")
+    check_clean_frames(clean_rows)
+
+    for n_rows in sizes:
+        df = selection_columns(n_rows)
+        masks = {backend: timed(row_mask, df, backend, repeats=repeats) for backend in BACKENDS}
+        expected = masks["pandas"][0]
+        for backend, (mask, _) in masks.items():
+            np.testing.assert_array_equal(mask, expected, err_msg=f"{backend} row mask")
+        print(f"{n_rows:,} rows -> {int(expected.sum()):,} kept (identical masks)")
+        for backend, (_, seconds) in masks.items():
+            print(f"  {backend:<7}: row selection {seconds:6.3f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Phase 2 DataFrame backends")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--clean-rows", type=int, default=100_000, help="raw rows of the clean frame parity check")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    main(args.rows, args.clean_rows, args.repeats)
@@ -0,0 +1,93 @@
+# benchmarks/bench_categoricals.py
+# Memory and groupby latency of the dashboard's low-cardinality columns as
+# plain strings (previous get_job_data) vs. categoricals (CATEGORICAL_COLS).
+#
+#   uv run python -m benchmarks.bench_categoricals --rows 3000000
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_categories import CATEGORY_NAMES
+from src.config import CATEGORICAL_COLS
+from src.data_ingestion import normalize_categorical_columns
+
+
+def make_clean(n_rows: int, n_companies: int = 50_000, seed: int = 42) -> pd.DataFrame:
+    """Clean-like frame as pd.read_csv returns it (object text columns)."""
+    rng = np.random.default_rng(seed)
+
+    def pick(values, n=n_rows):
+        return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+    months = pd.period_range("2022-01", periods=24, freq="M").astype(str)
+    return pd.DataFrame(
+        {
+            "metadata_jobPostId": [f"MCF-2023-{i:07d}" for i in range(n_rows)],
+            "employmentTypes": pick(CATEGORICAL_COLS["employmentTypes"]),
+            "positionLevels": pick(CATEGORICAL_COLS["positionLevels"]),
+            "status_jobStatus": pick(["Open", "Closed"]),
+            "salary_type": pick(["Monthly"]),
+            "primary_category": pick(CATEGORY_NAMES),
+            "postedCompany_name": pick([f"Company {i} Pte. Ltd." for i in range(n_companies)]),
+            "posting_month": pick(months),
+            "average_salary": rng.normal(5000, 1500, n_rows).round(0),
+        }
+    )
+
+
+# (group keys, value column, aggregation) behind the Overview / Trends / Salary pages
+AGGREGATIONS = {
+    "postings by sector": ("primary_category", "metadata_jobPostId", "nunique"),
+    "postings by month x sector": (["posting_month", "primary_category"], "metadata_jobPostId", "nunique"),
+    "salary by sector": ("primary_category", "average_salary", ["mean", "median", "count"]),
+    "postings by company": ("postedCompany_name", "metadata_jobPostId", "nunique"),
+    "postings by employment type": ("employmentTypes", "metadata_jobPostId", "nunique"),
+    "postings by position level": ("positionLevels", "metadata_jobPostId", "nunique"),
+}
+
+
+def aggregate(df: pd.DataFrame, keys, value: str, how, **groupby_kwargs):
+    return df.groupby(keys, **groupby_kwargs)[value].agg(how)
+
+
+def same_result(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    """Same groups and values, whatever the dtype of the group keys."""
+    a, b = (x.reset_index().astype(str) for x in (a, b))
+    key = list(a.columns)
+    return a.sort_values(key).reset_index(drop=True).equals(b.sort_values(key).reset_index(drop=True))
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(n_rows: int) -> None:
+    print(f"Generating {n_rows:,} rows...")
+    plain = make_clean(n_rows)
+    encoded, t_encode = timed(normalize_categorical_columns, plain.copy())
+
+    cols = [c for c in CATEGORICAL_COLS if c in plain.columns]
+    mb_plain = plain[cols].memory_usage(deep=True).sum() / 1e6
+    mb_encoded = encoded[cols].memory_usage(deep=True).sum() / 1e6
+    print(f"text columns: {mb_plain:8.1f} MB as strings, {mb_encoded:8.1f} MB as categoricals "
+          f"({mb_plain / mb_encoded:.1f}x smaller; encoding took {t_encode:.2f} s)")
+    print(f"whole frame : {plain.memory_usage(deep=True).sum() / 1e6:8.1f} MB -> "
+          f"{encoded.memory_usage(deep=True).sum() / 1e6:8.1f} MB")
+
+    print(f"{'groupby':30s} {'strings':>10s} {'categorical':>12s} {'speed-up':>9s}")
+    for name, spec in AGGREGATIONS.items():
+        before, t_before = timed(aggregate, plain, *spec)
+        after, t_after = timed(aggregate, encoded, *spec, observed=True)
+        assert same_result(before, after), name
+        print(f"{name:30s} {t_before * 1000:8.0f} ms {t_after * 1000:10.0f} ms {t_before / t_after:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark categorical encoding")
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    main(parser.parse_args().rows)
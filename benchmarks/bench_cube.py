@@ -0,0 +1,149 @@
+# benchmarks/bench_cube.py
+# Phase 2 aggregate cube (src/cube.py) vs. the dashboard rows: the Overview
+# and Industry Trends pages for a few sidebar selections, with every
+# aggregation from the rows vs. from the cube rolled up to the page
+# dimensions (the Overview's companies and titles, not cube dimensions, come
+# from the rows either way). Frames from the cube must be identical to those
+# from the rows, unique-posting counts included.
+#
+#   uv run python -m benchmarks.bench_cube --rows 1000000
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import PROJECT_ROOT
+from src.cube import dashboard_rows, load_cube, materialize_cube, rollup
+from src.data_cleaning import clean_and_transform
+from src.data_ingestion import load_raw_data, parse_categories_column
+from src.synthetic import write_raw_csv
+
+sys.path.insert(0, str(PROJECT_ROOT / "streamlit_app"))
+from utils import aggregations as agg  # noqa: E402
+from utils.data import PAGE_CUBE_DIMENSIONS  # noqa: E402
+
+SELECTIONS = [
+    {},
+    {"positionLevels": "Executive"},
+    {"employmentTypes": "Full Time", "positionLevels": "Manager"},
+]
+# Trends aggregations of the top sectors' rows, all with a cube variant
+TRENDS = [
+    "postings_trend",
+    "salary_trend",
+    "interest_trend",
+    "vacancy_trend",
+    "duration_trend",
+    "sector_position_counts",
+]
+# Overview bars of unique postings per cube dimension ...
+OVERVIEW_DIMS = ["primary_category", "employmentTypes", "positionLevels"]
+# ... and per column the cube does not have
+OVERVIEW_ROW_COLS = ["postedCompany_name", "canonical_title"]
+
+
+def select_rows(df: pd.DataFrame, where) -> pd.DataFrame:
+    """The rows of the sidebar selection `where`, as apply_base_filters selects them."""
+    for col, value in where.items():
+        df = df[df[col].astype(str) == value]
+    return df
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def compare(rows_frame, cube_frame) -> None:
+    if isinstance(rows_frame, pd.Series):
+        pd.testing.assert_series_equal(
+            rows_frame,
+            cube_frame,
+            check_dtype=False,
+            check_names=False,
+            check_index_type=False,
+            check_categorical=False,
+        )
+        return
+    pd.testing.assert_frame_equal(
+        rows_frame.reset_index(drop=True),
+        cube_frame.reset_index(drop=True),
+        check_dtype=False,
+        check_categorical=False,
+    )
+
+
+def overview(df: pd.DataFrame, cube: pd.DataFrame, where) -> Tuple[float, float]:
+    """Times of the Overview's aggregations from the rows and with the cube."""
+    kpis, t_rows = timed(agg.overview_kpis, df)
+    cube_kpis, t_cube = timed(agg.cube_overview_kpis, cube, where, df)
+    for kpi in ["total_posts", "total_sectors"]:
+        assert kpis[kpi] == cube_kpis[kpi], (where, kpi)
+    assert np.isclose(kpis["avg_salary"], cube_kpis["avg_salary"]), where
+    for col in OVERVIEW_DIMS:
+        rows_counts, t = timed(agg.postings_by, df, col)
+        t_rows += t
+        cube_counts, t = timed(agg.cube_postings_by, cube, where, col)
+        t_cube += t
+        compare(rows_counts, cube_counts)
+    for col in OVERVIEW_ROW_COLS:
+        _, t = timed(agg.postings_by, df, col)
+        t_rows += t
+        t_cube += t
+    return t_rows, t_cube
+
+
+def trends(df: pd.DataFrame, cube: pd.DataFrame, where, top_n: int) -> Tuple[float, float]:
+    """Times of the Trends page's aggregations from the rows and from the cube."""
+    sectors, t_rows = timed(agg.top_sectors, df, top_n)
+    cube_sectors, t_cube = timed(agg.cube_top_sectors, cube, where, top_n)
+    assert list(sectors) == list(cube_sectors), where
+    # The page selects the top sectors' rows only without a cube
+    df_top, t = timed(lambda: df[df["primary_category"].isin(sectors)])
+    t_rows += t
+    where_top = {**where, "primary_category": cube_sectors}
+    for name in TRENDS:
+        extra = (sectors,) if name == "duration_trend" else ()
+        rows_frame, t = timed(getattr(agg, name), df_top, *extra)
+        t_rows += t
+        cube_frame, t = timed(getattr(agg, f"cube_{name}"), cube, where_top, *extra)
+        t_cube += t
+        compare(rows_frame, cube_frame)
+    return t_rows, t_cube
+
+
+def main(sizes, top_n: int = 15) -> None:
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_path = write_raw_csv(Path(tmp) / "SGJobData.csv", n_rows)
+            clean = clean_and_transform(parse_categories_column(load_raw_data(raw_path)))
+            _, t_build = timed(lambda: materialize_cube(clean, out=Path(tmp) / "cube.parquet"))
+            full = load_cube(Path(tmp) / "cube.parquet")
+        cube = rollup(full, [dim for dim in PAGE_CUBE_DIMENSIONS if dim in full.columns])
+        rows = dashboard_rows(clean)
+        print(
+            f"{n_rows:,} rows -> {len(rows):,} dashboard rows, cube of {len(full):,} cells "
+            f"({len(cube):,} rolled up to the page dimensions) built in {t_build:.2f} s"
+        )
+
+        for where in SELECTIONS:
+            df = select_rows(rows, where)
+            o_rows, o_cube = overview(df, cube, where)
+            t_rows, t_cube = trends(df, cube, where, top_n)
+            print(
+                f"  {where or 'no filter'}: Overview rows {o_rows:.3f} s, with the cube {o_cube:.3f} s; "
+                f"Trends rows {t_rows:.3f} s, with the cube {t_cube:.3f} s (identical frames)"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Phase 2 aggregate cube")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    main(parser.parse_args().rows)
@@ -0,0 +1,51 @@
+# benchmarks/bench_dates.py
+# Date parsing: unique-value parsing with the declared format vs. the
+# previous pd.to_datetime(errors="coerce") call without a format.
+#
+#   uv run python -m benchmarks.bench_dates --rows 3000000
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.config import RAW_DATE_FORMAT
+from src.data_ingestion import parse_date_column
+
+
+def make_dates(n_rows: int, n_distinct: int = 3000, seed: int = 42) -> pd.Series:
+    """Raw-like date strings: a few thousand distinct days, some missing / invalid."""
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2020-01-01", periods=n_distinct).strftime(RAW_DATE_FORMAT)
+    values = np.append(days.to_numpy(dtype=object), "not a date")
+    s = pd.Series(values[rng.integers(0, len(values), n_rows)], dtype="string[pyarrow]")
+    s[rng.random(n_rows) < 0.01] = None
+    return s
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(n_rows: int) -> None:
+    print(f"Generating {n_rows:,} rows...")
+    raw = make_dates(n_rows)
+
+    legacy, t_legacy = timed(lambda s: pd.to_datetime(s, errors="coerce"), raw)
+    fast, t_fast = timed(parse_date_column, raw, RAW_DATE_FORMAT)
+
+    # Same answers as the previous implementation on well-formed data
+    assert legacy.equals(fast)
+
+    print(f"to_datetime (inferred) : {t_legacy * 1000:8.0f} ms")
+    print(f"parse_date_column      : {t_fast * 1000:8.0f} ms   NaT: {int(fast.isna().sum()):,}")
+    print(f"speed-up               : {t_legacy / t_fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark date parsing")
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    main(parser.parse_args().rows)
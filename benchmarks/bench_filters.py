@@ -0,0 +1,109 @@
+# benchmarks/bench_filters.py
+# Sidebar filter latency vs. the number of active filters: the previous
+# sequential boolean masks of apply_base_filters vs. the bitmap index
+# (streamlit_app/utils/filter_index.py), and a page revisiting the selection
+# with the frame in the cross-page cache (utils/filter_cache.py). Every
+# random selection must give identical frames.
+#
+#   uv run python -m benchmarks.bench_filters --rows 1000000
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import PROJECT_ROOT
+from src.cube import dashboard_rows
+from src.data_cleaning import clean_and_transform
+from src.data_ingestion import load_raw_data, parse_categories_column
+from src.synthetic import write_raw_csv
+
+sys.path.insert(0, str(PROJECT_ROOT / "streamlit_app"))
+from utils.filter_cache import FilteredFrameCache, filter_key  # noqa: E402
+from utils.filter_index import FilterIndex  # noqa: E402
+
+SALARY_RANGES = [(2_000, 8_000), (0, 5_000), (6_000, float("inf"))]
+
+
+def sequential_filters(df: pd.DataFrame, selection, salary_range) -> pd.DataFrame:
+    """The rows of a selection, one mask per filter (apply_base_filters before the index)."""
+    filtered = df
+    for col, value in selection.items():
+        values = filtered[col].astype(str) if col == "experienceTypes" else filtered[col]
+        filtered = filtered[values == value]
+    if salary_range is not None:
+        salary = pd.to_numeric(filtered["average_salary"], errors="coerce")
+        filtered = filtered[(salary >= salary_range[0]) & (salary <= salary_range[1])]
+    return filtered
+
+
+def indexed_filters(df: pd.DataFrame, index: FilterIndex, selection, salary_range) -> pd.DataFrame:
+    rows = index.select(selection, salary_range)
+    return df if rows is None else df.take(rows)
+
+
+def cached_filters(df: pd.DataFrame, index: FilterIndex, cache: FilteredFrameCache, selection, salary_range):
+    """The rows of a selection as sidebar_filters gets them with a cache."""
+    key = filter_key(selection, salary_range)
+    filtered = cache.get(key)
+    if filtered is None:
+        filtered = indexed_filters(df, index, selection, salary_range)
+        cache.put(key, filtered)
+    return filtered.copy(deep=False)
+
+
+def random_selection(index: FilterIndex, n_filters: int, rng: np.random.Generator):
+    """`n_filters` active filters: select-box values first, then a salary range."""
+    cols = [str(col) for col in rng.permutation(list(index.bitmaps))]
+    selection = {col: str(rng.choice(index.options(col))) for col in cols[:n_filters]}
+    salary_range = SALARY_RANGES[rng.integers(len(SALARY_RANGES))] if n_filters > len(cols) else None
+    return selection, salary_range
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main(sizes, repeats: int = 5, seed: int = 42) -> None:
+    rng = np.random.default_rng(seed)
+    for n_rows in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_path = write_raw_csv(Path(tmp) / "SGJobData.csv", n_rows)
+            df = dashboard_rows(clean_and_transform(parse_categories_column(load_raw_data(raw_path))))
+        index, t_build = timed(FilterIndex, df)
+        print(f"{n_rows:,} rows -> {len(df):,} dashboard rows, index built in {t_build:.2f} s")
+
+        cache = FilteredFrameCache()
+        for n_filters in range(1, len(index.bitmaps) + 2):
+            t_seq = t_idx = t_hit = 0.0
+            for _ in range(repeats):
+                selection, salary_range = random_selection(index, n_filters, rng)
+                expected, t = timed(sequential_filters, df, selection, salary_range)
+                t_seq += t
+                result, t = timed(indexed_filters, df, index, selection, salary_range)
+                t_idx += t
+                pd.testing.assert_frame_equal(result, expected)
+                cached_filters(df, index, cache, selection, salary_range)
+                result, t = timed(cached_filters, df, index, cache, selection, salary_range)
+                t_hit += t
+                pd.testing.assert_frame_equal(result, expected)
+            print(
+                f"  {n_filters} filter(s): sequential {1000 * t_seq / repeats:.1f} ms, "
+                f"index {1000 * t_idx / repeats:.1f} ms, cached {1000 * t_hit / repeats:.2f} ms "
+                "(identical frames)"
+            )
+        print(f"  cache: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the sidebar filters' bitmap index")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeats)
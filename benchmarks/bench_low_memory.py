@@ -0,0 +1,50 @@
+# benchmarks/bench_low_memory.py
+# Phase 2 cleaning: clean_and_transform (a filtered copy per step) vs.
+# clean_and_transform_low_memory (one combined row mask, column by column,
+# input consumed). Checks that both give the same clean frame, then reports
+# time and the peak memory each adds on top of the structured input.
+#
+#   uv run python -m benchmarks.bench_low_memory --rows 1000000
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.data_cleaning import clean_and_transform, clean_and_transform_low_memory
+from src.data_ingestion import load_raw_data, parse_categories_column
+from src.instrumentation import peak_rss_mb, reset_peak_rss, rss_mb
+from src.synthetic import write_raw_csv
+
+
+def measured(fn, *args, **kwargs):
+    """Result, seconds and peak MB above the memory in use at the start."""
+    before = rss_mb()
+    reset_peak_rss()
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start, peak_rss_mb() - before
+
+
+def main(n_rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = write_raw_csv(Path(tmp) / "SGJobData.csv", n_rows)
+        structured = parse_categories_column(load_raw_data(raw_path))
+
+    expected, t_default, mb_default = measured(clean_and_transform, structured.copy())
+    low, t_low, mb_low = measured(
+        clean_and_transform_low_memory, structured.copy(), consume_input=True
+    )
+    pd.testing.assert_frame_equal(low, expected)
+
+    print(f"{n_rows:,} rows -> {len(expected):,} clean rows (identical output)")
+    print(f"  clean_and_transform            : {t_default:6.2f} s, {mb_default:8.0f} MB peak above input")
+    print(f"  clean_and_transform_low_memory : {t_low:6.2f} s, {mb_low:8.0f} MB peak above input")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark low-memory Phase 2 cleaning")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    main(parser.parse_args().rows)
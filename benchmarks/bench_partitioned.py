@@ -0,0 +1,85 @@
+# benchmarks/bench_partitioned.py
+# Loading one month / one sector of the clean dataset: the monolithic CSV
+# and Parquet files vs. the Hive-partitioned dataset with predicate pushdown.
+#
+#   uv run python -m benchmarks.bench_partitioned --rows 3000000
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_categories import CATEGORY_NAMES
+from src.dataset import load_dataset, write_partitioned_dataset
+
+COLUMNS = ["title", "primary_category", "posting_month", "average_salary"]
+
+
+def make_clean(n_rows: int, n_months: int = 24, seed: int = 42) -> pd.DataFrame:
+    """Clean-like frame spread over `n_months` posting months."""
+    rng = np.random.default_rng(seed)
+    months = pd.period_range("2022-01", periods=n_months, freq="M").astype(str)
+    return pd.DataFrame(
+        {
+            "metadata_jobPostId": [f"MCF-2023-{i:07d}" for i in range(n_rows)],
+            "title": pd.Series(rng.integers(0, 20_000, n_rows)).map("Job title {}".format),
+            "primary_category": np.array(CATEGORY_NAMES)[rng.integers(0, len(CATEGORY_NAMES), n_rows)],
+            "posting_month": np.asarray(months)[rng.integers(0, n_months, n_rows)],
+            "average_salary": rng.normal(5000, 1500, n_rows).round(0),
+            "minimumYearsExperience": rng.integers(0, 15, n_rows),
+            "numberOfVacancies": rng.integers(1, 5, n_rows),
+        }
+    )
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(n_rows: int) -> None:
+    print(f"Generating {n_rows:,} rows...")
+    df = make_clean(n_rows)
+    month, sector = "2023-06", "Information Technology"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        df.to_csv(tmp / "clean.csv", index=False)
+        df.to_parquet(tmp / "clean.parquet", index=False)
+        write_partitioned_dataset(df, tmp / "by_month", ["posting_month"])
+        write_partitioned_dataset(df, tmp / "by_month_sector", ["posting_month", "primary_category"])
+
+        def from_csv():
+            full = pd.read_csv(tmp / "clean.csv")
+            return full[(full["posting_month"] == month) & (full["primary_category"] == sector)][COLUMNS]
+
+        def from_parquet():
+            full = pd.read_parquet(tmp / "clean.parquet")
+            return full[(full["posting_month"] == month) & (full["primary_category"] == sector)][COLUMNS]
+
+        filters = [("posting_month", "==", month), ("primary_category", "==", sector)]
+        csv_rows, t_csv = timed(from_csv)
+        pq_rows, t_pq = timed(from_parquet)
+        month_rows, t_month = timed(load_dataset, COLUMNS, filters, tmp / "by_month")
+        sector_rows, t_sector = timed(load_dataset, COLUMNS, filters, tmp / "by_month_sector")
+
+    # Same postings whichever way they are read
+    assert len(csv_rows) == len(pq_rows) == len(month_rows) == len(sector_rows)
+    assert sorted(pq_rows["title"]) == sorted(sector_rows["title"].astype(str))
+
+    print(f"rows selected                    : {len(pq_rows):,}")
+    print(f"CSV, read all + filter           : {t_csv * 1000:8.0f} ms")
+    print(f"Parquet, read all + filter       : {t_pq * 1000:8.0f} ms")
+    print(f"dataset by month, pushdown       : {t_month * 1000:8.0f} ms")
+    print(f"dataset by month+sector, pushdown: {t_sector * 1000:8.0f} ms")
+    print(f"speed-up vs CSV                  : {t_csv / t_sector:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark partitioned dataset loading")
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    main(parser.parse_args().rows)
@@ -0,0 +1,51 @@
+# benchmarks/bench_text.py
+# Title Case normalization of titles and company names: per-row apply (the
+# previous clean_and_transform) vs. once per distinct value, cold and with
+# a warm text cache.
+#
+#   uv run python -m benchmarks.bench_text --rows 1000000
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from src.synthetic import generate_raw
+from src.text_normalization import TextCache, normalize_text, normalize_text_column
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main(n_rows: int) -> None:
+    print(f"Generating {n_rows:,} rows...")
+    raw = generate_raw(n_rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "text_cache.parquet"
+        for col in ["title", "postedCompany_name"]:
+            values = raw[col].astype("string[pyarrow]")
+            before, t_apply = timed(values.apply, normalize_text)
+            after, t_vector = timed(normalize_text_column, values)
+
+            cache = TextCache(cache_path)
+            normalize_text_column(values, cache)
+            cache.save()
+            cache = TextCache(cache_path)
+            cached, t_cached = timed(normalize_text_column, values, cache)
+
+            for result in (after, cached):
+                assert before.fillna("<NA>").equals(result.fillna("<NA>")), col
+            print(f"{col}: {values.nunique():,} distinct values in {n_rows:,} rows")
+            print(f"  apply per row        : {t_apply * 1000:8.0f} ms")
+            print(f"  per distinct value   : {t_vector * 1000:8.0f} ms ({t_apply / t_vector:.1f}x)")
+            print(f"  warm text cache      : {t_cached * 1000:8.0f} ms ({t_apply / t_cached:.1f}x)")
+            cache_path.unlink()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark title / company normalization")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    main(parser.parse_args().rows)
@@ -0,0 +1,330 @@
+# benchmarks/run_benchmarks.py
+# End-to-end pipeline benchmark on synthetic SGJobData (src/synthetic.py):
+# Phase 1, Phase 2, the aggregate cube, the metadata sidecar, the dashboard loader, the sidebar
+# filters and each page's aggregations (the Overview and Trends pages also from the cube). Every stage runs in its own process so its peak
+# memory is measured on its own; one JSON line per stage is appended to
+# reports/benchmarks.jsonl, tagged with the git commit, so runs can be
+# compared across commits.
+#
+#   uv run python -m benchmarks.run_benchmarks --rows 100000 1000000
+#   uv run python -m benchmarks.run_benchmarks --rows 10000000 --stages phase1 clean_and_transform
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from src.config import BENCHMARK_DATA_DIR, BENCHMARK_RESULTS_PATH, PROJECT_ROOT, OutputSpec
+from src.instrumentation import peak_rss_mb, reset_peak_rss, rss_mb
+
+RESULT_PREFIX = "BENCHMARK_RESULT "
+
+
+# ---------------------------------------------------------------------
+# Stages (each runs in a fresh process; see run_stage)
+# ---------------------------------------------------------------------
+class Workdir:
+    """Files of one benchmark run: raw CSV, Phase 1 and Phase 2 outputs."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.raw = root / "SGJobData.csv"
+        self.structured = root / "SGJobData_structured.parquet"
+        self.clean = root / "SGJobData_clean.parquet"
+        self.cube = root / "SGJobData_cube.parquet"
+
+
+def _dashboard():
+    """Import the dashboard helpers the way the Streamlit app does."""
+    sys.path.insert(0, str(PROJECT_ROOT / "streamlit_app"))
+    from utils import aggregations
+    from utils.data import load_job_frame
+    from utils.filters import apply_base_filters
+    return aggregations, load_job_frame, apply_base_filters
+
+
+def stage_phase1(work: Workdir) -> Callable:
+    from src.data_ingestion import run_phase_1_ingestion
+    from src.outputs import wait_for_outputs
+
+    def run():
+        run_phase_1_ingestion(work.raw, work.structured, work.structured.with_suffix(".csv"),
+                              outputs=[OutputSpec("parquet")], build_cache=False)
+        wait_for_outputs()
+    return run
+
+
+def stage_clean_and_transform(work: Workdir) -> Callable:
+    from src.data_cleaning import clean_and_transform, load_structured_data, save_clean_data
+
+    df = load_structured_data(work.structured)
+
+    def run():
+        clean = clean_and_transform(df)
+        # Not timed: the dashboard stages read this file
+        return lambda: save_clean_data(clean, work.clean)
+    return run
+
+
+def stage_cube(work: Workdir) -> Callable:
+    from src.cube import materialize_cube
+
+    return lambda: materialize_cube(path=work.clean, out=work.cube)
+
+
+def stage_metadata(work: Workdir) -> Callable:
+    # Writes the sidecar next to the clean file: get_job_data reads its outlier bounds
+    from src.dataset_metadata import materialize_metadata
+
+    return lambda: materialize_metadata(path=work.clean)
+
+
+def stage_get_job_data(work: Workdir) -> Callable:
+    _, get_job_data, _ = _dashboard()
+    return lambda: get_job_data(data_path=work.clean)
+
+
+def stage_get_job_data_mapped(work: Workdir) -> Callable:
+    # The get_job_data stage left the snapshot; this maps it
+    _, get_job_data, _ = _dashboard()
+    return lambda: get_job_data(data_path=work.clean)
+
+
+def stage_apply_base_filters(work: Workdir) -> Callable:
+    _, get_job_data, apply_base_filters = _dashboard()
+    from utils.filter_index import FilterIndex
+    from src.dataset_metadata import load_metadata, sidecar_path
+
+    df = get_job_data(data_path=work.clean)
+    # Built / read once per dataset in the app (get_filter_index, get_filter_metadata)
+    index = FilterIndex(df)
+    meta = load_metadata(sidecar_path(work.clean))["dashboard"]
+    # Outside a Streamlit session the widgets return their defaults
+    return lambda: apply_base_filters(df, index, meta=meta)
+
+
+def _page_stage(page: Callable) -> Callable:
+    def stage(work: Workdir) -> Callable:
+        agg, get_job_data, apply_base_filters = _dashboard()
+        df_filt, top_n = apply_base_filters(get_job_data(data_path=work.clean))
+        return lambda: page(agg, df_filt, top_n)
+    return stage
+
+
+def overview_page(agg, df: pd.DataFrame, top_n: int) -> None:
+    agg.overview_kpis(df)
+    for col, label in [("primary_category", "Sector"), ("postedCompany_name", "Company"), ("title", "Title")]:
+        agg.top_with_others(agg.postings_by(df, col), top_n, label)
+    for col in ["employmentTypes", "positionLevels"]:
+        agg.share_table(agg.postings_by(df, col), col)
+
+
+def trends_page(agg, df: pd.DataFrame, top_n: int) -> None:
+    sectors = agg.top_sectors(df, top_n)
+    df_top = df[df["primary_category"].isin(sectors)]
+    agg.postings_trend(df_top)
+    agg.salary_trend(df_top)
+    agg.interest_trend(df_top)
+    agg.vacancy_trend(df_top)
+    agg.duration_trend(df_top, sectors)
+    agg.sector_position_counts(df_top)
+
+
+def _cube_page_stage(page: Callable) -> Callable:
+    def stage(work: Workdir) -> Callable:
+        agg, get_job_data, apply_base_filters = _dashboard()
+        from utils.data import PAGE_CUBE_DIMENSIONS
+        from src.cube import load_cube, rollup
+
+        cube = load_cube(work.cube)
+        cube = rollup(cube, [dim for dim in PAGE_CUBE_DIMENSIONS if dim in cube.columns])
+        # The default sidebar selection: no filter, Top 15
+        df_filt, top_n = apply_base_filters(get_job_data(data_path=work.clean))
+        return lambda: page(agg, cube, df_filt, {}, top_n)
+    return stage
+
+
+def overview_page_cube(agg, cube: pd.DataFrame, df: pd.DataFrame, where: Dict[str, str], top_n: int) -> None:
+    agg.cube_overview_kpis(cube, where, df)
+    agg.top_with_others(agg.cube_postings_by(cube, where, "primary_category"), top_n, "Sector")
+    # Companies and titles are not cube dimensions, as on the page
+    for col, label in [("postedCompany_name", "Company"), ("title", "Title")]:
+        agg.top_with_others(agg.postings_by(df, col), top_n, label)
+    for col in ["employmentTypes", "positionLevels"]:
+        agg.share_table(agg.cube_postings_by(cube, where, col), col)
+
+
+def trends_page_cube(agg, cube: pd.DataFrame, df: pd.DataFrame, where: Dict[str, str], top_n: int) -> None:
+    sectors = agg.cube_top_sectors(cube, where, top_n)
+    where_top = {**where, "primary_category": sectors}
+    agg.cube_postings_trend(cube, where_top)
+    agg.cube_salary_trend(cube, where_top)
+    agg.cube_interest_trend(cube, where_top)
+    agg.cube_vacancy_trend(cube, where_top)
+    agg.cube_duration_trend(cube, where_top, sectors)
+    agg.cube_sector_position_counts(cube, where_top)
+
+
+def salary_page(agg, df: pd.DataFrame, top_n: int) -> None:
+    for col in ["primary_category", "title"]:
+        top = agg.postings_by(df, col).head(top_n).index
+        df_top = df[df[col].isin(top)]
+        agg.salary_stats_by(df_top, col)
+        agg.mean_salary_order(df_top, col)
+
+
+def experience_page(agg, df: pd.DataFrame, top_n: int) -> None:
+    agg.level_experience_counts(agg.experience_salary_frame(df))
+
+
+STAGES: Dict[str, Callable[[Workdir], Callable]] = {
+    "phase1": stage_phase1,
+    "clean_and_transform": stage_clean_and_transform,
+    "cube": stage_cube,
+    "metadata": stage_metadata,
+    "get_job_data": stage_get_job_data,
+    "get_job_data_mapped": stage_get_job_data_mapped,
+    "apply_base_filters": stage_apply_base_filters,
+    "page_overview": _page_stage(overview_page),
+    "page_overview_cube": _cube_page_stage(overview_page_cube),
+    "page_trends": _page_stage(trends_page),
+    "page_trends_cube": _cube_page_stage(trends_page_cube),
+    "page_salary": _page_stage(salary_page),
+    "page_experience": _page_stage(experience_page),
+}
+
+
+def run_stage(name: str, work: Workdir) -> None:
+    """
+    Set up stage `name`, time it and print its result line: wall time,
+    peak memory of the process and the memory the stage added on top of
+    its inputs. A stage may return a follow-up (e.g. writing outputs for
+    later stages) that runs after the measurement.
+    """
+    fn = STAGES[name](work)
+    setup_peak = peak_rss_mb()
+    rss_before = rss_mb()
+    reset_peak_rss()
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    peak = max(peak_rss_mb(), rss_before)
+    if callable(result):
+        result()
+    print(RESULT_PREFIX + json.dumps({
+        "seconds": round(seconds, 3),
+        "peak_mb": round(max(peak, setup_peak), 1),
+        "stage_peak_mb": round(peak - rss_before, 1),
+    }), flush=True)
+
+
+# ---------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------
+def git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{commit}-dirty" if dirty else commit
+
+
+def previous_results(path: Path, rows: int, run_at: str) -> Dict[str, Dict]:
+    """Latest earlier record per stage for `rows` rows."""
+    latest = {}
+    if path.exists():
+        for line in path.read_text(encoding="utf-8").splitlines():
+            record = json.loads(line)
+            if record["rows"] == rows and record["run_at"] != run_at:
+                latest[record["stage"]] = record
+    return latest
+
+
+def benchmark(
+    n_rows: int,
+    stages: List[str],
+    seed: int = 42,
+    results_path: Path = BENCHMARK_RESULTS_PATH,
+    verbose: bool = False,
+) -> List[Dict]:
+    from src.synthetic import write_raw_csv
+
+    work = Workdir(BENCHMARK_DATA_DIR / f"rows_{n_rows}_seed_{seed}")
+    work.root.mkdir(parents=True, exist_ok=True)
+    if not work.raw.exists():
+        write_raw_csv(work.raw, n_rows, seed)
+
+    run_at = datetime.now().isoformat(timespec="seconds")
+    base = {
+        "run_at": run_at,
+        "commit": git_commit(),
+        "rows": n_rows,
+        "seed": seed,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+    }
+    previous = previous_results(results_path, n_rows, run_at)
+
+    print(f"\n{n_rows:,} rows ({work.root})")
+    print(f"{'stage':22s} {'seconds':>9s} {'peak MB':>9s} {'stage MB':>9s}   previous")
+    records = []
+    for stage in stages:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run_benchmarks", "--stage", stage,
+             "--workdir", str(work.root)],
+            cwd=PROJECT_ROOT, capture_output=True, text=True,
+        )
+        if verbose or proc.returncode != 0:
+            print(proc.stdout + proc.stderr)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Benchmark stage '{stage}' failed")
+
+        line = next(l for l in reversed(proc.stdout.splitlines()) if l.startswith(RESULT_PREFIX))
+        record = {**base, "stage": stage, **json.loads(line[len(RESULT_PREFIX):])}
+        records.append(record)
+        with open(results_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+        before = previous.get(stage)
+        compare = (
+            f"{before['seconds']:8.2f} s ({before['commit']}, {record['seconds'] / before['seconds']:.2f}x)"
+            if before and before["seconds"] else ""
+        )
+        print(f"{stage:22s} {record['seconds']:9.2f} {record['peak_mb']:9.0f} "
+              f"{record['stage_peak_mb']:9.0f}   {compare}")
+    return records
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark on synthetic data")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000],
+                        help="Dataset sizes, e.g. 100000 1000000 10000000.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES),
+                        help="Stages to run (later stages read the outputs of earlier ones).")
+    parser.add_argument("--results", type=Path, default=BENCHMARK_RESULTS_PATH)
+    parser.add_argument("--verbose", action="store_true", help="Show each stage's output.")
+    # Internal: run a single stage in this process
+    parser.add_argument("--stage", choices=list(STAGES), help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        run_stage(args.stage, Workdir(args.workdir))
+    else:
+        for n_rows in args.rows:
+            benchmark(n_rows, args.stages, args.seed, args.results, args.verbose)
@@ -1,5 +1,7 @@
-def main():
-    print("Hello from sgjob-v2!")
+# Raw data -> clean dataset in one pass; see src/pipeline.py for the options.
+#
+#   uv run python main.py --checkpoint structured
+from src.pipeline import main
 
 
 if __name__ == "__main__":
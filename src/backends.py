@@ -0,0 +1,67 @@
+# src/backends.py
+# DataFrame engines for the row selection of Phase 2 cleaning: first
+# occurrence of each job ID, with a title and positive salaries. "pandas"
+# evaluates the filters eagerly, one after the other; "polars" (optional
+# dependency) evaluates them as one lazy, multithreaded query over an
+# Arrow view of the few columns involved. Both return the same boolean
+# mask, and the clean frame is then taken from the input the same way
+# (clean_and_transform_low_memory), so the output does not depend on the
+# engine.
+#
+# Only the row selection is engine-specific, on purpose: the steps after
+# it already work once per distinct value (titles, skills, categories) or
+# in Arrow compute kernels, and Phase 1 reads with Arrow's multithreaded
+# CSV reader, so re-expressing them in polars would add a second copy of
+# the cleaning rules without a second engine's worth of speedup.
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.config import JOB_ID_COL
+from src.outputs import as_arrow
+
+BACKENDS = ("pandas", "polars")
+
+SALARY_COLS: List[str] = ["salary_minimum", "salary_maximum"]
+
+
+def pandas_row_mask(df: pd.DataFrame) -> np.ndarray:
+    """The rows clean_and_transform keeps, computed with pandas."""
+    keep = df["title"].notna().to_numpy(copy=True)
+    if JOB_ID_COL in df.columns:
+        keep &= ~df.duplicated(subset=[JOB_ID_COL]).to_numpy()
+    if set(SALARY_COLS).issubset(df.columns):
+        for col in SALARY_COLS:
+            keep &= (df[col] > 0).fillna(False).to_numpy(dtype=bool)
+    return keep
+
+
+def polars_row_mask(df: pd.DataFrame) -> np.ndarray:
+    """The rows clean_and_transform keeps, computed as a Polars lazy query."""
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise ImportError(
+            "The polars backend needs the optional polars extra (uv sync --extra polars)"
+        ) from e
+
+    cols = ["title", *[c for c in [JOB_ID_COL, *SALARY_COLS] if c in df.columns]]
+    frame = pl.from_arrow(pa.table({col: as_arrow(df[col]) for col in cols})).lazy()
+    keep = pl.col("title").is_not_null()
+    if JOB_ID_COL in df.columns:
+        keep &= pl.col(JOB_ID_COL).is_first_distinct()
+    if set(SALARY_COLS).issubset(df.columns):
+        for col in SALARY_COLS:
+            keep &= (pl.col(col) > 0).fill_null(False)
+    return frame.select(keep.alias("keep")).collect()["keep"].to_numpy()
+
+
+def row_mask(df: pd.DataFrame, backend: str = "pandas") -> np.ndarray:
+    """Boolean mask of the rows Phase 2 keeps, computed with `backend`."""
+    if backend == "pandas":
+        return pandas_row_mask(df)
+    if backend == "polars":
+        return polars_row_mask(df)
+    raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
@@ -0,0 +1,213 @@
+# src/build_cache.py
+# Content-addressed build cache for full Phase 1, Phase 2 and pipeline
+# runs. A run's key hashes the contents of its input files, its settings,
+# the src/ source code (config.py included) and the pandas / pyarrow /
+# numpy versions. After a run its outputs are hardlinked under the key
+# (copied where links are not supported); a later run with the same key
+# restores the outputs that are missing or were modified since, and skips
+# the work, make-style. Outputs are always written as new files (see
+# outputs.new_file), so a linked entry is never modified in place. Least
+# recently used entries are evicted past an age or a total size.
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.config import BUILD_CACHE_DIR, BUILD_CACHE_MAX_AGE_DAYS, BUILD_CACHE_MAX_MB
+from src.manifest import file_sha256
+from src.outputs import after_outputs
+
+SOURCE_DIR = Path(__file__).resolve().parent
+_ENTRY_FILE = "entry.json"
+# Content hashes of input files, reused while their size and mtime are unchanged
+_HASHES_FILE = "file_hashes.json"
+
+
+def source_hash(source_dir: Path = SOURCE_DIR) -> str:
+    """Hash of the pipeline source code (every .py file in src/)."""
+    digest = hashlib.sha256()
+    for path in sorted(source_dir.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _signature(path: Path) -> List:
+    """Cheap identity of a file or directory: sizes and modification times."""
+    if path.is_dir():
+        return sorted(
+            [str(p.relative_to(path)), p.stat().st_size, p.stat().st_mtime_ns]
+            for p in path.rglob("*")
+            if p.is_file()
+        )
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def _link_file(src: str, dst: str) -> None:
+    """Hardlink a file, or copy it (keeping its modification time) across file systems."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _link(src: Path, dst: Path) -> None:
+    """Hardlink a file or the files of a directory (signatures match the source)."""
+    if src.is_dir():
+        shutil.copytree(src, dst, copy_function=_link_file)
+    else:
+        _link_file(str(src), str(dst))
+
+
+class BuildCache:
+    """Outputs of previous runs, stored by the hash of what produced them."""
+
+    def __init__(
+        self,
+        root: Path = BUILD_CACHE_DIR,
+        max_age_days: float = BUILD_CACHE_MAX_AGE_DAYS,
+        max_mb: float = BUILD_CACHE_MAX_MB,
+    ):
+        self.root = root
+        self.max_age_days = max_age_days
+        self.max_mb = max_mb
+        hashes_path = root / _HASHES_FILE
+        self._hashes: Dict[str, List] = (
+            json.loads(hashes_path.read_text(encoding="utf-8")) if hashes_path.exists() else {}
+        )
+
+    def file_hash(self, path: Path) -> str:
+        """Content hash of `path`, recomputed only when its size or mtime changed."""
+        path = path.resolve()
+        signature = _signature(path)
+        known = self._hashes.get(str(path))
+        if known is not None and known[:2] == signature:
+            return known[2]
+        digest = file_sha256(path)
+        self._hashes[str(path)] = [*signature, digest]
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / _HASHES_FILE).write_text(json.dumps(self._hashes), encoding="utf-8")
+        return digest
+
+    def key(self, stage: str, inputs: List[Path], settings: Dict) -> Optional[str]:
+        """
+        Key of a `stage` run over `inputs` with `settings`, or None if an
+        input is missing (the run then reports it as usual).
+        """
+        if not all(path.is_file() for path in inputs):
+            return None
+        fingerprint = {
+            "stage": stage,
+            "inputs": [[path.name, self.file_hash(path)] for path in inputs],
+            "settings": settings,
+            "source": source_hash(),
+            "versions": [pd.__version__, pa.__version__, np.__version__],
+        }
+        text = json.dumps(fingerprint, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _entry_dir(self, stage: str, key: str) -> Path:
+        return self.root / f"{stage}-{key[:24]}"
+
+    def restore(self, stage: str, key: str) -> bool:
+        """
+        Put back the outputs stored under `key`, linking only those that are
+        missing or changed. False if there is no such entry, or if its files
+        were modified since they were stored (the entry is then dropped).
+        """
+        entry_dir = self._entry_dir(stage, key)
+        entry_path = entry_dir / _ENTRY_FILE
+        if not entry_path.exists():
+            return False
+        entry = json.loads(entry_path.read_text(encoding="utf-8"))
+        if any(
+            _signature(entry_dir / output["name"]) != output["signature"] for output in entry["outputs"]
+        ):
+            print(f"[Build cache] {stage}: {entry_dir.name} was modified since it was stored; dropped")
+            shutil.rmtree(entry_dir)
+            return False
+        restored = 0
+        for output in entry["outputs"]:
+            path = Path(output["path"])
+            if path.exists() and _signature(path) == output["signature"]:
+                continue
+            _remove(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _link(entry_dir / output["name"], path)
+            restored += 1
+        entry["used_at"] = time.time()
+        entry_path.write_text(json.dumps(entry, indent=2), encoding="utf-8")
+        print(
+            f"[Build cache] {stage}: inputs, settings and code unchanged; "
+            f"{restored} of {len(entry['outputs'])} outputs restored from {entry_dir.name}"
+        )
+        return True
+
+    def store(self, stage: str, key: str, outputs: List[Path]) -> None:
+        """
+        Link the outputs of a finished run under `key`, then evict old
+        entries. The outputs must be written: see store_when_written.
+        """
+        entry_dir = self._entry_dir(stage, key)
+        tmp = entry_dir.with_name(entry_dir.name + ".tmp")
+        _remove(tmp)
+        tmp.mkdir(parents=True)
+        records, size = [], 0
+        for i, path in enumerate(outputs):
+            if not path.exists():
+                continue
+            name = f"{i}_{path.name}"
+            _link(path, tmp / name)
+            signature = _signature(path)
+            records.append({"path": str(path.resolve()), "name": name, "signature": signature})
+            size += sum(s[1] for s in signature) if path.is_dir() else signature[0]
+        now = time.time()
+        entry = {"stage": stage, "key": key, "created_at": now, "used_at": now, "bytes": size, "outputs": records}
+        (tmp / _ENTRY_FILE).write_text(json.dumps(entry, indent=2), encoding="utf-8")
+        _remove(entry_dir)
+        tmp.rename(entry_dir)
+        print(f"[Build cache] {stage}: {len(records)} outputs ({size / 1024**2:,.1f} MB) stored in {entry_dir.name}")
+        self.evict(keep=entry_dir)
+
+    def store_when_written(self, stage: str, key: str, outputs: List[Path]) -> None:
+        """
+        Store the outputs once the writes queued on the background writer
+        are done, without waiting for them (see outputs.after_outputs).
+        """
+        after_outputs(self.store, stage, key, outputs)
+
+    def evict(self, keep: Optional[Path] = None) -> None:
+        """
+        Remove entries unused for more than max_age_days, then the least
+        recently used ones until the cache fits in max_mb (`keep` is never
+        removed).
+        """
+        entries = []
+        for entry_path in self.root.glob(f"*/{_ENTRY_FILE}"):
+            entry = json.loads(entry_path.read_text(encoding="utf-8"))
+            entries.append((entry["used_at"], entry["bytes"], entry_path.parent))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        oldest = time.time() - self.max_age_days * 86400
+        for used_at, size, entry_dir in entries:
+            if entry_dir == keep:
+                continue
+            if used_at < oldest or total > self.max_mb * 1024**2:
+                shutil.rmtree(entry_dir)
+                total -= size
+                print(f"[Build cache] Evicted {entry_dir.name} ({size / 1024**2:,.1f} MB)")
@@ -1,5 +1,7 @@
 # src/config.py
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, List, Optional
 
 # ---------------------------------------------------------------------
 # Project structure
@@ -13,7 +15,34 @@ PROCESSED_DATA_DIR = DATA_DIR / "processed"
 RAW_JOB_MARKET_PATH = RAW_DATA_DIR / "SGJobData.csv"
 PH1_STRUCTURED_PQ_PATH = PROCESSED_DATA_DIR / "SGJobData_structured.parquet"
 PH1_STRUCTURED_CSV_PATH = PROCESSED_DATA_DIR / "SGJobData_structured.csv"
+PH1_CATEGORY_MEMBERSHIP_PQ_PATH = PROCESSED_DATA_DIR / "SGJobData_category_membership.parquet"
+PH1_CATEGORIES_PQ_PATH = PROCESSED_DATA_DIR / "SGJobData_categories.parquet"
+PH2_CLEANED_PQ_PATH = PROCESSED_DATA_DIR / "SGJobData_clean.parquet"
+# Optional CSV export of the clean dataset (add OutputSpec("csv") to PH2_OUTPUTS)
 PH2_CLEANED_CSV_PATH = PROCESSED_DATA_DIR / "SGJobData_clean.csv"
+# Optional Hive-partitioned copy of the clean dataset (posting_month=.../part-0.parquet)
+PH2_DATASET_DIR = PROCESSED_DATA_DIR / "SGJobData_clean_dataset"
+# Optional cache of normalized titles / company names reused across Phase 2 runs
+PH2_TEXT_CACHE_PATH = PROCESSED_DATA_DIR / "SGJobData_text_cache.parquet"
+# title -> canonical_title lookup table reused across Phase 2 runs
+PH2_TITLE_LOOKUP_PATH = PROCESSED_DATA_DIR / "SGJobData_title_lookup.parquet"
+# Aggregate cube of the dashboard's rows (src/cube.py)
+PH2_CUBE_PQ_PATH = PROCESSED_DATA_DIR / "SGJobData_cube.parquet"
+# Metadata sidecar of the clean dataset (src/dataset_metadata.py): filter
+# values, quantiles and outlier bounds, written next to it as <stem>_meta.json
+PH2_METADATA_PATH = PROCESSED_DATA_DIR / "SGJobData_clean_meta.json"
+
+# Build cache of full Phase 1 / Phase 2 / pipeline runs (src/build_cache.py)
+BUILD_CACHE_DIR = PROCESSED_DATA_DIR / "build_cache"
+# Uncompressed Arrow snapshots of the dashboard's dataset, memory-mapped by
+# the Streamlit app (streamlit_app/utils/data.py)
+DASHBOARD_SNAPSHOT_DIR = PROCESSED_DATA_DIR / "dashboard"
+
+# Incremental runs: manifest of ingested files, per-posting content hashes,
+# and the structured rows added/changed since Phase 2 last ran
+PH1_MANIFEST_PATH = PROCESSED_DATA_DIR / "SGJobData_manifest.json"
+PH1_POSTING_HASHES_PQ_PATH = PROCESSED_DATA_DIR / "SGJobData_posting_hashes.parquet"
+PH1_DELTA_PQ_PATH = PROCESSED_DATA_DIR / "SGJobData_delta.parquet"
 
 REPORTS_DIR = PROJECT_ROOT / "reports"
 FIGURES_DIR = REPORTS_DIR / "figures"
@@ -28,6 +57,7 @@ for d in [RAW_DATA_DIR, PROCESSED_DATA_DIR, REPORTS_DIR, FIGURES_DIR, TABLES_DIR
 # Data schema metadata
 # ---------------------------------------------------------------------
 CATEGORIES_COL = "categories"
+JOB_ID_COL = "metadata_jobPostId"
 
 BOOL_COLS = [
     "metadata_isPostedOnBehalf",
@@ -49,6 +79,224 @@ NUMERIC_COLS = [
     "metadata_repostCount",
 ]
 
+STRING_COLS = [
+    "categories",
+    "employmentTypes",
+    "metadata_jobPostId",
+    "positionLevels",
+    "postedCompany_name",
+    "salary_type",
+    "status_jobStatus",
+    "title",
+]
+
+INT_COLS = [
+    "status_id",
+]
+
+# Low-cardinality text columns, kept as pandas categoricals (Arrow dictionary
+# columns on disk) from the raw read through Phase 2 and the dashboard.
+# A list declares the category set and its order (values are as they look
+# after Phase 2 standardization); None takes the categories from the data.
+# Values outside a declared set are kept and reported.
+CATEGORICAL_COLS: Dict[str, Optional[List[str]]] = {
+    "employmentTypes": [
+        "Full Time",
+        "Part Time",
+        "Permanent",
+        "Contract",
+        "Temporary",
+        "Internship",
+        "Freelance",
+        "Flexi-work",
+    ],
+    "positionLevels": [
+        "Fresh/entry level",
+        "Non-executive",
+        "Junior Executive",
+        "Executive",
+        "Senior Executive",
+        "Professional",
+        "Manager",
+        "Middle Management",
+        "Senior Management",
+    ],
+    "status_jobStatus": ["Open", "Closed", "Re-open"],
+    "salary_type": None,
+    "primary_category": None,
+    "experienceTypes": None,
+    "postedCompany_name": None,
+    "canonical_title": None,
+}
+
+# Raw date strings look like "2023-05-08".
+RAW_DATE_FORMAT = "%Y-%m-%d"
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    """Target type of a raw column after Phase 1."""
+    dtype: str                        # pandas dtype name, e.g. "Int64", "boolean", "category"
+    nullable: bool = True
+    date_format: Optional[str] = None
+
+
+# Full raw column schema. Phase 1 parses the CSV straight into these types;
+# columns not listed here are left to the reader's inference.
+RAW_SCHEMA: Dict[str, ColumnSpec] = {
+    **{c: ColumnSpec("string[pyarrow]") for c in STRING_COLS},
+    **{c: ColumnSpec("boolean") for c in BOOL_COLS},
+    **{c: ColumnSpec("datetime64[ns]", date_format=RAW_DATE_FORMAT) for c in DATE_COLS},
+    **{c: ColumnSpec("Int64") for c in NUMERIC_COLS + INT_COLS},
+    **{c: ColumnSpec("category") for c in STRING_COLS if c in CATEGORICAL_COLS},
+    JOB_ID_COL: ColumnSpec("string[pyarrow]", nullable=False),
+}
+
+# ---------------------------------------------------------------------
+# Ingestion settings
+# ---------------------------------------------------------------------
+# Rows per chunk in streaming mode (run_phase_1_streaming); peak memory
+# scales with this value rather than with the size of the raw file.
+INGEST_CHUNK_SIZE = 250_000
+
+# Sharded ingestion (run_phase_1_sharded): raw exports picked up from a
+# directory, and the number of worker processes (None = one per CPU).
+RAW_SHARD_PATTERN = "*.csv"
+INGEST_WORKERS: Optional[int] = None
+
+# ---------------------------------------------------------------------
+# Output settings
+# ---------------------------------------------------------------------
+@dataclass(frozen=True)
+class OutputSpec:
+    """One output format of a phase."""
+    format: str                        # "parquet", "csv" or "feather"
+    compression: Optional[str] = None  # codec, e.g. "zstd", "snappy", "gzip"; None = format default
+    level: Optional[int] = None        # codec compression level
+
+
+# Formats written by each phase. The first one is written before the phase
+# returns; the others go to a background writer when OUTPUT_BACKGROUND is set.
+PH1_OUTPUTS: List[OutputSpec] = [OutputSpec("parquet"), OutputSpec("csv")]
+# Phase 2 writes typed, zstd-compressed Parquet (with per-row-group column
+# statistics) for the dashboard; CSV is an optional export.
+PH2_OUTPUTS: List[OutputSpec] = [OutputSpec("parquet", "zstd")]
+OUTPUT_BACKGROUND = True
+
+# Partitioned clean dataset (--partitioned): partition columns, outermost
+# first, e.g. ["posting_month", "primary_category"]
+PH2_WRITE_DATASET = False
+PH2_PARTITION_COLS: List[str] = ["posting_month"]
+
+# Keep normalized titles / company names in PH2_TEXT_CACHE_PATH (--text-cache)
+PH2_TEXT_CACHE = False
+
+# Skip full Phase 1 / Phase 2 / pipeline runs whose inputs, settings and
+# code are unchanged, restoring their outputs from BUILD_CACHE_DIR instead
+# (--no-cache forces a run). Entries unused for BUILD_CACHE_MAX_AGE_DAYS are
+# evicted, then the least recently used ones past BUILD_CACHE_MAX_MB.
+BUILD_CACHE = True
+BUILD_CACHE_MAX_AGE_DAYS = 30
+BUILD_CACHE_MAX_MB = 5_000
+
+# DataFrame engine for the Phase 2 row selection (src/backends.py):
+# "pandas", or "polars" for one lazy, multithreaded query (needs polars)
+PH2_BACKEND = "pandas"
+
+# Keep the title -> canonical_title mapping in PH2_TITLE_LOOKUP_PATH
+# (src/title_canonicalization.py); --no-title-lookup recomputes it every run
+PH2_TITLE_LOOKUP = True
+
+# Near-duplicate / repost detection (src/near_duplicates.py): postings in the
+# same block whose titles' token Jaccard similarity reaches the threshold
+# share a duplicate_group_id. Candidate pairs come from MinHash LSH with
+# NEAR_DUP_BANDS bands of NEAR_DUP_ROWS_PER_BAND hashes.
+PH2_NEAR_DUPLICATES = True
+DUPLICATE_GROUP_COL = "duplicate_group_id"
+NEAR_DUP_BLOCK_COLS = ["postedCompany_name", "salary_minimum", "salary_maximum"]
+NEAR_DUP_BANDS = 16
+NEAR_DUP_ROWS_PER_BAND = 4
+NEAR_DUP_THRESHOLD = 0.7
+
+# Data-quality rules (src/quality_rules.py), checked on every Phase 2 run:
+# "flag" adds the quality_flags bitmask column (0 = passes every rule),
+# "drop" removes the rows that fail a rule, "off" skips the checks. Each
+# rule's violation count and up to QUALITY_SAMPLE_SIZE job IDs are appended
+# to QUALITY_REPORT_PATH.
+QUALITY_MODES = ("flag", "drop", "off")
+PH2_QUALITY_MODE = "flag"
+QUALITY_FLAGS_COL = "quality_flags"
+QUALITY_SAMPLE_SIZE = 5
+QUALITY_MAX_YEARS_EXPERIENCE = 30
+
+# Aggregate cube (src/cube.py) written to PH2_CUBE_PQ_PATH at the end of
+# Phase 2: additive measures of the dashboard's rows per combination of
+# CUBE_DIMENSIONS. salary_bin is the lower edge of the average_salary bin
+# (CUBE_SALARY_BIN_EDGES, SGD; the last bin is open-ended), experience_years
+# the minimum years of experience; both are -1 where missing. Durations
+# count towards the mean only within [0, CUBE_MAX_DURATION_DAYS].
+PH2_CUBE = True
+CUBE_DIMENSIONS: List[str] = [
+    "posting_month",
+    "primary_category",
+    "positionLevels",
+    "employmentTypes",
+    "experienceTypes",
+    "salary_bin",
+    "experience_years",
+]
+CUBE_SALARY_BIN_EDGES: List[int] = [*range(0, 21_000, 1_000), 25_000, 30_000, 50_000]
+CUBE_MAX_DURATION_DAYS = 180
+
+# Dashboard rows (src/cube.py dashboard_rows): average_salary outside these
+# quantiles of the clean dataset is an outlier
+OUTLIER_SALARY_QUANTILES = (0.01, 0.99)
+
+# Metadata sidecar (src/dataset_metadata.py): distinct values and counts of
+# the sidebar's filter columns, and quantiles of the numeric columns, for
+# the clean dataset and for its dashboard rows
+METADATA_VALUE_COLS: List[str] = ["primary_category", "experienceTypes", "positionLevels", "employmentTypes"]
+METADATA_QUANTILE_COLS: List[str] = ["average_salary", "minimumYearsExperience"]
+METADATA_QUANTILES: List[float] = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+
+# Low-memory cleaning (--low-memory, clean_and_transform_low_memory): rows
+# are selected once with a combined mask, column by column. The budget (MB,
+# None = unchecked) caps the estimated memory the cleaning adds.
+PH2_LOW_MEMORY = False
+PH2_MEMORY_BUDGET_MB: Optional[float] = None
+
+# Fused pipeline (python -m src.pipeline): intermediate outputs written
+# besides the clean dataset ("structured", "categories"), and rows per chunk
+# (None = whole file in memory)
+PIPELINE_CHECKPOINTS: List[str] = []
+PIPELINE_CHUNK_SIZE: Optional[int] = None
+
+# One JSON line per written output: path, format, codec, size, write time
+OUTPUT_LOG_PATH = REPORTS_DIR / "output_log.jsonl"
+
+# One JSON line per pipeline stage and run: wall time, peak memory delta,
+# rows and columns in / out (src/instrumentation.py)
+RUN_REPORT_PATH = REPORTS_DIR / "run_report.jsonl"
+
+# One JSON line per data-quality rule and Phase 2 run: violations and
+# sample job IDs (src/quality_rules.py)
+QUALITY_REPORT_PATH = REPORTS_DIR / "quality_report.jsonl"
+
+# End-to-end benchmarks (benchmarks/run_benchmarks.py): synthetic raw files
+# are cached in BENCHMARK_DATA_DIR, one JSON line per stage and run is
+# appended to BENCHMARK_RESULTS_PATH
+BENCHMARK_DATA_DIR = DATA_DIR / "benchmarks"
+BENCHMARK_RESULTS_PATH = REPORTS_DIR / "benchmarks.jsonl"
+
+# ---------------------------------------------------------------------
+# Dashboard settings
+# ---------------------------------------------------------------------
+# Filtered frames shared across pages and sessions, keyed on the sidebar
+# selection (streamlit_app/utils/filter_cache.py): the least recently used
+# are evicted beyond this many frames or bytes
+DASHBOARD_FILTER_CACHE_ENTRIES = 32
+DASHBOARD_FILTER_CACHE_BYTES = 1024 * 1024 * 1024
+
 # ---------------------------------------------------------------------
 # Convenience helpers
 # ---------------------------------------------------------------------
@@ -0,0 +1,339 @@
+# src/cube.py
+# Aggregate (OLAP) cube of the dashboard's rows, materialized at the end of
+# Phase 2: one row per combination of CUBE_DIMENSIONS values present, with
+# additive measures (postings, vacancies, applications, views, salary and
+# duration sums). Sums of sums are exact, so any filter on dimension values
+# and any roll-up to fewer dimensions is answered from the cube (query_cube)
+# instead of the rows. Unique postings (jobs: near-duplicate groups, else
+# job IDs) are additive only over the postings whose rows all fall in one
+# cell; the few whose rows span several cells get cells of their own, keyed
+# by the posting (SPAN_COL), and are counted once per result row.
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.config import (
+    CUBE_DIMENSIONS,
+    CUBE_MAX_DURATION_DAYS,
+    CUBE_SALARY_BIN_EDGES,
+    DUPLICATE_GROUP_COL,
+    JOB_ID_COL,
+    OUTLIER_SALARY_QUANTILES,
+    OutputSpec,
+    PH2_CLEANED_PQ_PATH,
+    PH2_CUBE_PQ_PATH,
+    QUALITY_FLAGS_COL,
+    QUALITY_MAX_YEARS_EXPERIENCE,
+)
+from src.outputs import read_table, to_arrow_table, wait_for_outputs, write_output
+
+# postings: rows. jobs: unique postings of the cells without a SPAN_COL.
+# salary_* sum over rows with an average_salary, duration_* over rows with a
+# posting_duration within [0, CUBE_MAX_DURATION_DAYS].
+CUBE_MEASURES: List[str] = [
+    "postings",
+    "jobs",
+    "vacancies",
+    "applications",
+    "views",
+    "salary_count",
+    "salary_sum",
+    "salary_sumsq",
+    "duration_count",
+    "duration_sum",
+]
+
+_TOTALS = {
+    "vacancies": "numberOfVacancies",
+    "applications": "metadata_totalNumberJobApplication",
+    "views": "metadata_totalNumberOfView",
+}
+
+# Posting key of the cells of a posting whose rows span several cells
+# (missing in the other cells)
+SPAN_COL = "posting_span"
+
+# Clean dataset columns the dashboard rows and the cube are computed from
+SOURCE_COLS: List[str] = [
+    JOB_ID_COL,
+    DUPLICATE_GROUP_COL,
+    *[dim for dim in CUBE_DIMENSIONS if dim not in ("salary_bin", "experience_years")],
+    "average_salary",
+    "minimumYearsExperience",
+    "posting_duration",
+    *_TOTALS.values(),
+    QUALITY_FLAGS_COL,
+]
+
+
+def _floats(values: pd.Series) -> np.ndarray:
+    return pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def salary_bounds(df: pd.DataFrame) -> Tuple[float, float]:
+    """average_salary's OUTLIER_SALARY_QUANTILES (1st and 99th percentile; NaN without rows)."""
+    if not len(df):
+        return np.nan, np.nan
+    low, high = np.nanquantile(_floats(df["average_salary"]), OUTLIER_SALARY_QUANTILES)
+    return float(low), float(high)
+
+
+def dashboard_rows(df: pd.DataFrame, bounds: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
+    """
+    The rows the dashboard shows: average_salary within its 1st–99th
+    percentile (`bounds`, e.g. from the metadata sidecar, or computed from
+    `df`), and no data-quality rule failed (or, without the quality_flags
+    column, 0–30 years of experience).
+    """
+    if "average_salary" not in df.columns:
+        return df
+    salary = _floats(df["average_salary"])
+    low, high = salary_bounds(df) if bounds is None else bounds
+    keep = (salary >= low) & (salary <= high)
+    if QUALITY_FLAGS_COL in df.columns:
+        keep &= df[QUALITY_FLAGS_COL].to_numpy() == 0
+    elif "minimumYearsExperience" in df.columns:
+        experience = _floats(df["minimumYearsExperience"])
+        keep &= (experience >= 0) & (experience <= QUALITY_MAX_YEARS_EXPERIENCE)
+    return df[keep]
+
+
+def salary_bins(salary: pd.Series) -> pd.Series:
+    """Lower edge of each salary's CUBE_SALARY_BIN_EDGES bin (-1 if missing or below the first)."""
+    values = _floats(salary)
+    edges = np.asarray(CUBE_SALARY_BIN_EDGES)
+    idx = np.searchsorted(edges, values, side="right") - 1
+    bins = np.where(np.isnan(values) | (idx < 0), -1, edges[np.maximum(idx, 0)])
+    return pd.Series(bins.astype(np.int32), index=salary.index, name="salary_bin")
+
+
+def experience_years(experience: pd.Series) -> pd.Series:
+    """Whole years of minimum experience (-1 if missing)."""
+    values = np.floor(_floats(experience))
+    years = np.where(np.isnan(values), -1, values)
+    return pd.Series(years.astype(np.int16), index=experience.index, name="experience_years")
+
+
+def _dimension(df: pd.DataFrame, dim: str) -> Optional[pd.Series]:
+    if dim == "salary_bin":
+        return salary_bins(df["average_salary"]) if "average_salary" in df.columns else None
+    if dim == "experience_years":
+        if "minimumYearsExperience" not in df.columns:
+            return None
+        return experience_years(df["minimumYearsExperience"])
+    return df[dim] if dim in df.columns else None
+
+
+def _measures(df: pd.DataFrame) -> pd.DataFrame:
+    """Each row's contribution to the measures."""
+    n_rows = len(df)
+    measures = {"postings": np.ones(n_rows, dtype=np.int64)}
+    for measure, col in _TOTALS.items():
+        measures[measure] = (
+            np.nan_to_num(_floats(df[col])).astype(np.int64)
+            if col in df.columns
+            else np.zeros(n_rows, dtype=np.int64)
+        )
+
+    salary = _floats(df["average_salary"]) if "average_salary" in df.columns else np.full(n_rows, np.nan)
+    has_salary = ~np.isnan(salary)
+    salary = np.where(has_salary, salary, 0.0)
+    measures.update(salary_count=has_salary.astype(np.int64), salary_sum=salary, salary_sumsq=salary**2)
+
+    duration = _floats(df["posting_duration"]) if "posting_duration" in df.columns else np.full(n_rows, np.nan)
+    in_range = (duration >= 0) & (duration <= CUBE_MAX_DURATION_DAYS)
+    measures.update(duration_count=in_range.astype(np.int64), duration_sum=np.where(in_range, duration, 0.0))
+    return pd.DataFrame(measures, index=df.index, copy=False)
+
+
+def _posting_spans(df: pd.DataFrame, dims: List[pd.Series]) -> Tuple[pd.Series, np.ndarray]:
+    """
+    SPAN_COL of each row (its posting key if the posting's rows fall in
+    several cells, else missing) and its jobs measure (1 on the first row
+    of each other posting, else 0).
+    """
+    key_col = DUPLICATE_GROUP_COL if DUPLICATE_GROUP_COL in df.columns else JOB_ID_COL
+    if key_col not in df.columns:
+        # Without a posting key every row is a posting of its own
+        span = pd.Series(pd.NA, index=df.index, dtype="string", name=SPAN_COL)
+        return span, np.ones(len(df), dtype=np.int64)
+    key = df[key_col].astype("string")
+    cell = df.groupby(dims, observed=True, dropna=False, sort=False).ngroup()
+    spans = (cell.groupby(key, dropna=True).transform("nunique") > 1).to_numpy()
+    first = (~key.duplicated() & key.notna()).to_numpy()
+    return key.where(spans).rename(SPAN_COL), (first & ~spans).astype(np.int64)
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sums of the measures of `df` per combination of dimension values and
+    SPAN_COL (dimensions whose columns are absent are left out; missing
+    values are kept as a value of their own).
+    """
+    dims = [s.rename(dim) for dim in CUBE_DIMENSIONS if (s := _dimension(df, dim)) is not None]
+    span, jobs = _posting_spans(df, dims)
+    measures = _measures(df)
+    measures.insert(1, "jobs", jobs)
+    return (
+        measures
+        .groupby([*dims, span], observed=True, dropna=False, sort=True)
+        .sum()
+        .reset_index()
+    )
+
+
+def rollup(cube: pd.DataFrame, dims: Sequence[str]) -> pd.DataFrame:
+    """
+    The cube over `dims` only: fewer cells answering the same queries on
+    those dimensions (missing values are kept as a value of their own).
+    Text dimensions become categoricals, so queries group on their codes.
+    """
+    rolled = (
+        cube.groupby([*dims, SPAN_COL], observed=True, dropna=False, sort=True)[CUBE_MEASURES]
+        .sum()
+        .reset_index()
+    )
+    text = [
+        dim
+        for dim in dims
+        if pd.api.types.is_string_dtype(rolled[dim]) and not isinstance(rolled[dim].dtype, pd.CategoricalDtype)
+    ]
+    return rolled.astype(dict.fromkeys(text, "category"))
+
+
+def _with_derived(totals: Dict[str, object]) -> pd.DataFrame:
+    """Rolled-up measures ({column: values}) with salary_mean, salary_std (sample) and duration_mean."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n = np.asarray(totals["salary_count"], dtype="float64")
+        mean = np.where(n > 0, totals["salary_sum"] / n, np.nan)
+        var = (totals["salary_sumsq"] - n * mean**2) / (n - 1)
+        std = np.where(n > 1, np.sqrt(np.maximum(var, 0)), np.nan)
+        days = np.asarray(totals["duration_count"], dtype="float64")
+        duration = np.where(days > 0, totals["duration_sum"] / days, np.nan)
+    # One frame built at once (inserting columns one by one costs more than the roll-up)
+    derived = {"salary_mean": mean, "salary_std": std, "duration_mean": duration}
+    return pd.DataFrame({**totals, **derived}, copy=False)
+
+
+def _matches(values: pd.Series, value) -> np.ndarray:
+    """Mask of `values` equal to `value` (or in it, if a list of values), on the codes of a categorical."""
+    wanted = list(value) if isinstance(value, (list, tuple, set, pd.Index, np.ndarray)) else [value]
+    if isinstance(values.dtype, pd.CategoricalDtype) and not pd.isna(wanted).any():
+        codes = values.dtype.categories.get_indexer(wanted)
+        return np.isin(values.cat.codes.to_numpy(), codes[codes >= 0])
+    return values.isin(wanted).to_numpy()
+
+
+def _codes(values: pd.Series) -> Tuple[np.ndarray, object]:
+    """Codes of `values` in sorted order (-1 if missing) and the dtype or values they map back to."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.dtype
+    return pd.factorize(values, sort=True)
+
+
+def _result_rows(
+    cube: pd.DataFrame, by: Sequence[str], keep: np.ndarray
+) -> Tuple[np.ndarray, Dict[str, object]]:
+    """
+    Result row of each cell (-1 if not kept or a `by` value is missing), in
+    the order of a sorted groupby, and the `by` values of each result row.
+    """
+    if not by:
+        return np.where(keep, 0, -1), {}
+    codes, levels = zip(*(_codes(cube[dim]) for dim in by))
+    categorical = [isinstance(level, pd.CategoricalDtype) for level in levels]
+    shape = [len(level.categories) if cat else len(level) for level, cat in zip(levels, categorical)]
+    valid = np.logical_and.reduce([keep, *(code >= 0 for code in codes)])
+    flat = np.ravel_multi_index([code[valid] for code in codes], shape)
+    groups, inverse = np.unique(flat, return_inverse=True)
+    rows = np.full(len(cube), -1, dtype=np.int64)
+    rows[valid] = inverse
+    keys = {}
+    for dim, key, level, cat in zip(by, np.unravel_index(groups, shape), levels, categorical):
+        keys[dim] = pd.Categorical.from_codes(key, dtype=level) if cat else level.take(key)
+    return rows, keys
+
+
+def query_cube(
+    cube: pd.DataFrame, by: Sequence[str] = (), where: Optional[Dict[str, object]] = None
+) -> pd.DataFrame:
+    """
+    Roll the cube up to the dimensions `by` (the grand total if empty) over
+    the cells matching `where`, {dimension: value or list of values}.
+    Returns the summed measures with salary_mean, salary_std and
+    duration_mean; rows with a missing value of a `by` dimension are left
+    out, as in a groupby of the rows. jobs counts each posting once per
+    result row, as a nunique of the rows' posting keys.
+
+    Cells are grouped on the dimensions' codes and summed with bincount: a
+    page runs several queries per rerun, and on a cube of some thousand
+    cells DataFrame filtering and groupby overheads cost more than the sums.
+    """
+    keep = np.ones(len(cube), dtype=bool)
+    for dim, value in (where or {}).items():
+        keep &= _matches(cube[dim], value)
+    rows, totals = _result_rows(cube, by, keep)
+    n_rows = len(next(iter(totals.values()))) if by else 1
+    cells = np.flatnonzero(rows >= 0)
+    cell_rows = rows[cells]
+
+    jobs = cube["jobs"].to_numpy()
+    span_cells = np.flatnonzero(cube[SPAN_COL].notna().to_numpy() & (rows >= 0))
+    if len(span_cells):
+        # A posting spanning several cells counts in the first of its cells per result row
+        posting = pd.factorize(cube[SPAN_COL].take(span_cells))[0].astype(np.int64)
+        _, first = np.unique(posting * n_rows + rows[span_cells], return_index=True)
+        jobs = jobs.copy()
+        jobs[span_cells] = 0
+        jobs[span_cells[first]] = 1
+
+    for measure in CUBE_MEASURES:
+        values = (jobs if measure == "jobs" else cube[measure].to_numpy()).take(cells)
+        sums = np.bincount(cell_rows, weights=values, minlength=n_rows)
+        totals[measure] = sums.astype(values.dtype) if values.dtype.kind in "iu" else sums
+    return _with_derived(totals)
+
+
+def salary_histogram(cube: pd.DataFrame, where: Optional[Dict[str, object]] = None) -> pd.DataFrame:
+    """Postings per CUBE_SALARY_BIN_EDGES bin: salary_bin (lower edge), salary_bin_end, postings."""
+    hist = query_cube(cube, ["salary_bin"], where)
+    hist = hist[hist["salary_bin"] >= 0][["salary_bin", "postings"]].reset_index(drop=True)
+    ends = dict(zip(CUBE_SALARY_BIN_EDGES, [*CUBE_SALARY_BIN_EDGES[1:], np.inf]))
+    hist.insert(1, "salary_bin_end", hist["salary_bin"].map(ends))
+    return hist
+
+
+def write_cube(cube: pd.DataFrame, path: Path = PH2_CUBE_PQ_PATH) -> None:
+    write_output(to_arrow_table(cube), path, OutputSpec("parquet", "zstd"), "Phase 2")
+
+
+def load_cube(path: Path = PH2_CUBE_PQ_PATH) -> pd.DataFrame:
+    """The cube written by Phase 2 (dimension columns keep their Phase 2 dtypes)."""
+    if not path.exists():
+        raise FileNotFoundError(f"Cube not found: {path}")
+    return read_table(path).to_pandas()
+
+
+def materialize_cube(
+    df: Optional[pd.DataFrame] = None,
+    path: Path = PH2_CLEANED_PQ_PATH,
+    out: Path = PH2_CUBE_PQ_PATH,
+) -> pd.DataFrame:
+    """
+    Build the cube of the dashboard rows of the clean frame `df` (read from
+    the clean Parquet output at `path` if None) and write it to `out`.
+    """
+    if df is None:
+        wait_for_outputs()
+        names = set(pq.read_schema(path).names)
+        df = read_table(path, [col for col in SOURCE_COLS if col in names]).to_pandas()
+    else:
+        df = df[[col for col in SOURCE_COLS if col in df.columns]]
+    rows = dashboard_rows(df)
+    cube = build_cube(rows)
+    print(f"[Phase 2] Cube: {len(cube):,} cells over {len(rows):,} dashboard rows")
+    write_cube(cube, out)
+    return cube
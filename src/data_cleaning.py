@@ -1,92 +1,155 @@
+import argparse
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
-from .config import PROCESSED_DATA_DIR, PH1_STRUCTURED_PQ_PATH, PH2_CLEANED_CSV_PATH
+import pyarrow as pa
+import pyarrow.compute as pc
+from .config import (
+    PROCESSED_DATA_DIR,
+    PH1_STRUCTURED_PQ_PATH,
+    PH1_DELTA_PQ_PATH,
+    PH2_CLEANED_PQ_PATH,
+    PH2_CUBE,
+    PH2_CUBE_PQ_PATH,
+    PH2_METADATA_PATH,
+    PH2_OUTPUTS,
+    PH2_DATASET_DIR,
+    PH2_PARTITION_COLS,
+    PH2_TEXT_CACHE,
+    PH2_WRITE_DATASET,
+    PH2_LOW_MEMORY,
+    PH2_MEMORY_BUDGET_MB,
+    PH2_NEAR_DUPLICATES,
+    PH2_TITLE_LOOKUP,
+    PH2_BACKEND,
+    PH2_QUALITY_MODE,
+    QUALITY_MODES,
+    BUILD_CACHE,
+    PH2_TITLE_LOOKUP_PATH,
+    DUPLICATE_GROUP_COL,
+    JOB_ID_COL,
+    CATEGORICAL_COLS,
+    OutputSpec,
+)
+from .data_ingestion import map_categories, normalize_categorical_columns
+from .dataset import merge_dataset_delta, write_partitioned_dataset
+from .instrumentation import RunReport
+from .outputs import (
+    FORMAT_SUFFIXES,
+    find_output,
+    from_arrow_table,
+    merge_delta,
+    output_path,
+    output_paths,
+    parse_output_specs,
+    read_table,
+    read_schema,
+    replace_csv_rows,
+    save_outputs,
+    to_arrow_table,
+    wait_for_outputs,
+    write_output,
+)
+from .backends import BACKENDS, row_mask
+from .build_cache import BuildCache
+from .cube import materialize_cube
+from .dataset_metadata import materialize_metadata
+from .near_duplicates import SOURCE_COLS as GROUP_SOURCE_COLS, assign_duplicate_groups, regroup_with_saved
+from .quality_rules import apply_quality_rules
+from .manifest import PHASE2_DELTA, PHASE2_SYNCED, load_manifest, mark_phase2
+from .text_normalization import TextCache, normalize_text_column
+from .title_canonicalization import TitleLookup, canonical_title_column
 
 def load_structured_data(path: Path = PH1_STRUCTURED_PQ_PATH) -> pd.DataFrame:
-    """Load Phase 1 structured dataset."""
+    """Load Phase 1 structured dataset (Parquet, or Feather if that is all Phase 1 wrote)."""
+    wait_for_outputs()  # Phase 1 may have run in this process
+    if not path.exists() and path.with_suffix(".feather").exists():
+        return pd.read_feather(path.with_suffix(".feather"))
     if not path.exists():
         raise FileNotFoundError(f"Structured dataset not found: {path}")
     return pd.read_parquet(path)
 
 
-def clean_and_transform(df: pd.DataFrame) -> pd.DataFrame:
-    """Perform Phase 2 cleaning and transformation."""
-    print(f"[Phase 2.1] Before cleaning: No. of rows {df.shape[0]}")
+def load_clean_data(
+    path: Path = PH2_CLEANED_PQ_PATH, columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Load the Phase 2 clean dataset (or some of its columns) with the dtypes
+    Phase 2 produced: dates, nullable integers and booleans, Arrow strings
+    and categoricals.
 
-    # --- Remove duplicates based on job ID ---
-    id_col = "metadata_jobPostId"
-    if id_col in df.columns:
-        before = len(df)
-        df = df.drop_duplicates(subset=[id_col])
-        print(f"[Phase 2.2] Dropped {before - len(df)} duplicate rows based on '{id_col}'")
+    Reads the Parquet or Feather output directly. A CSV path (the optional
+    export) is parsed instead, with only the categoricals restored.
+    """
+    wait_for_outputs()  # Phase 2 may have run in this process
+    if not path.exists():
+        raise FileNotFoundError(f"Clean dataset not found: {path}")
+    if path.suffix in (FORMAT_SUFFIXES["parquet"], FORMAT_SUFFIXES["feather"]):
+        # The pandas metadata written by Phase 2 restores its dtypes
+        df = read_table(path, columns).to_pandas()
     else:
-        print(f"[Phase 2.2] Column '{id_col}' not found — no duplicates dropped.")
+        df = pd.read_csv(
+            path,
+            usecols=columns,
+            dtype={col: "category" for col in CATEGORICAL_COLS},
+        )
+    # Fix the declared category sets and their order
+    return normalize_categorical_columns(df)
 
-    # --- Remove invalid rows ---
-    df = df[df["title"].notna()]  # must have title
-    print(f"[Phase 2.3] After dropping NaN in title: {df.shape[0]} rows")
 
-    if "salary_minimum" in df and "salary_maximum" in df:
-        df = df[(df["salary_minimum"] > 0) & (df["salary_maximum"] > 0)]
-        print(f"[Phase 2.4] After dropping -ve Min/Max salary: {df.shape[0]} rows")
-
-    # --- Drop all-NaN columns ---
-    nan_cols = df.columns[df.isna().all()].tolist()
-    if nan_cols:
-        print(f"[Phase 2.5] Dropping {len(nan_cols)} all-NaN columns: {nan_cols}")
-        df = df.dropna(axis=1, how="all")
-    else:
-        print("[Phase 2.5] No all-NaN columns found.")
-    
-    # --- Drop original JSON categories column if still present ---
-    if "categories" in df.columns:
-        df = df.drop(columns=["categories"])
-        print("[Phase 2.6] Dropping original categories JSON column.")
+def count_categories(categories: pd.Series) -> pd.Series:
+    """
+    Number of categories per posting, 0 where there are none.
 
-    # --- Fill missing numeric values ---
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    df[numeric_cols] = df[numeric_cols].fillna(0)
-    print("[Phase 2.7] Fill na with 0")
-
-    # --- Standardize employmentTypes ---
-    if "employmentTypes" in df.columns:
-        df["employmentTypes"] = (
-            df["employmentTypes"]
-            .str.strip()
-            .str.lower()
-            .replace(
-                {
-                    "full-time": "Full Time",
-                    "full time": "Full Time",
-                    "permanent": "Permanent",
-                    "contract": "Contract",
-                    "temp": "Temporary",
-                    "temporary": "Temporary",
-                    "internship": "Internship",
-                    "part time": "Part Time",
-                }
-            )
-        )
+    Works on the Arrow list column produced by Phase 1 as well as on the
+    object column of arrays that pd.read_parquet returns for it.
+    """
+    if isinstance(categories.dtype, pd.ArrowDtype):
+        # .list.len() returns a fresh RangeIndex; keep the frame's index
+        counts = pd.Series(categories.list.len().to_numpy(), index=categories.index)
+    else:
+        counts = categories.str.len()
+    return counts.fillna(0).astype("int64")
 
-    # --- Normalize text fields (Title Case) ---
-    def normalize_text(s):
-        if isinstance(s, str):
-            s = s.strip().lower()
-            # Ensure acronyms like 'R&D' or 'IT' stay uppercase
-            return " ".join([w.capitalize() if len(w) > 1 else w.upper() for w in s.split()])
-        return s
 
-    if "postedCompany_name" in df.columns:
-        df["postedCompany_name"] = df["postedCompany_name"].apply(normalize_text)
+def _standardize_employment_types(values: pd.Series) -> pd.Series:
+    """Standardize employmentTypes spellings (once per category)."""
+    return map_categories(
+        values,
+        lambda s: s.str.strip()
+        .str.lower()
+        .replace(
+            {
+                "full-time": "Full Time",
+                "full time": "Full Time",
+                "permanent": "Permanent",
+                "contract": "Contract",
+                "temp": "Temporary",
+                "temporary": "Temporary",
+                "internship": "Internship",
+                "part time": "Part Time",
+                "freelance": "Freelance",
+                "flexi-work": "Flexi-work",
+            }
+        ),
+    )
 
-    if "title" in df.columns:
-        df["title"] = df["title"].apply(normalize_text)
 
-    print("[Phase 2.8] Normalized 'postedCompany_name' and 'title' to Title Case")
+# Columns add_derived_columns writes, and the columns they are computed from
+DERIVED_COLS: List[str] = ["average_salary", "posting_duration", "num_categories", "posting_month"]
+DERIVED_INPUT_COLS: List[str] = [
+    "salary_minimum",
+    "salary_maximum",
+    "metadata_expiryDate",
+    "metadata_originalPostingDate",
+    "metadata_newPostingDate",
+    "categories_list",
+]
 
 
-    # --- Derive new columns ---
+def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """average_salary, posting_duration, num_categories and posting_month."""
     if {"salary_minimum", "salary_maximum"}.issubset(df.columns):
         df["average_salary"] = (df["salary_minimum"] + df["salary_maximum"]) / 2
 
@@ -94,14 +157,14 @@ def clean_and_transform(df: pd.DataFrame) -> pd.DataFrame:
         "metadata_expiryDate",
         "metadata_originalPostingDate",
     }.issubset(df.columns):
+        # float64 whether or not any dates are missing, so the column has the
+        # same type on any subset of rows (e.g. an incremental delta)
         df["posting_duration"] = (
             df["metadata_expiryDate"] - df["metadata_originalPostingDate"]
-        ).dt.days
+        ).dt.days.astype("float64")
 
     if "categories_list" in df.columns:
-        df["num_categories"] = df["categories_list"].apply(
-            lambda x: len(x) if isinstance(x, list) else 0
-        )
+        df["num_categories"] = count_categories(df["categories_list"])
 
     # --- Extract posting month for trend analysis ---
     date_col = (
@@ -111,23 +174,612 @@ def clean_and_transform(df: pd.DataFrame) -> pd.DataFrame:
     )
     if date_col in df.columns:
         df["posting_month"] = df[date_col].dt.to_period("M").astype(str)
+    return df
+
+
+def clean_and_transform(
+    df: pd.DataFrame,
+    text_cache: Optional[TextCache] = None,
+    report: Optional[RunReport] = None,
+    title_lookup: Optional[TitleLookup] = None,
+    backend: str = "pandas",
+    quality_mode: str = PH2_QUALITY_MODE,
+    drop_empty_columns: bool = True,
+) -> pd.DataFrame:
+    """
+    Perform Phase 2 cleaning and transformation. Normalized titles and
+    company names are looked up in / added to `text_cache` when given, and
+    canonical titles in / to `title_lookup`. Rows failing a data-quality
+    rule are flagged or dropped as `quality_mode` says (see
+    src/quality_rules.py). With drop_empty_columns=False the columns that
+    are all-NaN in the kept rows are kept (numeric ones filled with 0), for
+    callers that clean part of a dataset and decide the drops over all of it.
+
+    Each step is timed and measured as a named stage of `report` (see
+    src/instrumentation.py); the caller writes the report.
+
+    With a backend other than "pandas" (see src/backends.py) the rows are
+    selected by that engine in one pass, as in
+    clean_and_transform_low_memory; the result is the same. Only the row
+    selection depends on the backend; every later step is shared.
+    """
+    if backend != "pandas":
+        return clean_and_transform_low_memory(
+            df,
+            text_cache,
+            report,
+            None,
+            title_lookup=title_lookup,
+            backend=backend,
+            quality_mode=quality_mode,
+            drop_empty_columns=drop_empty_columns,
+        )
+    if report is None:
+        report = RunReport("Phase 2")
+
+    # --- Remove duplicates based on job ID ---
+    if JOB_ID_COL in df.columns:
+        df = report.run("dedup", lambda d: d.drop_duplicates(subset=[JOB_ID_COL]), df)
+
+    # --- Remove invalid rows ---
+    df = report.run("title_filter", lambda d: d[d["title"].notna()], df)  # must have title
+
+    if "salary_minimum" in df and "salary_maximum" in df:
+        df = report.run(
+            "salary_filter",
+            lambda d: d[(d["salary_minimum"] > 0) & (d["salary_maximum"] > 0)],
+            df,
+        )
+
+    # --- Drop all-NaN columns, and the original JSON categories column ---
+    if drop_empty_columns:
+        df = report.run("drop_all_nan_columns", lambda d: d.dropna(axis=1, how="all"), df)
+    if "categories" in df.columns:
+        df = report.run("drop_categories_json", lambda d: d.drop(columns=["categories"]), df)
+
+    # --- Fill missing numeric values ---
+    with report.stage("fillna_numeric", df):
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        df[numeric_cols] = df[numeric_cols].fillna(0)
+
+    return _transform_columns(df, text_cache, report, title_lookup, quality_mode)
+
+
+def _transform_columns(
+    df: pd.DataFrame,
+    text_cache: Optional[TextCache],
+    report: RunReport,
+    title_lookup: Optional[TitleLookup] = None,
+    quality_mode: str = PH2_QUALITY_MODE,
+) -> pd.DataFrame:
+    """The column steps of Phase 2, after rows and columns are selected."""
+    # --- Data-quality rules: report violations, then drop or flag the rows ---
+    if quality_mode != "off":
+        with report.stage("quality_rules", df) as metrics:
+            df = apply_quality_rules(df, quality_mode, run_id=report.run_id)
+            metrics.output(df)
+
+    if "employmentTypes" in df.columns:
+        with report.stage("employment_types", df):
+            df["employmentTypes"] = _standardize_employment_types(df["employmentTypes"])
+
+    # --- Normalize text fields (Title Case, once per distinct value) ---
+    with report.stage("normalize_text", df):
+        if "postedCompany_name" in df.columns:
+            df["postedCompany_name"] = map_categories(
+                df["postedCompany_name"], lambda s: normalize_text_column(s, text_cache)
+            )
+        if "title" in df.columns:
+            df["title"] = normalize_text_column(df["title"], text_cache)
+
+    # --- Canonical job titles (noise stripped, mapped to a canonical role) ---
+    if "title" in df.columns:
+        with report.stage("canonical_titles", df) as metrics:
+            df["canonical_title"] = canonical_title_column(df["title"], title_lookup)
+            metrics.output(df)
+
+    # --- Group reposts (same company and salary range, near-identical title) ---
+    if PH2_NEAR_DUPLICATES and JOB_ID_COL in df.columns and "title" in df.columns:
+        with report.stage("near_duplicates", df) as metrics:
+            df[DUPLICATE_GROUP_COL] = assign_duplicate_groups(df)
+            metrics.output(df)
+
+    df = report.run("derived_columns", add_derived_columns, df)
+
+    # --- Low-cardinality text columns as categoricals ---
+    df = report.run("categoricals", normalize_categorical_columns, df)
 
     print(f"[Phase 2] Finished transformation: {df.shape[0]} rows × {df.shape[1]} cols")
     return df
 
 
-def save_clean_data(df: pd.DataFrame, path: Path = PH2_CLEANED_CSV_PATH) -> None:
+def _column_mb(values: pd.Series) -> float:
+    return values.memory_usage(index=False, deep=False) / 1024**2
+
+
+def clean_and_transform_low_memory(
+    df: pd.DataFrame,
+    text_cache: Optional[TextCache] = None,
+    report: Optional[RunReport] = None,
+    memory_budget_mb: Optional[float] = PH2_MEMORY_BUDGET_MB,
+    consume_input: bool = False,
+    title_lookup: Optional[TitleLookup] = None,
+    backend: str = "pandas",
+    quality_mode: str = PH2_QUALITY_MODE,
+    drop_empty_columns: bool = True,
+) -> pd.DataFrame:
+    """
+    Same result as clean_and_transform, with the input rows selected once.
+
+    The row filters (job ID dedup, title, salaries) are combined into one
+    mask, computed by `backend` (src/backends.py), and the kept rows are taken column by column: all-NaN columns are
+    skipped (unless drop_empty_columns=False), numeric NaNs are filled on
+    the taken column and no intermediate frame is built. With consume_input=True each input column is removed
+    from `df` once taken, so its memory is released as the output grows.
+
+    Extra memory is then about the output plus one column, or one column
+    when consuming the input. If that estimate exceeds `memory_budget_mb`,
+    MemoryError is raised before any column is taken.
+    """
+    if report is None:
+        report = RunReport("Phase 2")
+
+    with report.stage("row_mask", df) as metrics:
+        keep = row_mask(df, backend)
+        positions = np.flatnonzero(keep)
+        metrics.output(rows=len(positions))
+
+    columns = [col for col in df.columns if col != "categories"]
+    if memory_budget_mb is not None and len(df):
+        widest = max((_column_mb(df[col]) for col in columns), default=0.0)
+        output = sum(_column_mb(df[col]) for col in columns) * len(positions) / len(df)
+        needed = widest if consume_input else output + widest
+        if needed > memory_budget_mb:
+            raise MemoryError(
+                f"[Phase 2] Low-memory cleaning needs about {needed:,.0f} MB "
+                f"(budget {memory_budget_mb:,.0f} MB)"
+                + ("" if consume_input else "; consuming the input would need about "
+                   f"{widest:,.0f} MB")
+            )
+
+    with report.stage("select", df) as metrics:
+        # Same numeric columns as select_dtypes on the whole frame
+        numeric_cols = set(df.iloc[:0].select_dtypes(include=[np.number]).columns)
+        selected = {}
+        for col in columns:
+            values = df.pop(col) if consume_input else df[col]
+            taken = values.take(positions)
+            del values
+            if drop_empty_columns and taken.isna().all():
+                continue  # all-NaN column
+            if col in numeric_cols:
+                taken = taken.fillna(0)
+            selected[col] = taken
+        if consume_input and "categories" in df.columns:
+            del df["categories"]
+        df = pd.DataFrame(selected, copy=False)
+        del selected
+        metrics.output(df)
+
+    return _transform_columns(df, text_cache, report, title_lookup, quality_mode)
+
+
+def clean_outputs(
+    outputs: List[OutputSpec] = PH2_OUTPUTS, partitioned: bool = PH2_WRITE_DATASET
+) -> List[Path]:
+    """Files (and the dataset directory) a full Phase 2 run writes."""
+    paths = output_paths({"parquet": PH2_CLEANED_PQ_PATH}, outputs)
+    if PH2_CUBE:
+        paths.append(PH2_CUBE_PQ_PATH)
+    paths.append(PH2_METADATA_PATH)
+    return [*paths, PH2_DATASET_DIR] if partitioned else paths
+
+
+def save_clean_data(
+    df: pd.DataFrame,
+    path: Path = PH2_CLEANED_PQ_PATH,
+    outputs: List[OutputSpec] = PH2_OUTPUTS,
+) -> None:
+    """
+    Write the clean dataset in the formats listed in `outputs`, next to
+    `path` (SGJobData_clean.parquet, SGJobData_clean.csv, ...).
+    """
     PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=False)
-    print(f"[Phase 2] Clean dataset saved to {path}")
+    save_outputs(df, {"parquet": path}, outputs, "Phase 2")
+
+
+def merge_clean_delta(
+    delta_ids: pd.Series,
+    delta_clean: pd.DataFrame,
+    path: Path = PH2_CLEANED_PQ_PATH,
+    outputs: List[OutputSpec] = PH2_OUTPUTS,
+) -> None:
+    """
+    Replace the postings in `delta_ids` in every saved clean output with the
+    cleaned delta rows.
+
+    Postings are dropped by their pre-cleaning ids, so an update that no
+    longer passes cleaning still removes the old version. Delta columns are
+    aligned to the existing outputs' columns.
+    """
+    delta_table = None
+    for spec in outputs:
+        out = output_path(path, spec)
+        if spec.format == "csv":
+            dropped = replace_csv_rows(out, delta_clean, ids=delta_ids)
+            print(f"[Phase 2] Replaced {dropped} rows with {len(delta_clean)} cleaned delta rows in {out}")
+            continue
+
+        existing = read_table(out)
+        if delta_table is None:
+            delta_table = to_arrow_table(delta_clean)
+        merged = merge_delta(
+            existing,
+            delta_table.select([c for c in delta_table.column_names if c in existing.column_names]),
+            ids=pa.array(delta_ids.astype(str)),
+        )
+        write_output(merged, out, spec, "Phase 2")
+
+
+def align_delta_columns(
+    delta_clean: pd.DataFrame,
+    numeric_dtypes: Dict[str, object],
+    path: Path = PH2_CLEANED_PQ_PATH,
+    outputs: List[OutputSpec] = PH2_OUTPUTS,
+) -> pd.DataFrame:
+    """
+    Add back the saved outputs' numeric columns the cleaned delta dropped.
+
+    Cleaning the delta alone drops the columns that are all-NaN within it,
+    while a full rebuild keeps them (they have values in other rows) and
+    fills their numeric NaNs with 0. Those columns are added to the delta
+    as 0, with their structured dtype in `numeric_dtypes`; other dropped
+    columns stay missing, as merging leaves them.
+    """
+    out = output_path(path, outputs[0])
+    if outputs[0].format == "csv":
+        names = pd.read_csv(out, nrows=0).columns
+    else:
+        wait_for_outputs()
+        names = read_schema(out).names
+    missing = [col for col in names if col in numeric_dtypes and col not in delta_clean.columns]
+    if not missing:
+        return delta_clean
+    print(f"[Phase 2] Columns all-NaN in the delta filled with 0 as in the saved dataset: {missing}")
+    return delta_clean.assign(
+        **{col: pd.Series(0, index=delta_clean.index, dtype=numeric_dtypes[col]) for col in missing}
+    )
+
+
+def regroup_delta(
+    delta_ids: pd.Series,
+    delta_clean: pd.DataFrame,
+    path: Path = PH2_CLEANED_PQ_PATH,
+    outputs: List[OutputSpec] = PH2_OUTPUTS,
+) -> Tuple[pd.Series, pd.DataFrame]:
+    """
+    Regroup the near-duplicates of the cleaned delta against the saved
+    clean dataset (see regroup_with_saved): the delta alone only groups
+    postings within itself. Saved postings whose duplicate_group_id changes
+    are added to the delta with their new group, so merging rewrites them
+    too. Returns the ids to replace and the rows to merge.
+    """
+    spec = next((spec for spec in outputs if spec.format != "csv"), None)
+    if spec is None:
+        print("[Phase 2] No Parquet / Feather output to regroup near-duplicates against; delta grouped alone.")
+        return delta_ids, delta_clean
+    wait_for_outputs()
+    saved = read_table(output_path(path, spec))
+    cols = [col for col in [*GROUP_SOURCE_COLS, DUPLICATE_GROUP_COL] if col in saved.column_names]
+    if DUPLICATE_GROUP_COL not in cols:
+        return delta_ids, delta_clean
+
+    groups, changed = regroup_with_saved(saved.select(cols).to_pandas(), delta_clean, delta_ids)
+    delta_clean = delta_clean.assign(**{DUPLICATE_GROUP_COL: groups})
+    print(f"[Phase 2] Near-duplicates regrouped with the saved dataset: {len(changed):,} saved postings change group")
+    if changed.empty:
+        return delta_ids, delta_clean
+    rows = from_arrow_table(saved.filter(pc.is_in(saved[JOB_ID_COL], value_set=pa.array(changed.index))))
+    rows[DUPLICATE_GROUP_COL] = rows[JOB_ID_COL].map(changed).astype(delta_clean[DUPLICATE_GROUP_COL].dtype)
+    return (
+        pd.concat([delta_ids, rows[JOB_ID_COL]], ignore_index=True),
+        pd.concat([delta_clean, rows], ignore_index=True),
+    )
+
+
+def _outputs_exist(
+    path: Path = PH2_CLEANED_PQ_PATH,
+    outputs: List[OutputSpec] = PH2_OUTPUTS,
+    partitioned: bool = PH2_WRITE_DATASET,
+) -> bool:
+    if partitioned and not PH2_DATASET_DIR.exists():
+        return False
+    return all(output_path(path, spec).exists() for spec in outputs)
 
 
-def run_phase2_cleaning():
-    df = load_structured_data()
-    df_clean = clean_and_transform(df)
-    save_clean_data(df_clean)
+def clean_frame(
+    df: pd.DataFrame,
+    text_cache: Optional[TextCache],
+    report: Optional[RunReport],
+    low_memory: bool,
+    memory_budget_mb: Optional[float],
+    title_lookup: Optional[TitleLookup] = None,
+    backend: str = "pandas",
+    quality_mode: str = PH2_QUALITY_MODE,
+    drop_empty_columns: bool = True,
+) -> pd.DataFrame:
+    """
+    Clean a frame the run no longer needs with the Phase 2 options: in
+    low-memory mode, with a memory budget or with a backend other than
+    pandas it goes through clean_and_transform_low_memory and is consumed.
+    Used by Phase 2 and by the fused pipeline (src/pipeline.py), which
+    cleans chunks with drop_empty_columns=False.
+    """
+    if low_memory or memory_budget_mb is not None or backend != "pandas":
+        return clean_and_transform_low_memory(
+            df,
+            text_cache,
+            report,
+            memory_budget_mb,
+            consume_input=True,
+            title_lookup=title_lookup,
+            backend=backend,
+            quality_mode=quality_mode,
+            drop_empty_columns=drop_empty_columns,
+        )
+    return clean_and_transform(
+        df, text_cache, report, title_lookup, quality_mode=quality_mode, drop_empty_columns=drop_empty_columns
+    )
+
+
+def run_phase2_incremental(
+    outputs: List[OutputSpec] = PH2_OUTPUTS,
+    partitioned: bool = PH2_WRITE_DATASET,
+    partition_cols: List[str] = PH2_PARTITION_COLS,
+    text_cache: bool = PH2_TEXT_CACHE,
+    low_memory: bool = PH2_LOW_MEMORY,
+    memory_budget_mb: Optional[float] = PH2_MEMORY_BUDGET_MB,
+    title_lookup: bool = PH2_TITLE_LOOKUP,
+    backend: str = PH2_BACKEND,
+    quality_mode: str = PH2_QUALITY_MODE,
+):
+    """
+    Clean only the delta left by an incremental Phase 1 run and merge it
+    into the clean dataset. Runs in full when there is no usable delta.
+    """
+    status = load_manifest()["phase2"]
+    if not _outputs_exist(outputs=outputs, partitioned=partitioned) or status not in (
+        PHASE2_DELTA,
+        PHASE2_SYNCED,
+    ):
+        print("[Phase 2] No incremental state to build on; cleaning the full dataset.")
+        return run_phase2_cleaning(
+            outputs=outputs,
+            partitioned=partitioned,
+            partition_cols=partition_cols,
+            text_cache=text_cache,
+            low_memory=low_memory,
+            memory_budget_mb=memory_budget_mb,
+            title_lookup=title_lookup,
+            backend=backend,
+            quality_mode=quality_mode,
+        )
+    if status == PHASE2_SYNCED:
+        print("[Phase 2] Clean dataset is up to date; nothing to do.")
+        return pd.DataFrame()
+
+    report = RunReport("Phase 2", source=str(PH1_DELTA_PQ_PATH))
+    with report.stage("load") as metrics:
+        delta = load_structured_data(PH1_DELTA_PQ_PATH)
+        metrics.output(delta)
+    delta_ids = delta[JOB_ID_COL]
+    # The columns clean_and_transform fills with 0 (clean_frame may consume the delta)
+    numeric_dtypes = delta.iloc[:0].select_dtypes(include=[np.number]).dtypes.to_dict()
+    cache = TextCache() if text_cache else None
+    lookup = TitleLookup() if title_lookup else None
+    delta_clean = clean_frame(
+        delta, cache, report, low_memory, memory_budget_mb, lookup, backend, quality_mode
+    )
+    if cache is not None:
+        cache.save()
+    if lookup is not None:
+        lookup.save()
+    if not delta_clean.empty:
+        delta_clean = align_delta_columns(delta_clean, numeric_dtypes, outputs=outputs)
+    if DUPLICATE_GROUP_COL in delta_clean.columns:
+        with report.stage("regroup_duplicates", delta_clean) as metrics:
+            delta_ids, delta_clean = regroup_delta(delta_ids, delta_clean, outputs=outputs)
+            metrics.output(delta_clean)
+    with report.stage("merge_outputs", delta_clean):
+        merge_clean_delta(delta_ids, delta_clean, outputs=outputs)
+    if partitioned:
+        with report.stage("merge_dataset", delta_clean):
+            merge_dataset_delta(delta_ids, delta_clean)
+    if find_output(outputs, "parquet"):
+        # The outlier bounds depend on every row: rebuilt from the merged output
+        if PH2_CUBE:
+            with report.stage("cube") as metrics:
+                metrics.output(materialize_cube())
+        with report.stage("metadata") as metrics:
+            metrics.output(rows=materialize_metadata()["rows"])
+    mark_phase2(PHASE2_SYNCED)
+    PH1_DELTA_PQ_PATH.unlink(missing_ok=True)
+    report.write()
+    return delta_clean
+
+
+def run_phase2_cleaning(
+    incremental: bool = False,
+    outputs: List[OutputSpec] = PH2_OUTPUTS,
+    partitioned: bool = PH2_WRITE_DATASET,
+    partition_cols: List[str] = PH2_PARTITION_COLS,
+    text_cache: bool = PH2_TEXT_CACHE,
+    low_memory: bool = PH2_LOW_MEMORY,
+    memory_budget_mb: Optional[float] = PH2_MEMORY_BUDGET_MB,
+    title_lookup: bool = PH2_TITLE_LOOKUP,
+    backend: str = PH2_BACKEND,
+    quality_mode: str = PH2_QUALITY_MODE,
+    build_cache: bool = BUILD_CACHE,
+):
+    """
+    Execute Phase 2. With partitioned=True the clean dataset is also written
+    as a Hive-partitioned Parquet dataset (see src/dataset.py); with
+    text_cache=True normalized titles and company names are reused from,
+    and saved to, the text cache (see src/text_normalization.py); with
+    low_memory=True rows are selected once, within `memory_budget_mb`
+    (see clean_and_transform_low_memory); with title_lookup=True canonical
+    titles are reused from, and saved to, the title lookup table (see
+    src/title_canonicalization.py); `backend` picks the engine that selects
+    the clean rows (see src/backends.py); `quality_mode` flags or drops
+    the rows failing a data-quality rule (see src/quality_rules.py).
+    Per-stage metrics are appended to the run report (RUN_REPORT_PATH).
+
+    With build_cache=True a full run whose structured input, settings and
+    code are unchanged restores its outputs from the build cache (see
+    src/build_cache.py) and returns the clean frame read back from them.
+    """
+    if incremental:
+        return run_phase2_incremental(
+            outputs,
+            partitioned,
+            partition_cols,
+            text_cache,
+            low_memory,
+            memory_budget_mb,
+            title_lookup,
+            backend,
+            quality_mode,
+        )
+    builds = BuildCache() if build_cache else None
+    settings = {
+        "outputs": outputs,
+        "partitioned": partitioned,
+        "partition_cols": partition_cols,
+        "quality_mode": quality_mode,
+    }
+    key = builds.key("phase2", [PH1_STRUCTURED_PQ_PATH], settings) if builds else None
+    if key is not None and builds.restore("phase2", key):
+        mark_phase2(PHASE2_SYNCED)
+        PH1_DELTA_PQ_PATH.unlink(missing_ok=True)
+        typed = next((spec for spec in outputs if spec.format != "csv"), outputs[0])
+        return load_clean_data(output_path(PH2_CLEANED_PQ_PATH, typed))
+
+    report = RunReport("Phase 2", source=str(PH1_STRUCTURED_PQ_PATH))
+    with report.stage("load") as metrics:
+        df = load_structured_data()
+        metrics.output(df)
+    cache = TextCache() if text_cache else None
+    lookup = TitleLookup() if title_lookup else None
+    df_clean = clean_frame(df, cache, report, low_memory, memory_budget_mb, lookup, backend, quality_mode)
+    del df
+    if cache is not None:
+        cache.save()
+    if lookup is not None:
+        lookup.save()
+    with report.stage("save_outputs", df_clean):
+        save_clean_data(df_clean, outputs=outputs)
+    if partitioned:
+        with report.stage("write_dataset", df_clean):
+            write_partitioned_dataset(df_clean, partition_cols=partition_cols)
+    if PH2_CUBE:
+        with report.stage("cube", df_clean) as metrics:
+            metrics.output(materialize_cube(df_clean))
+    with report.stage("metadata", df_clean) as metrics:
+        metrics.output(rows=materialize_metadata(df_clean)["rows"])
+    mark_phase2(PHASE2_SYNCED)
+    PH1_DELTA_PQ_PATH.unlink(missing_ok=True)
+    report.write()
+    if key is not None:
+        builds.store_when_written("phase2", key, clean_outputs(outputs, partitioned))
     return df_clean
 
 
 if __name__ == "__main__":
-    run_phase2_cleaning()
+    parser = argparse.ArgumentParser(description="Phase 2: cleaning & transformation")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only clean postings ingested since the last Phase 2 run",
+    )
+    parser.add_argument(
+        "--outputs",
+        type=parse_output_specs,
+        default=PH2_OUTPUTS,
+        metavar="FORMAT[:CODEC[:LEVEL]],...",
+        help='output formats, first written synchronously, e.g. "parquet:zstd,csv" '
+        "(the dashboard reads the Parquet output)",
+    )
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        default=PH2_WRITE_DATASET,
+        help=f"also write a Hive-partitioned Parquet dataset to {PH2_DATASET_DIR.name}/",
+    )
+    parser.add_argument(
+        "--partition-by",
+        type=lambda text: [col.strip() for col in text.split(",")],
+        default=PH2_PARTITION_COLS,
+        metavar="COL[,COL]",
+        help='partition columns, e.g. "posting_month,primary_category" (implies --partitioned)',
+    )
+    parser.add_argument(
+        "--text-cache",
+        action="store_true",
+        default=PH2_TEXT_CACHE,
+        help="reuse normalized titles / company names from previous runs",
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        default=PH2_LOW_MEMORY,
+        help="select the clean rows once, column by column, without intermediate frames",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        default=PH2_MEMORY_BUDGET_MB,
+        metavar="MB",
+        help="fail if low-memory cleaning would add more than MB of memory (implies --low-memory)",
+    )
+    parser.add_argument(
+        "--no-title-lookup",
+        dest="title_lookup",
+        action="store_false",
+        default=PH2_TITLE_LOOKUP,
+        help=f"recompute canonical titles instead of reusing {PH2_TITLE_LOOKUP_PATH.name}",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=PH2_BACKEND,
+        help="engine for the row selection (dedup and filters); same output",
+    )
+    parser.add_argument(
+        "--quality",
+        dest="quality_mode",
+        choices=QUALITY_MODES,
+        default=PH2_QUALITY_MODE,
+        help="flag (quality_flags column) or drop the rows failing a data-quality rule, or skip the checks",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="build_cache",
+        action="store_false",
+        default=BUILD_CACHE,
+        help="run even if the build cache holds the outputs of an identical run",
+    )
+    args = parser.parse_args()
+    run_phase2_cleaning(
+        incremental=args.incremental,
+        outputs=args.outputs,
+        partitioned=args.partitioned or args.partition_by != PH2_PARTITION_COLS,
+        partition_cols=args.partition_by,
+        text_cache=args.text_cache,
+        low_memory=args.low_memory,
+        memory_budget_mb=args.memory_budget,
+        title_lookup=args.title_lookup,
+        backend=args.backend,
+        quality_mode=args.quality_mode,
+        build_cache=args.build_cache,
+    )
+    wait_for_outputs()
@@ -1,32 +1,242 @@
 # src/data_ingestion.py
+import argparse
+import glob
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
 from src.config import (
+    RAW_DATA_DIR,
     RAW_JOB_MARKET_PATH,
+    RAW_SHARD_PATTERN,
     PROCESSED_DATA_DIR,
     PH1_STRUCTURED_PQ_PATH,
     PH1_STRUCTURED_CSV_PATH,
+    PH1_CATEGORY_MEMBERSHIP_PQ_PATH,
+    PH1_CATEGORIES_PQ_PATH,
+    PH1_DELTA_PQ_PATH,
+    PH1_MANIFEST_PATH,
+    PH1_POSTING_HASHES_PQ_PATH,
+    BUILD_CACHE,
+    CATEGORICAL_COLS,
     CATEGORIES_COL,
-    BOOL_COLS,
-    DATE_COLS,
-    NUMERIC_COLS,
+    JOB_ID_COL,
+    RAW_SCHEMA,
+    ColumnSpec,
+    INGEST_CHUNK_SIZE,
+    INGEST_WORKERS,
+    PH1_OUTPUTS,
+    OutputSpec,
 )
+from src.manifest import (
+    PHASE2_DELTA,
+    PHASE2_REBUILD,
+    empty_manifest,
+    file_sha256,
+    find_ingested,
+    load_manifest,
+    load_posting_hashes,
+    posting_hashes,
+    record_file,
+    save_manifest,
+    save_posting_hashes,
+    summarize_postings,
+    update_high_water_mark,
+)
+from src.build_cache import BuildCache
+from src.instrumentation import RunReport
+from src.outputs import (
+    PANDAS_TYPES,
+    as_arrow,
+    csv_options,
+    find_output,
+    from_arrow_table,
+    merge_delta,
+    new_file,
+    output_path,
+    output_paths,
+    parquet_options,
+    parse_output_specs,
+    read_output_table,
+    replace_csv_rows,
+    save_outputs,
+    to_arrow_table,
+    to_categorical_series,
+    to_csv_frame,
+    to_string_series,
+    wait_for_outputs,
+)
+
+# TRUE/FALSE-like spellings accepted for boolean columns.
+BOOL_VALUES = {
+    "true": True,
+    "false": False,
+    "1": True,
+    "0": False,
+    "yes": True,
+    "no": False,
+}
+
+# Arrow types for the pandas dtypes used in RAW_SCHEMA.
+_ARROW_TYPES = {
+    "string[pyarrow]": pa.string(),
+    "boolean": pa.bool_(),
+    "Int64": pa.int64(),
+    "Float64": pa.float64(),
+    "datetime64[ns]": pa.timestamp("ns"),
+    "category": pa.dictionary(pa.int32(), pa.string()),
+}
+# Declared dtypes read as text (Arrow decodes categories straight from the text)
+_TEXT_DTYPES = ("string[pyarrow]", "category")
 
 
-def load_raw_data(path: Path) -> pd.DataFrame:
+def _csv_convert_options(
+    schema: Dict[str, ColumnSpec], as_text: List[str] = ()
+) -> pacsv.ConvertOptions:
     """
-    Load the raw job market CSV into a DataFrame.
+    Build Arrow CSV conversion options from the column schema.
+    Columns in `as_text` are read as plain strings instead of their target type.
+    """
+    column_types = {
+        col: pa.string() if col in as_text else _ARROW_TYPES[spec.dtype]
+        for col, spec in schema.items()
+    }
+    date_formats = sorted({spec.date_format for spec in schema.values() if spec.date_format})
+
+    # Arrow matches boolean spellings case-sensitively
+    spellings = {True: [], False: []}
+    for raw, value in BOOL_VALUES.items():
+        spellings[value] += sorted({raw, raw.upper(), raw.title()})
+
+    return pacsv.ConvertOptions(
+        column_types=column_types,
+        timestamp_parsers=date_formats or None,
+        true_values=spellings[True],
+        false_values=spellings[False],
+        strings_can_be_null=True,
+    )
+
+
+def load_raw_data(path: Path, schema: Dict[str, ColumnSpec] = RAW_SCHEMA) -> pd.DataFrame:
+    """
+    Load the raw job market CSV into a DataFrame typed according to `schema`.
+
+    The file is parsed in a single multithreaded pass by the Arrow CSV reader,
+    which converts every declared column straight to its target type. If a
+    typed column holds values the reader cannot parse (e.g. "abc" in a salary
+    column), the file is re-read with that column as text and the column is
+    coerced with the normalize_* helpers, so invalid values become missing
+    as before.
     """
     if not path.exists():
         raise FileNotFoundError(f"Raw data file not found: {path}")
 
-    df = pd.read_csv(path, low_memory=False)
+    read_options = pacsv.ReadOptions(use_threads=True)
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    typed_cols = [
+        col for col, spec in schema.items()
+        if col in header and spec.dtype not in _TEXT_DTYPES
+    ]
+
+    as_text: List[str] = []
+    while True:
+        try:
+            table = pacsv.read_csv(
+                path,
+                read_options=read_options,
+                convert_options=_csv_convert_options(schema, as_text=as_text),
+            )
+            break
+        except pa.ArrowInvalid as e:
+            # "In CSV column #12: CSV conversion error to int64: invalid value 'abc'"
+            match = re.search(r"CSV column #(\d+)", str(e))
+            bad_col = header[int(match.group(1))] if match else None
+            if bad_col in typed_cols and bad_col not in as_text:
+                as_text.append(bad_col)
+            elif len(as_text) < len(typed_cols):
+                # Unrecognised failure: read every typed column as text
+                bad_col = "all typed columns"
+                as_text = list(typed_cols)
+            else:
+                raise
+            print(f"[Phase 1] Typed read failed ({e}); reading '{bad_col}' as text.")
+
+    df = table.to_pandas(types_mapper=PANDAS_TYPES.get)
+    del table
+
+    if as_text:
+        df = apply_schema_dtypes(df, {col: schema[col] for col in as_text})
     return df
 
 
+def iter_raw_chunks(
+    path: Path,
+    chunksize: int = INGEST_CHUNK_SIZE,
+    dtype: Optional[dict] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream the raw job market CSV as DataFrames of at most `chunksize` rows.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"Raw data file not found: {path}")
+
+    with pd.read_csv(path, chunksize=chunksize, dtype=dtype, low_memory=False) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+# One JSON object per category, e.g. {"id":1,"category":"Hospitality"}
+CATEGORY_NAME_PATTERN = r'"category":"(?P<category>[^"]+)"'
+CATEGORY_ID_PATTERN = r'"id":(?P<id>\d+)'
+
+
+def _parse_category_lists(values: pd.Series) -> Tuple[pa.ListArray, pa.ListArray, pa.Array]:
+    """
+    Vectorized parse of raw 'categories' strings.
+
+    Returns per-row category ids (int32 lists), category names
+    (dictionary-encoded lists) and the first name of each row. The column is dictionary-encoded first so
+    each distinct raw string is parsed once, then the parsed lists are
+    gathered back to the rows. NaN and "[]" give empty lists.
+    """
+    raw = as_arrow(values)
+    if not pa.types.is_string(raw.type):
+        raw = raw.cast(pa.string())
+    encoded = pc.dictionary_encode(pc.fill_null(raw, ""))
+    distinct = encoded.dictionary
+
+    objects = pc.split_pattern(distinct, "{")
+    pieces = pc.list_flatten(objects)
+    parents = pc.list_parent_indices(objects)
+
+    names = pc.extract_regex(pieces, CATEGORY_NAME_PATTERN)
+    found = names.is_valid()
+    ids = pc.extract_regex(pieces, CATEGORY_ID_PATTERN).field("id")
+
+    counts = np.bincount(pc.filter(parents, found).to_numpy(), minlength=len(distinct))
+    offsets = pa.array(np.concatenate([[0], np.cumsum(counts)]).astype(np.int32))
+
+    flat_names = pc.filter(names.field("category"), found).cast(pa.string())
+    id_lists = pa.ListArray.from_arrays(offsets, pc.filter(ids, found).cast(pa.int32()))
+    name_lists = pa.ListArray.from_arrays(offsets, pc.dictionary_encode(flat_names))
+    first = pc.take(flat_names, pa.array(offsets.to_numpy()[:-1], mask=counts == 0))
+
+    rows = encoded.indices
+    return pc.take(id_lists, rows), pc.take(name_lists, rows), pc.take(first, rows)
+
+
 def parse_categories_column(df: pd.DataFrame, col: str = CATEGORIES_COL) -> pd.DataFrame:
     """
     Parse the JSON-like 'categories' string column into a list of category names.
@@ -36,26 +246,62 @@ def parse_categories_column(df: pd.DataFrame, col: str = CATEGORIES_COL) -> pd.D
 
     After parsing:
     - df['categories_list'] = [["Accounting / Auditing / Taxation", "Hospitality"], ...]
-    - df['primary_category'] = "Accounting / Auditing / Taxation"
+    - df['primary_category'] = "Accounting / Auditing / Taxation" (categorical)
+
+    Parsing runs in Arrow compute kernels (no per-row Python). categories_list
+    is an Arrow list<dictionary<int32, string>> column, so each distinct
+    category name is stored once; rows without categories get an empty list.
     """
     if col not in df.columns:
         return df  # nothing to do
 
-    # Ensure string type and handle NaN
-    s = df[col].fillna("").astype(str)
+    _, categories, first = _parse_category_lists(df[col])
 
-    # Use regex to find all category="..." occurrences
-    categories_series = s.str.findall(r'"category":"([^"]+)"')
-
-    df["categories_list"] = categories_series
-    # Primary (first) category for convenience
-    df["primary_category"] = df["categories_list"].apply(
-        lambda lst: lst[0] if isinstance(lst, list) and len(lst) > 0 else None
+    df["categories_list"] = pd.Series(
+        pd.arrays.ArrowExtensionArray(categories), index=df.index
     )
+    # Primary (first) category for convenience
+    df["primary_category"] = to_categorical_series(first, df.index)
 
     return df
 
 
+def build_category_membership(
+    df: pd.DataFrame,
+    col: str = CATEGORIES_COL,
+    id_col: str = "metadata_jobPostId",
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Long-form category membership for multi-category analysis.
+
+    Returns:
+    - membership: one row per (posting_id, category_id) pair
+    - categories: lookup of category_id -> category name
+
+    category_id is the id carried in the raw JSON, so it is stable across runs.
+    """
+    if col not in df.columns or id_col not in df.columns:
+        raise KeyError(f"Columns '{col}' and '{id_col}' are required for category membership")
+
+    id_lists, name_lists, _ = _parse_category_lists(df[col])
+    ids = pc.list_flatten(id_lists)
+    names = pc.list_flatten(name_lists).cast(pa.string())
+    posting_ids = pc.take(as_arrow(df[id_col]), pc.list_parent_indices(id_lists))
+
+    membership = pd.DataFrame(
+        {
+            "posting_id": to_string_series(posting_ids),
+            "category_id": ids.to_pandas(),
+        }
+    )
+    categories = (
+        pd.DataFrame({"category_id": ids.to_pandas(), "category": to_string_series(names)})
+        .drop_duplicates("category_id")
+        .sort_values("category_id", ignore_index=True)
+    )
+    return membership, categories
+
+
 def normalize_bool_columns(df: pd.DataFrame, bool_cols: List[str]) -> pd.DataFrame:
     """
     Convert TRUE/FALSE-like string columns to actual booleans.
@@ -64,35 +310,66 @@ def normalize_bool_columns(df: pd.DataFrame, bool_cols: List[str]) -> pd.DataFra
         if col not in df.columns:
             continue
 
+        if pd.api.types.is_bool_dtype(df[col]):
+            df[col] = df[col].astype("boolean")
+            continue
+
         # Normalize case and common representations
         df[col] = (
             df[col]
             .astype(str)
             .str.strip()
             .str.lower()
-            .map(
-                {
-                    "true": True,
-                    "false": False,
-                    "1": True,
-                    "0": False,
-                    "yes": True,
-                    "no": False,
-                }
-            )
+            .map(BOOL_VALUES)
             .astype("boolean")
         )
     return df
 
 
-def normalize_date_columns(df: pd.DataFrame, date_cols: List[str]) -> pd.DataFrame:
+def parse_date_column(values: pd.Series, date_format: Optional[str] = None) -> pd.Series:
+    """
+    Parse a column of date strings. Invalids become NaT.
+
+    Each distinct string is parsed once and the result is broadcast back
+    through the factorized codes, so the cost depends on the number of
+    distinct dates rather than the number of rows. Strings that do not match
+    `date_format` are retried with per-value format inference.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Index(uniques, dtype=object)
+    parsed = pd.to_datetime(uniques, format=date_format, errors="coerce")
+    if date_format is not None:
+        retry = parsed.isna()
+        if retry.any():
+            parsed = parsed.where(
+                ~retry, pd.to_datetime(uniques, format="mixed", errors="coerce")
+            )
+
+    # Code -1 (missing) picks the trailing NaT
+    lookup = np.append(parsed.to_numpy(dtype="datetime64[ns]"), np.datetime64("NaT", "ns"))
+    return pd.Series(lookup[codes], index=values.index, name=values.name)
+
+
+def normalize_date_columns(
+    df: pd.DataFrame,
+    date_cols: List[str],
+    date_formats: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
     """
     Convert date-like string columns to datetime. Invalids become NaT.
+
+    `date_formats` gives the expected format per column (see RAW_SCHEMA);
+    columns without one fall back to format inference.
     """
+    date_formats = date_formats or {}
     for col in date_cols:
-        if col not in df.columns:
+        if col not in df.columns or pd.api.types.is_datetime64_any_dtype(df[col]):
             continue
-        df[col] = pd.to_datetime(df[col], errors="coerce")
+        parsed = parse_date_column(df[col], date_formats.get(col))
+        n_invalid = int((parsed.isna() & df[col].notna()).sum())
+        if n_invalid:
+            print(f"[Phase 1] '{col}': {n_invalid:,} values are not valid dates; set to NaT.")
+        df[col] = parsed
     return df
 
 
@@ -104,57 +381,773 @@ def normalize_numeric_columns(df: pd.DataFrame, numeric_cols: List[str]) -> pd.D
     for col in numeric_cols:
         if col not in df.columns:
             continue
+        if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+            continue
         df[col] = pd.to_numeric(df[col], errors="coerce")
     return df
 
 
+def map_categories(values: pd.Series, fn: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Apply a vectorized value transform `fn` (e.g. lambda s: s.str.lower())
+    to a categorical column once per category instead of once per row.
+    Categories that map to the same value are merged; the result is
+    categorical.
+    """
+    values = values.astype("category")
+    mapped = fn(pd.Series(values.cat.categories))
+    inverse, uniques = pd.factorize(mapped)
+    codes = values.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, inverse[codes], -1)
+    return pd.Series(
+        pd.Categorical.from_codes(codes, uniques), index=values.index, name=values.name
+    )
+
+
+def normalize_categorical_columns(
+    df: pd.DataFrame, categories: Dict[str, Optional[List[str]]] = CATEGORICAL_COLS
+) -> pd.DataFrame:
+    """
+    Convert low-cardinality text columns to categoricals with the category
+    sets declared in `categories` (see CATEGORICAL_COLS).
+
+    Declared sets fix the categories and their order; values outside them
+    are kept as extra categories and reported. Undeclared sets are the
+    values present, sorted.
+    """
+    for col, declared in categories.items():
+        if col not in df.columns:
+            continue
+        values = df[col].astype("category")
+        present = values.cat.remove_unused_categories().cat.categories.tolist()
+        if declared is None:
+            df[col] = values.cat.set_categories(sorted(present))
+            continue
+
+        extra = [c for c in present if c not in set(declared)]
+        if extra:
+            print(
+                f"[Phase 2] '{col}': {len(extra)} values outside the declared categories "
+                f"kept as extra categories: {extra[:5]}{' ...' if len(extra) > 5 else ''}"
+            )
+        df[col] = values.cat.set_categories([*declared, *extra])
+    return df
+
+
+def apply_schema_dtypes(
+    df: pd.DataFrame, schema: Dict[str, ColumnSpec] = RAW_SCHEMA
+) -> pd.DataFrame:
+    """
+    Coerce columns to the dtypes declared in `schema`. Invalids become missing.
+
+    Columns that already have their declared dtype are left untouched.
+    """
+    df = normalize_bool_columns(df, [c for c, spec in schema.items() if spec.dtype == "boolean"])
+    df = normalize_date_columns(
+        df,
+        [c for c, spec in schema.items() if spec.dtype == "datetime64[ns]"],
+        {c: spec.date_format for c, spec in schema.items() if spec.date_format},
+    )
+    df = normalize_numeric_columns(
+        df, [c for c, spec in schema.items() if spec.dtype in ("Int64", "Float64")]
+    )
+
+    for col, spec in schema.items():
+        if col not in df.columns or str(df[col].dtype) == spec.dtype:
+            continue
+        try:
+            df[col] = df[col].astype(spec.dtype)
+        except (TypeError, ValueError):
+            # e.g. fractional values in a column declared Int64
+            print(f"[Phase 1] Column '{col}' does not fit {spec.dtype}; keeping {df[col].dtype}.")
+    return df
+
+
+def check_nullability(df: pd.DataFrame, schema: Dict[str, ColumnSpec] = RAW_SCHEMA) -> None:
+    """
+    Report missing values in columns declared non-nullable.
+    """
+    for col, spec in schema.items():
+        if spec.nullable or col not in df.columns:
+            continue
+        n_missing = int(df[col].isna().sum())
+        if n_missing:
+            print(f"[Phase 1] WARNING: {n_missing:,} missing values in non-nullable column '{col}'")
+
+
+def write_category_tables(
+    df: pd.DataFrame,
+    membership_path: Path = PH1_CATEGORY_MEMBERSHIP_PQ_PATH,
+    categories_path: Path = PH1_CATEGORIES_PQ_PATH,
+) -> None:
+    """
+    Save the long-form category membership and the category lookup.
+    """
+    if CATEGORIES_COL not in df.columns:
+        return
+    membership, categories = build_category_membership(df)
+    membership.to_parquet(new_file(membership_path), index=False)
+    categories.to_parquet(new_file(categories_path), index=False)
+    print(f"[Phase 1] Category membership ({len(membership):,} rows) saved to: {membership_path}")
+
+
+def merge_category_tables(
+    delta: pd.DataFrame,
+    membership_path: Path = PH1_CATEGORY_MEMBERSHIP_PQ_PATH,
+    categories_path: Path = PH1_CATEGORIES_PQ_PATH,
+) -> None:
+    """
+    Update the saved category tables with the postings in `delta`.
+    """
+    if CATEGORIES_COL not in delta.columns:
+        return
+    membership, categories = build_category_membership(delta)
+    if membership_path.exists():
+        previous = pd.read_parquet(membership_path)
+        previous = previous[~previous["posting_id"].isin(delta[JOB_ID_COL])]
+        membership = pd.concat([previous, membership], ignore_index=True)
+    if categories_path.exists():
+        categories = (
+            pd.concat([pd.read_parquet(categories_path), categories])
+            .drop_duplicates("category_id", keep="last")
+            .sort_values("category_id", ignore_index=True)
+        )
+    membership.to_parquet(new_file(membership_path), index=False)
+    categories.to_parquet(new_file(categories_path), index=False)
+
+
+def structure_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Apply the Phase 1 parsing / normalization steps to one frame (or chunk).
+    """
+    df = parse_categories_column(df)
+    df = apply_schema_dtypes(df)
+    return df
+
+
+def _column_dtypes(raw_path: Path, cols: List[str]) -> Dict[str, object]:
+    """
+    The dtypes a full run gives the columns `cols`, inferred by the Arrow
+    CSV reader over the whole file (reading those columns only); a column
+    empty everywhere is null-typed and comes out as object.
+    """
+    if not cols:
+        return {}
+    table = pacsv.read_csv(
+        raw_path,
+        read_options=pacsv.ReadOptions(use_threads=True),
+        convert_options=pacsv.ConvertOptions(include_columns=cols),
+    )
+    return table.slice(0, 0).to_pandas(types_mapper=PANDAS_TYPES.get).dtypes.to_dict()
+
+
+def _streaming_schema(first_chunk: pd.DataFrame, empty_dtypes: Dict[str, object]) -> pa.Schema:
+    """
+    Fix the Parquet schema of a stream from its first structured chunk.
+
+    Declared columns take their RAW_SCHEMA types, whatever the chunk holds.
+    Undeclared columns are typed as the first chunk infers them, except
+    those entirely null in it, which carry no type information: they take
+    `empty_dtypes`, their types over the whole file. Later chunks are
+    conformed to this schema so every row group shares the same column
+    types, those of a full run.
+    """
+    declared = {col: spec.dtype for col, spec in RAW_SCHEMA.items() if col in first_chunk.columns}
+    typed = first_chunk.head(0).astype(
+        {col: dtype for col, dtype in declared.items() if str(first_chunk[col].dtype) != dtype}
+    )
+    schema = to_arrow_table(typed.astype(empty_dtypes)).schema
+    for col, dtype in declared.items():
+        if dtype == "category":
+            # No categories in the first chunk must not make the values null-typed
+            i = schema.get_field_index(col)
+            schema = schema.set(i, schema.field(i).with_type(pa.dictionary(pa.int32(), pa.string())))
+    return schema
+
+
+def plan_raw_stream(
+    raw_path: Path, chunksize: int = INGEST_CHUNK_SIZE
+) -> Tuple[Dict[str, type], pa.Schema]:
+    """
+    Read dtypes for iter_raw_chunks and the structured schema of a stream.
+
+    The schema is fixed before the first chunk is written (see
+    _streaming_schema); undeclared columns that are empty in the first
+    chunk are typed from the whole file first. Text columns are
+    pinned to str for the whole stream so a chunk holding only numbers or
+    blanks in such a column is not inferred differently.
+    """
+    if not raw_path.exists():
+        raise FileNotFoundError(f"Raw data file not found: {raw_path}")
+    text_dtypes = {col: str for col, spec in RAW_SCHEMA.items() if spec.dtype in _TEXT_DTYPES}
+    sample = pd.read_csv(raw_path, nrows=chunksize, dtype=text_dtypes, low_memory=False)
+    raw_cols = set(sample.columns)
+    empty = [c for c in sample.columns if c not in RAW_SCHEMA and sample[c].isna().all()]
+    schema = _streaming_schema(structure_chunk(sample), _column_dtypes(raw_path, empty))
+    text_dtypes.update(
+        {f.name: str for f in schema if f.name in raw_cols and pa.types.is_string(f.type)}
+    )
+    return text_dtypes, schema
+
+
+def run_phase_1_streaming(
+    raw_path: Path = RAW_JOB_MARKET_PATH,
+    output_pq_path: Path = PH1_STRUCTURED_PQ_PATH,
+    output_csv_path: Path = PH1_STRUCTURED_CSV_PATH,
+    chunksize: int = INGEST_CHUNK_SIZE,
+    outputs: List[OutputSpec] = PH1_OUTPUTS,
+) -> int:
+    """
+    Execute Phase 1 in bounded memory.
+
+    The raw CSV is read `chunksize` rows at a time; each chunk is parsed,
+    normalized and appended to the structured Parquet file as a row group
+    (and to the CSV if selected in `outputs`), so peak memory depends on
+    the chunk size only. Parquet is always written; Feather is not
+    supported in this mode. Returns the number of rows written.
+    """
+    print(f"[Phase 1.1] Streaming raw data from: {raw_path} (chunksize={chunksize:,})")
+    text_dtypes, schema = plan_raw_stream(raw_path, chunksize)
+
+    PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    csv_spec = find_output(outputs, "csv")
+    if csv_spec is not None:
+        output_csv_path = output_path(output_csv_path, csv_spec)
+
+    total_rows = 0
+    membership_writer = None
+    category_lookup = []
+    postings = []
+    with pq.ParquetWriter(
+        new_file(output_pq_path), schema, **parquet_options(find_output(outputs, "parquet"))
+    ) as writer:
+        for i, chunk in enumerate(iter_raw_chunks(raw_path, chunksize, dtype=text_dtypes)):
+            chunk = structure_chunk(chunk)
+            check_nullability(chunk)
+            postings.append(summarize_postings(posting_hashes(chunk)))
+
+            writer.write_table(conform_table(to_arrow_table(chunk), schema))
+            if csv_spec is not None:
+                to_csv_frame(chunk).to_csv(
+                    new_file(output_csv_path) if i == 0 else output_csv_path,
+                    mode="w" if i == 0 else "a",
+                    header=i == 0,
+                    index=False,
+                    **csv_options(csv_spec),
+                )
+
+            if CATEGORIES_COL in chunk.columns:
+                membership, categories = build_category_membership(chunk)
+                membership_table = pa.Table.from_pandas(membership, preserve_index=False)
+                if membership_writer is None:
+                    membership_writer = pq.ParquetWriter(
+                        new_file(PH1_CATEGORY_MEMBERSHIP_PQ_PATH), membership_table.schema
+                    )
+                membership_writer.write_table(membership_table)
+                category_lookup.append(categories)
+
+            total_rows += len(chunk)
+            print(f"[Phase 1.2] Chunk {i + 1}: {len(chunk):,} rows (total {total_rows:,})")
+
+    if membership_writer is not None:
+        membership_writer.close()
+        (
+            pd.concat(category_lookup)
+            .drop_duplicates("category_id")
+            .sort_values("category_id", ignore_index=True)
+            .to_parquet(new_file(PH1_CATEGORIES_PQ_PATH), index=False)
+        )
+
+    print("[Phase 1.3] Recording run manifest...")
+    record_full_run({raw_path: summarize_postings(pd.concat(postings, ignore_index=True))})
+
+    written = output_pq_path if csv_spec is None else f"{output_pq_path} and {output_csv_path}"
+    print(f"[Phase 1] Done. {total_rows:,} rows written to {written}")
+    return total_rows
+
+
+def resolve_raw_shards(source: Union[Path, str] = RAW_DATA_DIR) -> List[Path]:
+    """
+    Raw shard files for `source`: a directory (every RAW_SHARD_PATTERN file
+    in it), a glob pattern (relative patterns are taken under RAW_DATA_DIR)
+    or a single file.
+    """
+    path = Path(source)
+    if path.is_dir():
+        return sorted(path.glob(RAW_SHARD_PATTERN))
+    if path.is_file():
+        return [path]
+    pattern = str(path if path.is_absolute() else RAW_DATA_DIR / path)
+    return sorted(Path(p) for p in glob.glob(pattern))
+
+
+def _init_shard_worker(workers: int) -> None:
+    # Share the CPUs between worker processes instead of every Arrow
+    # reader starting one thread per core.
+    pa.set_cpu_count(max(1, (os.cpu_count() or 1) // workers))
+
+
+def _ingest_shard(
+    shard: Path, out_prefix: Path, csv_spec: Optional[OutputSpec], csv_header: bool
+) -> Dict:
+    """
+    Phase 1 for one raw shard, run in a worker process.
+
+    Writes the structured shard (Parquet, and CSV if `csv_spec` is given),
+    its category membership and its posting hashes next to `out_prefix`,
+    and returns their paths with timing stats.
+    """
+    start = time.perf_counter()
+    df = load_raw_data(shard)
+    df = parse_categories_column(df)
+    check_nullability(df)
+
+    result = {
+        "shard": shard,
+        "rows": len(df),
+        "mb": shard.stat().st_size / 1e6,
+        "pq": out_prefix.with_suffix(".parquet"),
+        "csv": out_prefix.with_suffix(".csv") if csv_spec else None,
+        "hashes": out_prefix.with_suffix(".hashes.parquet"),
+        "membership": None,
+        "categories": None,
+    }
+    pq.write_table(to_arrow_table(df), result["pq"])
+    summarize_postings(posting_hashes(df)).to_parquet(result["hashes"], index=False)
+    if csv_spec is not None:
+        # Compressed parts are complete streams; gzip/bz2/xz/zstd readers
+        # accept them concatenated
+        to_csv_frame(df).to_csv(
+            result["csv"], header=csv_header, index=False, **csv_options(csv_spec)
+        )
+    if CATEGORIES_COL in df.columns:
+        result["membership"] = out_prefix.with_suffix(".membership.parquet")
+        result["categories"] = out_prefix.with_suffix(".categories.parquet")
+        membership, categories = build_category_membership(df)
+        membership.to_parquet(result["membership"], index=False)
+        categories.to_parquet(result["categories"], index=False)
+    del df
+
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _combined_schema(schemas: List[pa.Schema]) -> pa.Schema:
+    """
+    One schema for all shards, in first-seen column order.
+
+    A column that is all-null in some shards takes its type from the others;
+    compatible types are promoted (e.g. int32 -> int64) and anything that
+    cannot be reconciled falls back to string.
+    """
+    types: Dict[str, List[pa.DataType]] = {}
+    for schema in schemas:
+        for field in schema:
+            types.setdefault(field.name, []).append(field.type)
+
+    fields = []
+    for name, candidates in types.items():
+        known = [t for t in dict.fromkeys(candidates) if not pa.types.is_null(t)]
+        if not known:
+            fields.append(pa.field(name, pa.null()))
+            continue
+        try:
+            fields.append(
+                pa.unify_schemas(
+                    [pa.schema([pa.field(name, t)]) for t in known],
+                    promote_options="permissive",
+                ).field(name)
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            print(f"[Phase 1] Column '{name}' has types {known} across shards; storing as string.")
+            fields.append(pa.field(name, pa.string()))
+    return pa.schema(fields, metadata=schemas[0].metadata)
+
+
+def conform_table(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """
+    Reorder / cast a shard or chunk table to `schema`, adding missing
+    columns as nulls. Null-typed fields (columns empty in every part) are
+    written as nulls whatever type the part inferred for them.
+    """
+    columns = [
+        table[f.name].cast(f.type)
+        if f.name in table.column_names and not pa.types.is_null(f.type)
+        else pa.nulls(table.num_rows, f.type)
+        for f in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def run_phase_1_sharded(
+    source: Union[Path, str] = RAW_DATA_DIR,
+    output_pq_path: Path = PH1_STRUCTURED_PQ_PATH,
+    output_csv_path: Path = PH1_STRUCTURED_CSV_PATH,
+    workers: Optional[int] = INGEST_WORKERS,
+    outputs: List[OutputSpec] = PH1_OUTPUTS,
+) -> int:
+    """
+    Execute Phase 1 over several raw shards (e.g. one export per month).
+
+    `source` is a directory, glob pattern or file (see resolve_raw_shards).
+    Shards are ingested in parallel, one per worker process, then combined
+    in shard order into one structured dataset whose column types are
+    reconciled across shards. As in streaming mode, Parquet is always
+    written and CSV only if selected in `outputs`. Returns the number of
+    rows written.
+    """
+    shards = resolve_raw_shards(source)
+    if not shards:
+        raise FileNotFoundError(f"No raw shards found for: {source}")
+    workers = min(workers or os.cpu_count() or 1, len(shards))
+    print(f"[Phase 1.1] Ingesting {len(shards)} raw shards from {source} with {workers} workers")
+
+    PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    csv_spec = find_output(outputs, "csv")
+    if csv_spec is not None:
+        output_csv_path = output_path(output_csv_path, csv_spec)
+    start = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(dir=PROCESSED_DATA_DIR) as tmp:
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_shard_worker, initargs=(workers,)
+        ) as pool:
+            futures = [
+                pool.submit(_ingest_shard, shard, Path(tmp) / f"shard_{i:04d}", csv_spec, i == 0)
+                for i, shard in enumerate(shards)
+            ]
+            for future in as_completed(futures):
+                r = future.result()
+                results.append(r)
+                print(
+                    f"[Phase 1.2] {r['shard'].name}: {r['rows']:,} rows, {r['mb']:.1f} MB "
+                    f"in {r['seconds']:.2f} s ({r['rows'] / r['seconds']:,.0f} rows/s)"
+                )
+        results.sort(key=lambda r: shards.index(r["shard"]))
+
+        # Combine in shard order with one reconciled schema
+        print(f"[Phase 1.3] Combining shards into: {output_pq_path} and {output_csv_path}")
+        schema = _combined_schema([pq.read_schema(r["pq"]) for r in results])
+        csv_out = open(new_file(output_csv_path), "wb") if csv_spec is not None else None
+        with pq.ParquetWriter(
+            new_file(output_pq_path), schema, **parquet_options(find_output(outputs, "parquet"))
+        ) as writer:
+            for i, r in enumerate(results):
+                table = pq.read_table(r["pq"])
+                conformed = conform_table(table, schema)
+                writer.write_table(conformed)
+                if csv_out is None:
+                    continue
+
+                if table.schema.equals(schema, check_metadata=False):
+                    # Shard CSV already has the combined layout: copy it
+                    with open(r["csv"], "rb") as part:
+                        shutil.copyfileobj(part, csv_out)
+                else:
+                    to_csv_frame(from_arrow_table(conformed)).to_csv(
+                        csv_out, header=i == 0, index=False, **csv_options(csv_spec)
+                    )
+        if csv_out is not None:
+            csv_out.close()
+
+        with_categories = [r for r in results if r["membership"]]
+        if with_categories:
+            membership = pd.concat(
+                [pd.read_parquet(r["membership"]) for r in with_categories], ignore_index=True
+            )
+            membership.to_parquet(new_file(PH1_CATEGORY_MEMBERSHIP_PQ_PATH), index=False)
+            (
+                pd.concat([pd.read_parquet(r["categories"]) for r in with_categories])
+                .drop_duplicates("category_id")
+                .sort_values("category_id", ignore_index=True)
+                .to_parquet(new_file(PH1_CATEGORIES_PQ_PATH), index=False)
+            )
+            print(f"[Phase 1] Category membership ({len(membership):,} rows) saved to: {PH1_CATEGORY_MEMBERSHIP_PQ_PATH}")
+
+        print("[Phase 1.4] Recording run manifest...")
+        record_full_run({r["shard"]: pd.read_parquet(r["hashes"]) for r in results})
+
+    elapsed = time.perf_counter() - start
+    total_rows = sum(r["rows"] for r in results)
+    total_mb = sum(r["mb"] for r in results)
+    busy = sum(r["seconds"] for r in results)
+    print(
+        f"[Phase 1] Done. {total_rows:,} rows from {len(results)} shards in {elapsed:.2f} s "
+        f"({total_rows / elapsed:,.0f} rows/s, {total_mb / elapsed:.1f} MB/s; "
+        f"{busy:.2f} s of shard work)"
+    )
+    return total_rows
+
+
+def select_changed_postings(
+    hashes: pd.DataFrame, known: pd.DataFrame, high_water_mark: Optional[str]
+) -> Tuple[pd.Series, Dict[str, int]]:
+    """
+    Flag the raw rows of postings that are new or whose content changed.
+
+    `hashes` holds one (posting_id, row_hash) entry per raw row, `known` the
+    per-posting summary recorded by earlier runs. Ids above the high-water
+    mark are new without a lookup. A posting has changed when the combined
+    hash of its rows or their number differs, so a change in any of its
+    rows counts; every raw row of a flagged posting is flagged.
+    """
+    summary = summarize_postings(hashes)
+    ids = summary["posting_id"].astype("string")
+    if high_water_mark is None:
+        above = pd.Series(True, index=summary.index)
+    else:
+        above = (ids > high_water_mark).fillna(False).astype(bool)
+
+    below = summary[~above]
+    pos = pd.Index(known["posting_id"]).get_indexer(below["posting_id"])
+    is_new = pos < 0
+    is_updated = ~is_new & (
+        (known["row_hash"].to_numpy()[pos] != below["row_hash"].to_numpy())
+        | (known["rows"].to_numpy()[pos] != below["rows"].to_numpy())
+    )
+
+    changed_ids = pd.concat(
+        [summary.loc[above, "posting_id"], below.loc[is_new | is_updated, "posting_id"]]
+    )
+    stats = {
+        "new": int(above.sum() + is_new.sum()),
+        "new_above_mark": int(above.sum()),
+        "updated": int(is_updated.sum()),
+        "unchanged": int(len(below) - is_new.sum() - is_updated.sum()),
+    }
+    return hashes["posting_id"].isin(changed_ids), stats
+
+
+def record_full_run(shard_postings: Dict[Path, pd.DataFrame]) -> None:
+    """
+    Start a fresh manifest after a full Phase 1 run over these raw files,
+    given the posting summary (summarize_postings) of each, in file order.
+    """
+    manifest = empty_manifest()
+    for raw_path, postings in shard_postings.items():
+        record_file(manifest, raw_path, file_sha256(raw_path), int(postings["rows"].sum()))
+        update_high_water_mark(manifest, postings["posting_id"])
+    save_posting_hashes(summarize_postings(pd.concat(shard_postings.values(), ignore_index=True)))
+    PH1_DELTA_PQ_PATH.unlink(missing_ok=True)
+    save_manifest(manifest)
+
+
+def run_phase_1_incremental(
+    raw_path: Path = RAW_JOB_MARKET_PATH,
+    output_pq_path: Path = PH1_STRUCTURED_PQ_PATH,
+    output_csv_path: Path = PH1_STRUCTURED_CSV_PATH,
+    outputs: List[OutputSpec] = PH1_OUTPUTS,
+) -> pd.DataFrame:
+    """
+    Execute Phase 1 for new or changed postings only.
+
+    Raw rows are read, hashed and compared with the run manifest; only
+    postings that are new or whose content changed are parsed. They replace their
+    previous version in the structured outputs and are collected in the
+    delta file for Phase 2. Falls back to a full run when no previous run is
+    recorded; every posting is then in the delta. Returns the structured
+    delta.
+    """
+    paths = {"parquet": output_pq_path, "csv": output_csv_path}
+    manifest = load_manifest()
+    structured = read_output_table(paths, outputs) if manifest["files"] else None
+    if structured is None:
+        print("[Phase 1] No previous run recorded; running full ingestion.")
+        return run_phase_1_ingestion(raw_path, output_pq_path, output_csv_path, outputs=outputs)
+
+    print(f"[Phase 1.1] Checking {raw_path} against the run manifest")
+    if not raw_path.exists():
+        raise FileNotFoundError(f"Raw data file not found: {raw_path}")
+    sha256 = file_sha256(raw_path)
+    seen = find_ingested(manifest, sha256)
+    if seen is not None:
+        print(f"[Phase 1] Same content as already-ingested '{seen}'; nothing to do.")
+        return pd.DataFrame()
+
+    raw = load_raw_data(raw_path)
+    hashes = posting_hashes(raw)
+    known = load_posting_hashes()
+    changed, stats = select_changed_postings(hashes, known, manifest["high_water_mark"])
+    print(
+        f"[Phase 1.2] {len(raw):,} raw rows: {stats['new']:,} new postings "
+        f"({stats['new_above_mark']:,} above high-water mark), "
+        f"{stats['updated']:,} updated, {stats['unchanged']:,} unchanged"
+    )
+
+    delta = pd.DataFrame()
+    if changed.any():
+        # 1) Parse the categories of the new / changed rows only
+        print(f"[Phase 1.3] Structuring {int(changed.sum()):,} delta rows...")
+        delta = parse_categories_column(raw[changed.to_numpy()].reset_index(drop=True))
+        check_nullability(delta)
+
+        # 2) Merge into the structured outputs; an existing CSV is spliced
+        #    rather than rendered again
+        print("[Phase 1.4] Merging delta into the structured outputs...")
+        delta_table = to_arrow_table(delta)
+        merged = merge_delta(structured, delta_table)
+        del structured
+        csv_spec = find_output(outputs, "csv")
+        csv_path = output_path(output_csv_path, csv_spec) if csv_spec else None
+        if csv_path is not None and csv_path.exists():
+            replace_csv_rows(csv_path, delta)
+            outputs = [spec for spec in outputs if spec is not csv_spec]
+        save_outputs(merged, paths, outputs, "Phase 1")
+        merge_category_tables(delta)
+        del merged
+
+        # 3) Keep the delta for Phase 2; deltas accumulate until it runs
+        if manifest["phase2"] != PHASE2_REBUILD:
+            if manifest["phase2"] == PHASE2_DELTA and PH1_DELTA_PQ_PATH.exists():
+                delta_table = merge_delta(pq.read_table(PH1_DELTA_PQ_PATH), delta_table)
+            pq.write_table(delta_table, PH1_DELTA_PQ_PATH)
+            manifest["phase2"] = PHASE2_DELTA
+
+        changed_postings = summarize_postings(hashes[changed])
+        known = known[~known["posting_id"].isin(changed_postings["posting_id"])]
+        save_posting_hashes(pd.concat([known, changed_postings], ignore_index=True))
+
+    update_high_water_mark(manifest, hashes["posting_id"])
+    record_file(manifest, raw_path, sha256, len(raw))
+    save_manifest(manifest)
+
+    print(f"[Phase 1] Done. {len(delta):,} delta rows.")
+    return delta
+
+
+def full_run_outputs(
+    output_pq_path: Path = PH1_STRUCTURED_PQ_PATH,
+    output_csv_path: Path = PH1_STRUCTURED_CSV_PATH,
+    outputs: List[OutputSpec] = PH1_OUTPUTS,
+) -> List[Path]:
+    """Files a full Phase 1 run writes: structured outputs, category tables, manifest."""
+    return [
+        *output_paths({"parquet": output_pq_path, "csv": output_csv_path}, outputs),
+        PH1_CATEGORY_MEMBERSHIP_PQ_PATH,
+        PH1_CATEGORIES_PQ_PATH,
+        PH1_MANIFEST_PATH,
+        PH1_POSTING_HASHES_PQ_PATH,
+    ]
+
+
 def run_phase_1_ingestion(
     raw_path: Path = RAW_JOB_MARKET_PATH,
     output_pq_path: Path = PH1_STRUCTURED_PQ_PATH,
     output_csv_path: Path = PH1_STRUCTURED_CSV_PATH,
+    incremental: bool = False,
+    outputs: List[OutputSpec] = PH1_OUTPUTS,
+    build_cache: bool = BUILD_CACHE,
 ) -> pd.DataFrame:
     """
     Execute Phase 1: Data Ingestion pipeline.
-    Returns the structured DataFrame and saves it to disk.
-    """
-    print(f"[Phase 1.1] Loading raw data from: {raw_path}")
-    df = load_raw_data(raw_path)
+    Returns the structured DataFrame and saves it to disk in the formats
+    listed in `outputs` (see save_outputs). Per-stage metrics are appended
+    to the run report (RUN_REPORT_PATH).
 
-    print(f"[Phase 1.2] Raw shape: {df.shape}")
+    With incremental=True only new or changed postings are processed and
+    the structured delta is returned (see run_phase_1_incremental).
 
-    # 1) Parse categories column
-    print("[Phase 1.3] Parsing categories column...")
-    df = parse_categories_column(df)
+    With build_cache=True a full run whose raw file, settings and code are
+    unchanged restores its outputs from the build cache (see
+    src/build_cache.py) and returns the structured frame read back from
+    them (from the CSV, untyped, if that is the only output).
+    """
+    if incremental:
+        return run_phase_1_incremental(raw_path, output_pq_path, output_csv_path, outputs)
 
-    # 2) Normalize boolean columns
-    print("[Phase 1.4] Normalizing boolean columns...")
-    df = normalize_bool_columns(df, BOOL_COLS)
+    builds = BuildCache() if build_cache else None
+    settings = {"outputs": outputs, "paths": [output_pq_path, output_csv_path]}
+    key = builds.key("phase1", [raw_path], settings) if builds else None
+    if key is not None and builds.restore("phase1", key):
+        PH1_DELTA_PQ_PATH.unlink(missing_ok=True)
+        structured = read_output_table({"parquet": output_pq_path, "csv": output_csv_path}, outputs)
+        if structured is None:
+            return pd.read_csv(output_path(output_csv_path, find_output(outputs, "csv")))
+        return from_arrow_table(structured)
 
-    # 3) Normalize date columns
-    print("[Phase 1.5] Normalizing date columns...")
-    df = normalize_date_columns(df, DATE_COLS)
+    report = RunReport("Phase 1", source=str(raw_path))
+    with report.stage("load_raw") as metrics:
+        df = load_raw_data(raw_path)
+        metrics.output(df)
 
-    # 4) Normalize numeric / salary columns
-    print("[Phase 1.6] Normalizing numeric columns...")
-    df = normalize_numeric_columns(df, NUMERIC_COLS)
+    df = report.run("parse_categories", parse_categories_column, df)
 
-    # 5) Let pandas infer better dtypes where possible (optional but nice)
-    print("[Phase 1.7] Converting dtypes (convert_dtypes)...")
-    df = df.convert_dtypes()
+    # The typed read already produced the declared dtypes; check the
+    # columns that must never be missing.
+    with report.stage("check_nullability", df):
+        check_nullability(df)
 
     # Ensure processed directory exists
     PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-    print(f"[Phase 1] Saving structured data to: {output_pq_path} and {output_csv_path}")
-    df.to_parquet(output_pq_path, index=False)
-    df.to_csv(output_csv_path, index=False)
+    with report.stage("save_outputs", df):
+        save_outputs(df, {"parquet": output_pq_path, "csv": output_csv_path}, outputs, "Phase 1")
+    with report.stage("category_tables", df):
+        write_category_tables(df)
 
-    print("[Phase 1] Done.")
-    print("[Phase 1] Final dtypes:")
-    print(df.dtypes)
+    with report.stage("manifest", df):
+        record_full_run({raw_path: summarize_postings(posting_hashes(df))})
 
+    report.write()
+    if key is not None:
+        builds.store_when_written("phase1", key, full_run_outputs(output_pq_path, output_csv_path, outputs))
+    print(f"[Phase 1] Done. {df.shape[0]:,} rows × {df.shape[1]} cols")
     return df
 
 
 if __name__ == "__main__":
-    run_phase_1_ingestion()
+    parser = argparse.ArgumentParser(description="Phase 1: raw data ingestion")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="ingest the raw CSV in fixed-size chunks (bounded memory)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only process postings that are new or changed since the last run",
+    )
+    parser.add_argument(
+        "--shards",
+        nargs="?",
+        const=str(RAW_DATA_DIR),
+        metavar="DIR_OR_GLOB",
+        help="ingest every raw shard in a directory or matching a glob, in parallel "
+        "(default: all CSVs in data/raw)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=INGEST_WORKERS,
+        help="worker processes for --shards (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--outputs",
+        type=parse_output_specs,
+        default=PH1_OUTPUTS,
+        metavar="FORMAT[:CODEC[:LEVEL]],...",
+        help='output formats, first written synchronously, e.g. "parquet:zstd:6,csv:gzip"',
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=INGEST_CHUNK_SIZE,
+        help="rows per chunk in streaming mode",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="build_cache",
+        action="store_false",
+        default=BUILD_CACHE,
+        help="run even if the build cache holds the outputs of an identical run",
+    )
+    args = parser.parse_args()
+
+    if args.shards:
+        run_phase_1_sharded(args.shards, workers=args.workers, outputs=args.outputs)
+    elif args.stream:
+        run_phase_1_streaming(chunksize=args.chunksize, outputs=args.outputs)
+    else:
+        run_phase_1_ingestion(incremental=args.incremental, outputs=args.outputs, build_cache=args.build_cache)
+    wait_for_outputs()
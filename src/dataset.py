@@ -0,0 +1,168 @@
+# src/dataset.py
+import shutil
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+from urllib.parse import unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.config import JOB_ID_COL, PH2_DATASET_DIR, PH2_PARTITION_COLS
+from src.outputs import from_arrow_table, merge_delta, to_arrow_table
+
+# DNF predicates as accepted by pyarrow / pd.read_parquet, e.g.
+#   [("posting_month", ">=", "2023-01"), ("primary_category", "==", "F&B")]
+Filters = Union[List, pc.Expression]
+
+# Rows per Parquet row group: small enough for min/max statistics to skip
+# most of a partition on selective filters, large enough to scan quickly.
+ROW_GROUP_SIZE = 64_000
+
+# Directory name pyarrow uses for null partition values
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _partitioning(partition_cols: Sequence[str]) -> ds.Partitioning:
+    # Partition values are kept as strings ("2023-05"), never inferred
+    return ds.partitioning(
+        pa.schema([(col, pa.string()) for col in partition_cols]), flavor="hive"
+    )
+
+
+def _as_expression(filters: Optional[Filters]) -> Optional[pc.Expression]:
+    if filters is None or isinstance(filters, pc.Expression):
+        return filters
+    return pq.filters_to_expression(filters)
+
+
+def _write_partitions(table: pa.Table, root: Path, partition_cols: Sequence[str]) -> None:
+    for col in partition_cols:
+        if col not in table.column_names:
+            raise KeyError(f"Partition column '{col}' not in the dataset")
+        table = table.set_column(
+            table.schema.get_field_index(col), col, table[col].cast(pa.string())
+        )
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=_partitioning(partition_cols),
+        existing_data_behavior="overwrite_or_ignore",
+        min_rows_per_group=ROW_GROUP_SIZE,
+        max_rows_per_group=ROW_GROUP_SIZE,
+    )
+
+
+def write_partitioned_dataset(
+    df: Union[pd.DataFrame, pa.Table],
+    root: Path = PH2_DATASET_DIR,
+    partition_cols: Sequence[str] = PH2_PARTITION_COLS,
+) -> int:
+    """
+    Write `df` as a Hive-partitioned Parquet dataset under `root`
+    (root/posting_month=2023-05/part-0.parquet), replacing any previous
+    dataset. Returns the number of files written.
+    """
+    table = df if isinstance(df, pa.Table) else to_arrow_table(df)
+    tmp = root.with_name(f"~{root.name}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    _write_partitions(table, tmp, partition_cols)
+    tmp.mkdir(parents=True, exist_ok=True)  # nothing written for an empty table
+
+    shutil.rmtree(root, ignore_errors=True)
+    tmp.rename(root)
+    files = len(list(root.rglob("*.parquet")))
+    print(f"[Dataset] Wrote {table.num_rows:,} rows to {root} ({files} files, partitioned by {', '.join(partition_cols)})")
+    return files
+
+
+def dataset_partition_cols(root: Path = PH2_DATASET_DIR) -> List[str]:
+    """Partition columns of a dataset written by write_partitioned_dataset."""
+    cols = []
+    path = root
+    while True:
+        sub = next((p for p in path.iterdir() if p.is_dir() and "=" in p.name), None)
+        if sub is None:
+            return cols
+        cols.append(sub.name.split("=", 1)[0])
+        path = sub
+
+
+def open_dataset(root: Path = PH2_DATASET_DIR) -> ds.Dataset:
+    if not root.exists():
+        raise FileNotFoundError(f"Partitioned dataset not found: {root}")
+    return ds.dataset(root, format="parquet", partitioning=_partitioning(dataset_partition_cols(root)))
+
+
+def load_dataset(
+    columns: Optional[List[str]] = None,
+    filters: Optional[Filters] = None,
+    root: Path = PH2_DATASET_DIR,
+) -> pd.DataFrame:
+    """
+    Load the partitioned clean dataset, reading only what is needed.
+
+    `columns` limits the columns read; `filters` (DNF list of tuples or an
+    Arrow expression) prunes whole partitions on partition columns and row
+    groups on the others using Parquet min/max statistics, e.g.
+
+        load_dataset(["title", "average_salary"],
+                     [("posting_month", ">=", "2023-01"), ("posting_month", "<", "2023-04")])
+    """
+    dataset = open_dataset(root)
+    expr = _as_expression(filters)
+    fragments = list(dataset.get_fragments(filter=expr))
+    table = dataset.to_table(columns=columns, filter=expr)
+    print(
+        f"[Dataset] Read {table.num_rows:,} rows from "
+        f"{len(fragments)} of {len(dataset.files)} partition files"
+    )
+    return from_arrow_table(table)
+
+
+def merge_dataset_delta(
+    delta_ids: pd.Series,
+    delta_clean: pd.DataFrame,
+    root: Path = PH2_DATASET_DIR,
+    id_col: str = JOB_ID_COL,
+) -> int:
+    """
+    Replace the postings in `delta_ids` with the cleaned delta rows,
+    rewriting only the top-level partitions they touch (the partitions of
+    the delta rows and of the old versions being replaced). Returns the
+    number of partitions rewritten.
+    """
+    partition_cols = dataset_partition_cols(root) if root.exists() else []
+    ids = pa.array(delta_ids.astype(str))
+    delta_table = to_arrow_table(delta_clean)
+    if not partition_cols:
+        # No partition directories (e.g. an empty dataset): rewrite it whole
+        files = [str(path) for path in root.rglob("*.parquet")] if root.exists() else []
+        merged = delta_table
+        if files:
+            merged = merge_delta(ds.dataset(files, format="parquet").to_table(), delta_table, id_col, ids)
+        write_partitioned_dataset(merged, root)
+        return sum(1 for part in root.iterdir() if part.is_dir())
+
+    top = partition_cols[0]
+    dataset = open_dataset(root)
+    delta_table = delta_table.select([c for c in delta_table.column_names if c in dataset.schema.names])
+    old = dataset.to_table(columns=[top], filter=pc.field(id_col).isin(ids))[top]
+    touched = set(old.to_pylist()) | set(delta_table[top].cast(pa.string()).to_pylist())
+
+    in_touched = pc.field(top).isin(pa.array([v for v in touched if v is not None], pa.string()))
+    if None in touched:
+        in_touched = in_touched | pc.field(top).is_null()
+    merged = merge_delta(dataset.to_table(filter=in_touched), delta_table, id_col, ids)
+
+    for part in root.iterdir():
+        name, _, value = part.name.partition("=")
+        value = None if value == NULL_PARTITION else unquote(value)
+        if name == top and value in touched:
+            shutil.rmtree(part)
+    _write_partitions(merged, root, partition_cols)
+    print(f"[Dataset] Rewrote {len(touched)} '{top}' partitions in {root}")
+    return len(touched)
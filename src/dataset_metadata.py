@@ -0,0 +1,112 @@
+# src/dataset_metadata.py
+# Metadata sidecar of the clean dataset, written by Phase 2 next to it
+# (<stem>_meta.json): row counts, the salary outlier bounds, and for the
+# whole dataset and for its dashboard rows the distinct values and counts
+# of the sidebar's filter columns and quantiles of the numeric columns.
+# The dashboard reads it instead of scanning the dataset for them.
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.config import (
+    METADATA_QUANTILE_COLS,
+    METADATA_QUANTILES,
+    METADATA_VALUE_COLS,
+    PH2_CLEANED_PQ_PATH,
+)
+from src.cube import SOURCE_COLS, dashboard_rows, salary_bounds
+from src.outputs import read_table, wait_for_outputs
+
+
+def sidecar_path(data_path: Path) -> Path:
+    """The metadata sidecar of the dataset file `data_path`."""
+    return data_path.with_name(f"{data_path.stem}_meta.json")
+
+
+def _number(value: float) -> Optional[float]:
+    """JSON-safe float (None for NaN)."""
+    return None if np.isnan(value) else float(value)
+
+
+def _value_counts(values: pd.Series) -> Dict[str, int]:
+    """Rows per distinct non-missing value, keyed by its text and sorted."""
+    counts = values.value_counts(dropna=True, sort=False)
+    counts = counts[counts > 0]  # categoricals also list their unused categories
+    return dict(sorted((str(value), int(count)) for value, count in counts.items()))
+
+
+def summarize(df: pd.DataFrame) -> Dict:
+    """Row count, filter values with counts and quantiles of one frame."""
+    quantiles = {}
+    for col in METADATA_QUANTILE_COLS:
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        values = values[~np.isnan(values)]
+        points = np.quantile(values, METADATA_QUANTILES) if len(values) else [np.nan] * len(METADATA_QUANTILES)
+        quantiles[col] = {str(q): _number(v) for q, v in zip(METADATA_QUANTILES, points)}
+    return {
+        "rows": len(df),
+        "values": {col: _value_counts(df[col]) for col in METADATA_VALUE_COLS if col in df.columns},
+        "quantiles": quantiles,
+    }
+
+
+def build_metadata(df: pd.DataFrame) -> Dict:
+    """Sidecar contents of the clean frame `df`."""
+    meta: Dict = {"rows": len(df), "outlier_bounds": {}}
+    bounds = None
+    if "average_salary" in df.columns:
+        bounds = salary_bounds(df)
+        meta["outlier_bounds"]["average_salary"] = [_number(bound) for bound in bounds]
+    meta["all"] = summarize(df)
+    meta["dashboard"] = summarize(dashboard_rows(df, bounds))
+    return meta
+
+
+def quantile(summary: Dict, col: str, q: float) -> Optional[float]:
+    """The `q` quantile of `col` recorded in a summary (None if not recorded)."""
+    return summary["quantiles"].get(col, {}).get(str(q))
+
+
+def write_metadata(meta: Dict, path: Path) -> None:
+    # Written once the dataset files are, so the sidecar is never older than them
+    wait_for_outputs()
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    tmp.replace(path)
+
+
+def load_metadata(path: Path) -> Dict:
+    if not path.exists():
+        raise FileNotFoundError(f"Metadata sidecar not found: {path}")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def materialize_metadata(
+    df: Optional[pd.DataFrame] = None,
+    path: Path = PH2_CLEANED_PQ_PATH,
+    out: Optional[Path] = None,
+) -> Dict:
+    """
+    Build the metadata of the clean frame `df` (read from the clean Parquet
+    output at `path` if None) and write it to `out` (default: the sidecar
+    of `path`).
+    """
+    if df is None:
+        wait_for_outputs()
+        names = set(pq.read_schema(path).names)
+        df = read_table(path, [col for col in SOURCE_COLS if col in names]).to_pandas()
+    meta = build_metadata(df)
+    print(
+        f"[Phase 2] Metadata: {meta['rows']:,} rows, {meta['dashboard']['rows']:,} dashboard rows, "
+        f"values of {len(meta['all']['values'])} filter columns"
+    )
+    write_metadata(meta, out or sidecar_path(path))
+    return meta
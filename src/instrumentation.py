@@ -0,0 +1,205 @@
+# src/instrumentation.py
+# Named pipeline stages timed and measured (wall time, peak memory, rows and
+# columns in / out), written as one JSON line per stage to the run report.
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+import pandas as pd
+
+from src.config import RUN_REPORT_PATH
+
+
+# ---------------------------------------------------------------------
+# Process memory
+# ---------------------------------------------------------------------
+def _proc_status_mb(key: str) -> Optional[float]:
+    try:
+        status = Path("/proc/self/status").read_text()
+    except OSError:
+        return None
+    return int(status.split(f"{key}:")[1].split()[0]) / 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the process's peak-RSS counter (Linux only); False if unsupported.
+    For benchmark harnesses measuring a whole process: it also resets the
+    peak any other measurement in progress reads.
+    """
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process (since reset_peak_rss on Linux)."""
+    peak = _proc_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def rss_mb() -> float:
+    """Current resident memory (peak memory where that is not available)."""
+    return _proc_status_mb("VmRSS") or peak_rss_mb()
+
+
+def _statm_rss_mb() -> Optional[float]:
+    """Current resident memory from /proc/self/statm (cheaper to read than status)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except (OSError, ValueError):
+        return None
+
+
+class PeakRssSampler:
+    """
+    Highest resident memory seen while the block runs, sampled from a
+    background thread every `interval` seconds (Linux). The process's
+    peak counter is left alone, so samplers can nest and run alongside
+    other measurements; spikes shorter than the interval can be missed.
+    Elsewhere, peak_mb is the process's lifetime peak (at entry, then at
+    exit).
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, _statm_rss_mb() or 0.0)
+
+    def __enter__(self) -> "PeakRssSampler":
+        current = _statm_rss_mb()
+        if current is None:
+            self.peak_mb = peak_rss_mb()
+        else:
+            self.peak_mb = current
+            self._thread = threading.Thread(target=self._sample, name="peak-rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._thread is None:
+            self.peak_mb = peak_rss_mb()
+            return
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, _statm_rss_mb() or 0.0)
+
+
+# ---------------------------------------------------------------------
+# Stages and run report
+# ---------------------------------------------------------------------
+def _shape(df) -> tuple:
+    if isinstance(df, pd.DataFrame):
+        return len(df), df.shape[1]
+    return None, None
+
+
+@dataclass
+class StageMetrics:
+    phase: str
+    stage: str
+    seconds: float = 0.0
+    peak_mb_delta: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    cols_in: Optional[int] = None
+    cols_out: Optional[int] = None
+
+    def output(self, df: Optional[pd.DataFrame] = None, rows: Optional[int] = None) -> None:
+        """Record what the stage produced: a frame, or a row count."""
+        self.rows_out, self.cols_out = _shape(df)
+        if rows is not None:
+            self.rows_out = rows
+
+
+@dataclass
+class RunReport:
+    """
+    Stages of one pipeline run. Use stage() around each step (or run() for
+    a step that maps a frame to a frame), then write() to append the
+    stages to the run report (RUN_REPORT_PATH, JSON lines).
+
+    Peak memory is the highest resident memory during the stage above the
+    memory in use when it started, sampled without resetting the process's
+    peak counter (PeakRssSampler), so stages can nest. On Linux it is
+    sampled every few milliseconds; elsewhere only the growth of the
+    process's lifetime peak can be seen.
+    """
+    phase: str
+    source: Optional[str] = None
+    run_id: str = field(default_factory=lambda: f"{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}")
+    stages: List[StageMetrics] = field(default_factory=list)
+
+    @contextmanager
+    def stage(self, name: str, df: Optional[pd.DataFrame] = None) -> Iterator[StageMetrics]:
+        """
+        Time and measure the enclosed step. Rows and columns out default to
+        those in; call .output() on the yielded metrics to set them.
+        """
+        metrics = StageMetrics(self.phase, name)
+        metrics.rows_in, metrics.cols_in = _shape(df)
+        metrics.rows_out, metrics.cols_out = metrics.rows_in, metrics.cols_in
+
+        sampler = PeakRssSampler()
+        start = time.perf_counter()
+        try:
+            with sampler:
+                before = sampler.peak_mb
+                yield metrics
+        finally:
+            metrics.seconds = round(time.perf_counter() - start, 4)
+            metrics.peak_mb_delta = round(max(sampler.peak_mb - before, 0.0), 1)
+            self.stages.append(metrics)
+
+    def run(self, name: str, fn: Callable[..., pd.DataFrame], df: pd.DataFrame, *args, **kwargs) -> pd.DataFrame:
+        """Run the stage `df = fn(df, *args, **kwargs)`."""
+        with self.stage(name, df) as metrics:
+            df = fn(df, *args, **kwargs)
+            metrics.output(df)
+        return df
+
+    def write(self, path: Path = RUN_REPORT_PATH) -> None:
+        """Append the stages to the run report and print the slowest ones."""
+        if not self.stages:
+            return
+        written_at = datetime.now().isoformat(timespec="seconds")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for metrics in self.stages:
+                record = {"run_id": self.run_id, "written_at": written_at, "source": self.source, **asdict(metrics)}
+                f.write(json.dumps(record) + "\n")
+
+        total = sum(m.seconds for m in self.stages)
+        slowest = sorted(self.stages, key=lambda m: m.seconds, reverse=True)[:3]
+        print(
+            f"[{self.phase}] {len(self.stages)} stages in {total:.2f} s; slowest: "
+            + ", ".join(f"{m.stage} {m.seconds:.2f} s" for m in slowest)
+            + f" (run report: {path})"
+        )
+
+
+def load_run_report(path: Path = RUN_REPORT_PATH) -> pd.DataFrame:
+    """The run report as a frame, one row per stage and run."""
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True)
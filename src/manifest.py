@@ -0,0 +1,201 @@
+# src/manifest.py
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    JOB_ID_COL,
+    PH1_MANIFEST_PATH,
+    PH1_POSTING_HASHES_PQ_PATH,
+    RAW_SCHEMA,
+)
+from src.outputs import new_file
+
+# Phase 2 state recorded in the manifest:
+#   "rebuild" - Phase 1 was rebuilt from scratch; Phase 2 must run in full
+#   "delta"   - a pending delta (PH1_DELTA_PQ_PATH) has not been cleaned yet
+#   "synced"  - the clean dataset reflects every ingested posting
+PHASE2_REBUILD = "rebuild"
+PHASE2_DELTA = "delta"
+PHASE2_SYNCED = "synced"
+
+
+def empty_manifest() -> Dict:
+    return {
+        "files": {},
+        "high_water_mark": None,
+        "phase2": PHASE2_REBUILD,
+    }
+
+
+def load_manifest(path: Path = PH1_MANIFEST_PATH) -> Dict:
+    """
+    Load the run manifest; an empty manifest if no run has been recorded.
+    """
+    if not path.exists():
+        return empty_manifest()
+    with open(path, encoding="utf-8") as f:
+        return {**empty_manifest(), **json.load(f)}
+
+
+def save_manifest(manifest: Dict, path: Path = PH1_MANIFEST_PATH) -> None:
+    # Write then rename so an interrupted run never leaves a truncated manifest
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    tmp.replace(path)
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Content hash of a raw file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_ingested(manifest: Dict, sha256: str) -> Optional[str]:
+    """Name of an already-ingested file with this content hash, if any."""
+    for name, entry in manifest["files"].items():
+        if entry["sha256"] == sha256:
+            return name
+    return None
+
+
+def record_file(manifest: Dict, path: Path, sha256: str, rows: int) -> None:
+    manifest["files"][path.name] = {
+        "sha256": sha256,
+        "size": path.stat().st_size,
+        "rows": rows,
+        "ingested_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def update_high_water_mark(manifest: Dict, ids: pd.Series) -> None:
+    """Keep the largest metadata_jobPostId seen so far."""
+    top = ids.dropna().max() if len(ids) else None
+    if top is None or pd.isna(top):
+        return
+    current = manifest["high_water_mark"]
+    manifest["high_water_mark"] = str(top) if current is None else max(current, str(top))
+
+
+# ---------------------------------------------------------------------
+# Per-posting content hashes
+# ---------------------------------------------------------------------
+# Columns Phase 1 derives from the raw ones (parse_categories_column); they
+# are left out of the content hashes.
+DERIVED_COLS = ("categories_list", "primary_category")
+
+# Base of the polynomial hash combining a posting's row hashes (uint64
+# arithmetic, wrapping); see summarize_postings
+_HASH_BASE = np.uint64(0x100000001B3)
+
+
+def posting_hashes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Content hash of each raw row of a typed frame, keyed by metadata_jobPostId.
+
+    Hashes are taken over the raw columns (in name order) as the Phase 1
+    readers type them, so the frame a run has already read is hashed
+    instead of reading the file again. Columns RAW_SCHEMA does not declare
+    get whatever type each reader infers; numeric and empty ones are hashed
+    as float64. Returns one row per raw row with columns posting_id and
+    row_hash.
+    """
+    cols = {}
+    for col in sorted(c for c in df.columns if c not in DERIVED_COLS):
+        values = df[col]
+        if col not in RAW_SCHEMA and (pd.api.types.is_numeric_dtype(values) or values.isna().all()):
+            values = pd.to_numeric(values, errors="coerce").astype("float64")
+        cols[col] = values
+    return pd.DataFrame(
+        {
+            "posting_id": df[JOB_ID_COL].to_numpy(dtype=object, na_value=None),
+            "row_hash": pd.util.hash_pandas_object(pd.DataFrame(cols), index=False).to_numpy(),
+        }
+    )
+
+
+def _powers(exponents: np.ndarray) -> np.ndarray:
+    """_HASH_BASE ** exponents, elementwise (uint64, wrapping)."""
+    result = np.ones(len(exponents), dtype="uint64")
+    square = np.full(len(exponents), _HASH_BASE, dtype="uint64")
+    exponents = exponents.astype("uint64")
+    while exponents.any():
+        odd = (exponents & np.uint64(1)).astype(bool)
+        result[odd] *= square[odd]
+        square *= square
+        exponents >>= np.uint64(1)
+    return result
+
+
+def summarize_postings(hashes: pd.DataFrame) -> pd.DataFrame:
+    """
+    One entry per posting, in order of first appearance: the combined hash
+    of all its raw rows, in order, and its number of raw rows.
+
+    `hashes` holds row hashes (posting_hashes) or summaries of consecutive
+    parts of the file (a "rows" column), in file order. The combined hash
+    of rows h_1..h_n is sum(h_i * B^(n-i)), so the summaries of consecutive
+    batches fold into the summary of the whole file: each batch can be
+    summarized as it is read.
+    """
+    n = len(hashes)
+    rows = hashes["rows"].to_numpy(dtype="int64") if "rows" in hashes else np.ones(n, dtype="int64")
+    codes, ids = pd.factorize(hashes["posting_id"], use_na_sentinel=False)
+    if n == 0:
+        return pd.DataFrame(
+            {
+                "posting_id": pd.Series(dtype=object),
+                "row_hash": pd.Series(dtype="uint64"),
+                "rows": pd.Series(dtype="int64"),
+            }
+        )
+
+    order = np.argsort(codes, kind="stable")
+    rows = rows[order]
+    row_hash = hashes["row_hash"].to_numpy(dtype="uint64")[order]
+    starts = np.flatnonzero(np.r_[True, codes[order][1:] != codes[order][:-1]])
+    sizes = np.diff(np.r_[starts, n])
+    totals = np.add.reduceat(rows, starts)
+    # Rows of the same posting after each part
+    through = np.cumsum(rows)
+    through -= np.repeat(through[starts] - rows[starts], sizes)
+    after = np.repeat(totals, sizes) - through
+    return pd.DataFrame(
+        {
+            "posting_id": np.asarray(ids, dtype=object),
+            "row_hash": np.add.reduceat(row_hash * _powers(after), starts),
+            "rows": totals,
+        }
+    )
+
+
+def load_posting_hashes(path: Path = PH1_POSTING_HASHES_PQ_PATH) -> pd.DataFrame:
+    if not path.exists():
+        return summarize_postings(
+            pd.DataFrame(
+                {"posting_id": pd.Series(dtype=object), "row_hash": pd.Series(dtype="uint64")}
+            )
+        )
+    return pd.read_parquet(path)
+
+
+def save_posting_hashes(summary: pd.DataFrame, path: Path = PH1_POSTING_HASHES_PQ_PATH) -> None:
+    summary.to_parquet(new_file(path), index=False)
+
+
+def mark_phase2(status: str, path: Path = PH1_MANIFEST_PATH) -> None:
+    """Record the Phase 2 state, if a manifest exists."""
+    if not path.exists():
+        return
+    manifest = load_manifest(path)
+    manifest["phase2"] = status
+    save_manifest(manifest, path)
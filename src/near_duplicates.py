@@ -0,0 +1,252 @@
+# src/near_duplicates.py
+# Near-duplicate / repost detection: postings of the same company with the
+# same salary range and near-identical titles (MinHash LSH over title
+# tokens) share a duplicate_group_id. Runs in time linear in the number of
+# postings: titles are only compared with candidates from the same block
+# and LSH bucket, never pairwise.
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.config import (
+    DUPLICATE_GROUP_COL,
+    JOB_ID_COL,
+    NEAR_DUP_BANDS,
+    NEAR_DUP_BLOCK_COLS,
+    NEAR_DUP_ROWS_PER_BAND,
+    NEAR_DUP_THRESHOLD,
+)
+from src.outputs import as_arrow, to_string_series
+
+# Fixed seed so signatures, and therefore groups, are the same on every run
+MINHASH_SEED = 20240501
+
+# Clean dataset columns the groups are computed from
+SOURCE_COLS: List[str] = [JOB_ID_COL, "title", "metadata_originalPostingDate", *NEAR_DUP_BLOCK_COLS]
+
+
+def title_tokens(titles: pa.Array) -> pa.ListArray:
+    """Lower-case alphanumeric word tokens of each title."""
+    words = pc.split_pattern_regex(pc.utf8_lower(titles.cast(pa.string())), r"[^0-9a-z]+")
+    flat = pc.list_flatten(words)
+    keep = pc.greater(pc.binary_length(flat), 0)
+    counts = np.bincount(
+        pc.filter(pc.list_parent_indices(words), keep).to_numpy(), minlength=len(titles)
+    )
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+    return pa.ListArray.from_arrays(pa.array(offsets), pc.filter(flat, keep))
+
+
+def _token_hashes(tokens: pa.ListArray) -> Tuple[np.ndarray, np.ndarray]:
+    """64-bit hash of every token, and the number of tokens of each title."""
+    flat = pc.list_flatten(tokens).to_numpy(zero_copy_only=False)
+    token_hash = pd.util.hash_array(flat.astype(object)) if len(flat) else np.zeros(0, np.uint64)
+    return token_hash, pc.list_value_length(tokens).fill_null(0).to_numpy()
+
+
+def minhash_signatures(tokens: pa.ListArray, n_hashes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    MinHash signatures (uint32, n_hashes x n_titles: one contiguous row per
+    hash function) of the token sets, and whether each title has any tokens.
+    Each hash function is a multiply-shift hash of the 64-bit token hash;
+    one function is applied at a time, so memory is one value per token.
+    """
+    token_hash, lengths = _token_hashes(tokens)
+    has_tokens = lengths > 0
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])[has_tokens]
+
+    rng = np.random.default_rng(MINHASH_SEED)
+    a = rng.integers(1, 2**63, n_hashes, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, n_hashes, dtype=np.uint64)
+
+    signatures = np.full((n_hashes, len(lengths)), np.iinfo(np.uint32).max, dtype=np.uint32)
+    if not len(token_hash):
+        return signatures, has_tokens
+    with np.errstate(over="ignore"):
+        for k in range(n_hashes):
+            hashed = ((a[k] * token_hash + b[k]) >> np.uint64(32)).astype(np.uint32)
+            signatures[k, has_tokens] = np.minimum.reduceat(hashed, starts)
+    return signatures, has_tokens
+
+
+def token_jaccard(tokens: pa.ListArray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Exact Jaccard similarity of the token sets of titles left[i] and right[i]."""
+    token_hash, lengths = _token_hashes(tokens)
+    sets = pd.DataFrame(
+        {"title": np.repeat(np.arange(len(lengths)), lengths), "token": token_hash}
+    ).drop_duplicates()
+    sizes = np.bincount(sets["title"].to_numpy(), minlength=len(lengths))
+
+    def side(titles: np.ndarray) -> pd.DataFrame:
+        pairs = pd.DataFrame({"pair": np.arange(len(titles)), "title": titles})
+        return pairs.merge(sets, on="title")[["pair", "token"]]
+
+    shared = side(left).merge(side(right), on=["pair", "token"])
+    intersection = np.bincount(shared["pair"].to_numpy(), minlength=len(left))
+    union = sizes[left] + sizes[right] - intersection
+    return intersection / np.maximum(union, 1)
+
+
+def _bucket_heads(blocks: np.ndarray, signatures: np.ndarray, band: int, rows: int) -> np.ndarray:
+    """
+    For each item, the first item in its LSH bucket: same block and same
+    `rows` hashes of `band` (up to 64-bit key collisions, which the caller
+    rules out by checking the block and the titles of each pair).
+    """
+    key = blocks.astype(np.uint64)
+    with np.errstate(over="ignore"):
+        for hashes in signatures[band * rows : (band + 1) * rows]:
+            key = key * np.uint64(0x100000001B3) ^ hashes.astype(np.uint64)
+    buckets = pd.factorize(key)[0]
+    # Codes are numbered in order of first appearance
+    previous_max = np.maximum.accumulate(np.concatenate([[-1], buckets[:-1]]))
+    return np.flatnonzero(buckets > previous_max)[buckets]
+
+
+def connected_components(n: int, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """
+    Component label (smallest member) of each of `n` nodes linked by the
+    edges (u, v): min-label hooking with pointer jumping, vectorized.
+    """
+    labels = np.arange(n)
+    while len(u):
+        lu, lv = labels[u], labels[v]
+        if np.array_equal(lu, lv):
+            break
+        low = np.minimum(lu, lv)
+        np.minimum.at(labels, lu, low)
+        np.minimum.at(labels, lv, low)
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+    return labels
+
+
+def _block_codes(df: pd.DataFrame) -> np.ndarray:
+    """Blocking key per row (-1 where a key column is missing)."""
+    cols = [c for c in NEAR_DUP_BLOCK_COLS if c in df.columns]
+    if len(cols) < len(NEAR_DUP_BLOCK_COLS):
+        return np.full(len(df), -1)
+    codes = df.groupby(cols, observed=True, sort=False, dropna=True).ngroup()
+    return codes.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def assign_duplicate_groups(
+    df: pd.DataFrame,
+    bands: int = NEAR_DUP_BANDS,
+    rows_per_band: int = NEAR_DUP_ROWS_PER_BAND,
+    threshold: float = NEAR_DUP_THRESHOLD,
+) -> pd.Series:
+    """
+    duplicate_group_id of each posting: the job ID of the earliest posting
+    among its near-duplicates (its own ID if it has none).
+
+    Postings are near-duplicates when they share a block (NEAR_DUP_BLOCK_COLS:
+    company and salary range) and their title token sets have a Jaccard
+    similarity of at least `threshold`, directly or through a chain
+    of such postings. Only candidate pairs from MinHash LSH (`bands` x
+    `rows_per_band` hashes) are compared; postings with a missing block column are never
+    grouped.
+    """
+    n_rows = len(df)
+    blocks = _block_codes(df)
+    titles = pc.dictionary_encode(as_arrow(df["title"]))
+    title_codes = titles.indices.fill_null(-1).to_numpy()
+
+    # Items: distinct (block, title); unblocked rows are items of their own
+    item_keys = np.where(
+        (blocks >= 0) & (title_codes >= 0),
+        blocks * (len(titles.dictionary) + 1) + title_codes,
+        -1 - np.arange(n_rows),
+    )
+    item_of_row, item_keys = pd.factorize(item_keys)
+    first_row = np.full(len(item_keys), n_rows)
+    np.minimum.at(first_row, item_of_row, np.arange(n_rows))
+    item_block = np.where(item_keys >= 0, blocks[first_row], -1)
+    item_title = np.where(item_keys >= 0, title_codes[first_row], -1)
+
+    # Only blocks with two or more distinct titles can hold near-duplicates;
+    # signatures are computed for their titles only
+    linkable = (item_block >= 0) & (item_title >= 0)
+    block_items = np.bincount(item_block[linkable])
+    linkable[linkable] = block_items[item_block[linkable]] > 1
+    needed = np.unique(item_title[linkable])
+    tokens = title_tokens(titles.dictionary.take(pa.array(needed)))
+    signatures, has_tokens = minhash_signatures(tokens, bands * rows_per_band)
+    linkable[linkable] = has_tokens[np.searchsorted(needed, item_title[linkable])]
+    items = np.flatnonzero(linkable)
+    item_needed = np.searchsorted(needed, item_title[items])
+    item_sigs = signatures[:, item_needed]
+
+    # Candidate pairs: each item and the first item of its LSH bucket, in any
+    # band; verified with the exact token Jaccard similarity
+    n_items = max(len(items), 1)
+    candidates = [np.zeros(0, np.int64)]
+    for band in range(bands):
+        head = _bucket_heads(item_block[items], item_sigs, band, rows_per_band)
+        pair = head != np.arange(len(items))
+        candidates.append(np.flatnonzero(pair) * n_items + head[pair])
+    candidates = np.unique(np.concatenate(candidates))
+    a, b = candidates // n_items, candidates % n_items
+    close = (item_block[items[a]] == item_block[items[b]]) & (
+        token_jaccard(tokens, item_needed[a], item_needed[b]) >= threshold
+    )
+    labels = connected_components(len(item_keys), items[a[close]], items[b[close]])
+    group_of_row = labels[item_of_row]
+
+    # Representative: earliest posting date, then first row, in each group
+    date_col = "metadata_originalPostingDate"
+    if date_col in df.columns:
+        dates = df[date_col].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        dates[pd.isna(df[date_col]).to_numpy()] = np.iinfo(np.int64).max
+    else:
+        dates = np.zeros(n_rows, np.int64)
+    order = np.lexsort((np.arange(n_rows), dates, group_of_row))
+    is_first = np.ones(n_rows, dtype=bool)
+    is_first[1:] = group_of_row[order][1:] != group_of_row[order][:-1]
+    representative = np.empty(labels.max() + 1 if n_rows else 0, dtype=np.int64)
+    representative[group_of_row[order][is_first]] = order[is_first]
+
+    ids = as_arrow(df[JOB_ID_COL]).cast(pa.string())
+    groups = to_string_series(ids.take(pa.array(representative[group_of_row])), df.index)
+    n_groups = int(is_first.sum())
+    print(
+        f"[Phase 2] Near-duplicates: {n_rows:,} postings in {n_groups:,} groups "
+        f"({n_rows - n_groups:,} reposts)"
+    )
+    return groups.rename(DUPLICATE_GROUP_COL)
+
+
+def regroup_with_saved(
+    saved: pd.DataFrame, delta: pd.DataFrame, replaced_ids: pd.Series
+) -> Tuple[pd.Series, pd.Series]:
+    """
+    Regroup the `delta` postings with the saved clean postings (`saved`:
+    SOURCE_COLS and duplicate_group_id) that share a block with them or
+    with the saved versions they replace (`replaced_ids`). Groups never
+    span blocks, so the groups of those blocks are the ones a full run
+    would find.
+
+    Returns the duplicate_group_id of each delta row, and the new
+    duplicate_group_id of the saved postings whose group changed, indexed
+    by their job ID.
+    """
+    cols = list(NEAR_DUP_BLOCK_COLS)
+    replaced = saved[JOB_ID_COL].isin(replaced_ids).to_numpy()
+    blocks = pd.concat([saved.loc[replaced, cols], delta[cols]]).dropna().drop_duplicates()
+    kept = saved[~replaced]
+    near = kept[pd.MultiIndex.from_frame(kept[cols]).isin(pd.MultiIndex.from_frame(blocks))]
+
+    source = [col for col in SOURCE_COLS if col in delta.columns]
+    groups = assign_duplicate_groups(pd.concat([near[source], delta[source]], ignore_index=True))
+    new = groups.iloc[: len(near)].to_numpy(dtype=object)
+    changed = near[DUPLICATE_GROUP_COL].to_numpy(dtype=object) != new
+    return (
+        groups.iloc[len(near) :].set_axis(delta.index),
+        pd.Series(new[changed], index=near[JOB_ID_COL].to_numpy()[changed], name=DUPLICATE_GROUP_COL),
+    )
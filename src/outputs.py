@@ -0,0 +1,433 @@
+# src/outputs.py
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from src.config import (
+    JOB_ID_COL,
+    OUTPUT_BACKGROUND,
+    OUTPUT_LOG_PATH,
+    OutputSpec,
+)
+
+# pandas dtypes for Arrow types when tables are converted back to frames
+PANDAS_TYPES = {
+    pa.string(): pd.StringDtype("pyarrow"),
+    pa.bool_(): pd.BooleanDtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.float64(): pd.Float64Dtype(),
+}
+
+
+# ---------------------------------------------------------------------
+# pandas <-> Arrow conversion
+# ---------------------------------------------------------------------
+def as_arrow(values: pd.Series) -> pa.Array:
+    """Contiguous Arrow array view of a Series (NaN / None become nulls)."""
+    arr = pa.array(values, from_pandas=True)
+    return arr.combine_chunks() if isinstance(arr, pa.ChunkedArray) else arr
+
+
+def to_string_series(values: pa.Array, index: Optional[pd.Index] = None) -> pd.Series:
+    """Wrap an Arrow string array as a string[pyarrow] Series."""
+    return pd.Series(
+        pd.arrays.ArrowStringArray(values.cast(pa.large_string())), index=index
+    )
+
+
+def to_categorical_series(values: pa.Array, index: Optional[pd.Index] = None) -> pd.Series:
+    """Dictionary-encode an Arrow string array as a categorical Series."""
+    encoded = pc.dictionary_encode(values)
+    codes = encoded.indices.fill_null(-1).to_numpy()
+    return pd.Series(
+        pd.Categorical.from_codes(codes, encoded.dictionary.to_pylist()), index=index
+    )
+
+
+def _is_list_column(s: pd.Series) -> bool:
+    if isinstance(s.dtype, pd.ArrowDtype):
+        return pa.types.is_list(s.dtype.pyarrow_dtype)
+    # pd.read_parquet returns list columns as object arrays of ndarrays
+    if s.dtype == object and s.notna().any():
+        return isinstance(s[s.notna()].iloc[0], (list, np.ndarray))
+    return False
+
+
+def to_arrow_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Convert a structured frame to an Arrow table for writing.
+
+    Nested Arrow-backed columns (categories_list) are recorded as plain object
+    columns in the pandas metadata: pandas cannot rebuild nested ArrowDtype
+    columns from that metadata, so pd.read_parquet on the file would fail.
+
+    Categorical columns become dictionary columns with int32 indices
+    whatever the number of categories, so chunks, shards and deltas of the
+    same dataset share one type.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type) and field.type.index_type != pa.int32():
+            value_type = field.type.value_type
+            if pa.types.is_large_string(value_type):
+                value_type = pa.string()
+            table = table.set_column(
+                i, field.name, table.column(i).cast(pa.dictionary(pa.int32(), value_type))
+            )
+    meta = json.loads(table.schema.metadata[b"pandas"])
+    for col in meta["columns"]:
+        if str(col["numpy_type"]).startswith("list<"):
+            col["numpy_type"] = "object"
+    return table.replace_schema_metadata(
+        {**table.schema.metadata, b"pandas": json.dumps(meta).encode()}
+    )
+
+
+def from_arrow_table(table: pa.Table) -> pd.DataFrame:
+    """
+    Structured Arrow table back to pandas, keeping list columns Arrow-backed
+    (the inverse of to_arrow_table).
+    """
+    return table.to_pandas(
+        types_mapper=lambda t: pd.ArrowDtype(t) if pa.types.is_list(t) else PANDAS_TYPES.get(t)
+    )
+
+
+def to_csv_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Render nested list columns the way pandas writes Python lists to CSV,
+    e.g. "['Hospitality', 'F&B']", whether they are Arrow-backed or the
+    object arrays pd.read_parquet returns.
+    """
+    list_cols = [c for c in df.columns if _is_list_column(df[c])]
+    if not list_cols:
+        return df
+
+    out = df.copy(deep=False)
+    for col in list_cols:
+        lists = as_arrow(df[col]).cast(pa.list_(pa.string()))
+        text = pc.if_else(
+            pc.greater(pc.list_value_length(lists), 0),
+            pc.binary_join_element_wise("['", pc.binary_join(lists, "', '"), "']", ""),
+            "[]",
+        )
+        out[col] = to_string_series(text, df.index)
+    return out
+
+
+# ---------------------------------------------------------------------
+# Merging rows into existing outputs
+# ---------------------------------------------------------------------
+def _align_to_schema(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Cast columns of `table` to the type they have in `schema`."""
+    for i, field in enumerate(table.schema):
+        idx = schema.get_field_index(field.name)
+        if idx < 0:
+            continue
+        target = schema.field(idx).type
+        # All-null columns carry no type; concat_tables promotes them
+        if field.type == target or pa.types.is_null(target) or pa.types.is_null(field.type):
+            continue
+        table = table.set_column(i, field.name, table.column(i).cast(target))
+    return table
+
+
+def merge_delta(
+    existing: pa.Table,
+    delta: pa.Table,
+    id_col: str = JOB_ID_COL,
+    ids: Optional[pa.Array] = None,
+) -> pa.Table:
+    """
+    Replace the postings of `existing` whose id is in `ids` (default: the
+    ids in `delta`), then append the delta rows.
+    """
+    if ids is None:
+        ids = delta[id_col].combine_chunks()
+    in_delta = pc.is_in(existing[id_col], value_set=ids)
+    return pa.concat_tables(
+        [existing.filter(pc.invert(in_delta)), _align_to_schema(delta, existing.schema)],
+        promote_options="permissive",
+    )
+
+
+def replace_csv_rows(
+    path: Path,
+    rows: pd.DataFrame,
+    ids: Optional[pd.Series] = None,
+    id_col: str = JOB_ID_COL,
+) -> int:
+    """
+    Drop the rows of a CSV written by to_csv whose `id_col` is in `ids`
+    (default: the ids of `rows`), then append `rows` aligned to the file's
+    header.
+
+    Kept rows of an uncompressed file are copied as raw lines instead of
+    being parsed and rendered again. Compressed files, and files with line
+    breaks inside quoted fields, are rewritten through pandas instead.
+    Returns the number of rows dropped.
+    """
+    columns = pd.read_csv(path, nrows=0).columns
+    present = pacsv.read_csv(
+        path,
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=[id_col], column_types={id_col: pa.string()}
+        ),
+    )[id_col]
+    if ids is None:
+        ids = rows[id_col]
+    drop = pc.is_in(present, value_set=pa.array(ids.astype(str))).to_numpy(
+        zero_copy_only=False
+    )
+
+    # Keep the real suffix(es) so pandas infers the same compression
+    tmp = path.with_name(f"~{path.name}")
+    lines = path.read_bytes().split(b"\n") if path.suffix == ".csv" else []
+    if lines and lines[-1] == b"":
+        lines.pop()
+
+    if len(lines) - 1 == len(drop):
+        kept = itertools.compress(lines[1:], ~drop)
+        tmp.write_bytes(b"\n".join([lines[0], *kept, b""]))
+    else:
+        existing = pd.read_csv(path, dtype=str, keep_default_na=False)
+        existing[~drop].to_csv(tmp, index=False)
+    to_csv_frame(rows).reindex(columns=columns).to_csv(tmp, mode="a", header=False, index=False)
+    tmp.replace(path)
+    return int(drop.sum())
+
+
+# ---------------------------------------------------------------------
+# Output writers
+# ---------------------------------------------------------------------
+FORMAT_SUFFIXES = {"parquet": ".parquet", "csv": ".csv", "feather": ".feather"}
+CSV_COMPRESSION_SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst"}
+# Name of the level argument for each CSV codec in pandas' to_csv
+_CSV_LEVEL_ARGS = {"gzip": "compresslevel", "bz2": "compresslevel", "xz": "preset", "zstd": "level"}
+
+_log_lock = threading.Lock()
+_writer: Optional[ThreadPoolExecutor] = None
+_pending: List[Future] = []
+
+
+def parse_output_specs(text: str) -> List[OutputSpec]:
+    """
+    Parse a comma-separated list of FORMAT[:CODEC[:LEVEL]] specs,
+    e.g. "parquet:zstd:6,csv:gzip".
+    """
+    specs = []
+    for item in text.split(","):
+        fmt, codec, level = (item.strip().split(":") + [None, None])[:3]
+        specs.append(OutputSpec(fmt, codec or None, int(level) if level else None))
+    for spec in specs:
+        if spec.format not in FORMAT_SUFFIXES:
+            raise ValueError(f"Unknown output format '{spec.format}' (expected one of {list(FORMAT_SUFFIXES)})")
+    return specs
+
+
+def find_output(specs: List[OutputSpec], fmt: str) -> Optional[OutputSpec]:
+    """The spec for format `fmt`, or None if that format is not selected."""
+    return next((spec for spec in specs if spec.format == fmt), None)
+
+
+def output_path(base: Path, spec: OutputSpec) -> Path:
+    """
+    Path for `spec` next to `base`, e.g. SGJobData_clean.csv ->
+    SGJobData_clean.parquet or SGJobData_clean.csv.gz.
+    """
+    known = {*FORMAT_SUFFIXES.values(), *CSV_COMPRESSION_SUFFIXES.values()}
+    stem = base
+    while stem.suffix in known:
+        stem = stem.with_suffix("")
+
+    suffix = FORMAT_SUFFIXES[spec.format]
+    if spec.format == "csv" and spec.compression:
+        suffix += CSV_COMPRESSION_SUFFIXES[spec.compression]
+    return stem.with_name(stem.name + suffix)
+
+
+def parquet_options(spec: Optional[OutputSpec]) -> Dict:
+    """Keyword arguments for pq.write_table / pq.ParquetWriter."""
+    if spec is None or spec.compression is None:
+        return {}
+    return {"compression": spec.compression, "compression_level": spec.level}
+
+
+def csv_options(spec: Optional[OutputSpec]) -> Dict:
+    """Keyword arguments for DataFrame.to_csv."""
+    if spec is None or spec.compression is None:
+        return {}
+    compression = {"method": spec.compression}
+    if spec.level is not None:
+        compression[_CSV_LEVEL_ARGS[spec.compression]] = spec.level
+    return {"compression": compression}
+
+
+def new_file(path: Path) -> Path:
+    """
+    Remove `path` before it is written from scratch, so the write creates
+    a new file: the old one may be hardlinked into the build cache
+    (src/build_cache.py) and must not change. Returns `path`.
+    """
+    path.unlink(missing_ok=True)
+    return path
+
+
+def _write(table: pa.Table, path: Path, spec: OutputSpec) -> None:
+    new_file(path)
+    if spec.format == "parquet":
+        pq.write_table(table, path, **parquet_options(spec))
+    elif spec.format == "feather":
+        feather.write_feather(
+            table, path, compression=spec.compression, compression_level=spec.level
+        )
+    else:
+        to_csv_frame(from_arrow_table(table)).to_csv(path, index=False, **csv_options(spec))
+
+
+def read_table(path: Path, columns: Optional[List[str]] = None) -> pa.Table:
+    """Read a Parquet or Feather output (or some of its columns) back as an Arrow table."""
+    if path.suffix == FORMAT_SUFFIXES["feather"]:
+        return feather.read_table(path, columns=columns)
+    return pq.read_table(path, columns=columns)
+
+
+def read_schema(path: Path) -> pa.Schema:
+    """The schema of a Parquet or Feather output, without reading its data."""
+    if path.suffix == FORMAT_SUFFIXES["feather"]:
+        with pa.ipc.open_file(path) as reader:
+            return reader.schema
+    return pq.read_schema(path)
+
+
+def read_output_table(paths: Dict[str, Path], specs: List[OutputSpec]) -> Optional[pa.Table]:
+    """
+    Load the first Parquet or Feather output listed in `specs` that exists,
+    or None. CSV outputs are not read back: they lose the column types.
+    """
+    default = next(iter(paths.values()))
+    for spec in specs:
+        if spec.format == "csv":
+            continue
+        path = output_path(paths.get(spec.format, default), spec)
+        if path.exists():
+            wait_for_outputs()  # it may still be queued on the background writer
+            return read_table(path)
+    return None
+
+
+def record_output(record: Dict, log_path: Path = OUTPUT_LOG_PATH) -> None:
+    """Append one output record (size, write time, ...) to the output log."""
+    with _log_lock, open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def write_output(
+    table: pa.Table, path: Path, spec: OutputSpec, phase: str, background: bool = False
+) -> Dict:
+    """
+    Write `table` to `path` in the format of `spec` and record its size
+    and write time.
+    """
+    start = time.perf_counter()
+    _write(table, path, spec)
+    record = {
+        "written_at": datetime.now().isoformat(timespec="seconds"),
+        "phase": phase,
+        "path": str(path),
+        "format": spec.format,
+        "compression": spec.compression,
+        "level": spec.level,
+        "rows": table.num_rows,
+        "bytes": path.stat().st_size,
+        "seconds": round(time.perf_counter() - start, 3),
+        "background": background,
+    }
+    record_output(record)
+    print(
+        f"[{phase}] Wrote {spec.format}"
+        f"{f' ({spec.compression})' if spec.compression else ''}: {path} "
+        f"({record['bytes'] / 1e6:.1f} MB in {record['seconds']:.2f} s"
+        f"{', background' if background else ''})"
+    )
+    return record
+
+
+def save_outputs(
+    data: Union[pd.DataFrame, pa.Table],
+    paths: Dict[str, Path],
+    specs: List[OutputSpec],
+    phase: str,
+) -> List[Path]:
+    """
+    Write `data` in every format listed in `specs`.
+
+    `paths` maps a format to its output path; formats without an entry go
+    next to the first path (see output_path). The first spec is written
+    before returning. With OUTPUT_BACKGROUND the others are queued on a
+    background writer thread so the pipeline can continue; call
+    wait_for_outputs() before reading them. Returns the output paths.
+    """
+    # Arrow snapshot: later changes to `data` cannot leak into queued writes
+    table = data if isinstance(data, pa.Table) else to_arrow_table(data)
+    written = output_paths(paths, specs)
+    for i, (spec, path) in enumerate(zip(specs, written)):
+        if i == 0 or not OUTPUT_BACKGROUND:
+            write_output(table, path, spec, phase)
+        else:
+            _pending.append(_background_writer().submit(write_output, table, path, spec, phase, True))
+    return written
+
+
+def output_paths(paths: Dict[str, Path], specs: List[OutputSpec]) -> List[Path]:
+    """The files save_outputs(data, paths, specs, ...) writes, in spec order."""
+    default = next(iter(paths.values()))
+    return [output_path(paths.get(spec.format, default), spec) for spec in specs]
+
+
+def _background_writer() -> ThreadPoolExecutor:
+    global _writer
+    if _writer is None:
+        # One thread: outputs are I/O and serialization bound, and a single
+        # writer keeps memory use to one extra format at a time.
+        _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="output-writer")
+    return _writer
+
+
+def after_outputs(fn: Callable, *args) -> None:
+    """
+    Run `fn(*args)` on the background writer once the writes queued so far
+    are done, without waiting for them here (or right away if there is no
+    background writer).
+    """
+    if OUTPUT_BACKGROUND:
+        _pending.append(_background_writer().submit(fn, *args))
+    else:
+        fn(*args)
+
+
+def wait_for_outputs() -> List[Dict]:
+    """
+    Block until queued background writes (and after_outputs calls) finish;
+    returns the write records and re-raises the first failure.
+    """
+    records = []
+    while _pending:
+        record = _pending.pop(0).result()
+        if record is not None:
+            records.append(record)
+    return records
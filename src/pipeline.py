@@ -0,0 +1,592 @@
+# src/pipeline.py
+# Fused raw -> clean pipeline: Phase 1 and Phase 2 in one process, in memory
+# or chunk by chunk, without writing the structured dataset and reading it
+# back. Only the clean dataset and the checkpoints asked for are written.
+#
+#   uv run python -m src.pipeline
+#   uv run python -m src.pipeline --checkpoint structured --checkpoint categories
+#   uv run python -m src.pipeline --chunksize 500000 --outputs parquet:zstd,csv
+import argparse
+from pathlib import Path
+from typing import List, Optional, Set, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config import (
+    BUILD_CACHE,
+    DUPLICATE_GROUP_COL,
+    INGEST_CHUNK_SIZE,
+    JOB_ID_COL,
+    PH1_CATEGORIES_PQ_PATH,
+    PH1_CATEGORY_MEMBERSHIP_PQ_PATH,
+    PH1_DELTA_PQ_PATH,
+    PH1_MANIFEST_PATH,
+    PH1_OUTPUTS,
+    PH1_POSTING_HASHES_PQ_PATH,
+    PH1_STRUCTURED_CSV_PATH,
+    PH1_STRUCTURED_PQ_PATH,
+    PH2_BACKEND,
+    PH2_CLEANED_PQ_PATH,
+    PH2_CUBE,
+    PH2_LOW_MEMORY,
+    PH2_MEMORY_BUDGET_MB,
+    PH2_OUTPUTS,
+    PH2_PARTITION_COLS,
+    PH2_QUALITY_MODE,
+    PH2_TEXT_CACHE,
+    PH2_TITLE_LOOKUP,
+    PH2_TITLE_LOOKUP_PATH,
+    PH2_WRITE_DATASET,
+    PIPELINE_CHECKPOINTS,
+    PIPELINE_CHUNK_SIZE,
+    PROCESSED_DATA_DIR,
+    QUALITY_MODES,
+    RAW_JOB_MARKET_PATH,
+    OutputSpec,
+)
+from src.backends import BACKENDS, row_mask
+from src.build_cache import BuildCache
+from src.cube import materialize_cube
+from src.dataset_metadata import materialize_metadata
+from src.data_cleaning import (
+    DERIVED_COLS,
+    DERIVED_INPUT_COLS,
+    add_derived_columns,
+    clean_frame,
+    clean_outputs,
+    load_clean_data,
+    save_clean_data,
+)
+from src.data_ingestion import (
+    check_nullability,
+    conform_table,
+    iter_raw_chunks,
+    load_raw_data,
+    parse_categories_column,
+    plan_raw_stream,
+    record_full_run,
+    structure_chunk,
+    write_category_tables,
+)
+from src.dataset import write_partitioned_dataset
+from src.near_duplicates import SOURCE_COLS as GROUP_SOURCE_COLS, assign_duplicate_groups
+from src.instrumentation import RunReport
+from src.manifest import PHASE2_SYNCED, mark_phase2, posting_hashes, summarize_postings
+from src.outputs import (
+    csv_options,
+    find_output,
+    from_arrow_table,
+    new_file,
+    output_path,
+    output_paths,
+    parquet_options,
+    parse_output_specs,
+    save_outputs,
+    to_arrow_table,
+    to_csv_frame,
+    wait_for_outputs,
+)
+from src.text_normalization import TextCache
+from src.title_canonicalization import TitleLookup
+
+# Intermediate outputs the pipeline can write besides the clean dataset:
+# the Phase 1 structured dataset, and the category membership tables
+CHECKPOINTS = ("structured", "categories")
+
+
+def _record_run(raw_path: Path, postings: Optional[pd.DataFrame]) -> None:
+    """
+    Restart the run manifest from the posting summary of the raw file.
+    Incremental runs merge into the structured outputs, so the manifest is
+    only restarted when they were written (`postings` is None otherwise).
+    """
+    if postings is None:
+        print(
+            "[Pipeline] Run manifest left unchanged: incremental runs need the "
+            "structured checkpoint (--checkpoint structured)."
+        )
+        return
+    record_full_run({raw_path: postings})
+    mark_phase2(PHASE2_SYNCED)
+
+
+def _finish_written(pq_path: Path, outputs: List[OutputSpec], empty_cols: List[str]) -> int:
+    """
+    Finish the clean file written chunk by chunk. The near-duplicate groups
+    are recomputed over the whole file from its group columns only (each
+    chunk was grouped alone), and `empty_cols`, the columns all-NaN in every
+    chunk's kept rows, are dropped as a full run drops them; the derived
+    columns are recomputed if one of their inputs is among them. If
+    anything changed, the file is rewritten one row group at a time.
+    Returns the number of postings whose group changed.
+    """
+    names = pq.read_schema(pq_path).names
+    groups, changed = None, 0
+    if DUPLICATE_GROUP_COL in names:
+        saved = pq.read_table(pq_path, columns=[c for c in GROUP_SOURCE_COLS if c in names]).to_pandas()
+        groups = assign_duplicate_groups(saved)
+        written = pq.read_table(pq_path, columns=[DUPLICATE_GROUP_COL])[DUPLICATE_GROUP_COL]
+        changed = int((groups.to_numpy(dtype=object) != written.to_numpy(zero_copy_only=False)).sum())
+        print(f"[Pipeline] Near-duplicates regrouped across chunks: {changed:,} postings change group")
+    if empty_cols:
+        print(f"[Pipeline] Columns all-NaN in every chunk dropped: {empty_cols}")
+    if not changed and not empty_cols:
+        return 0
+
+    source = pq.ParquetFile(pq_path)
+    rederive = not set(empty_cols).isdisjoint(DERIVED_INPUT_COLS)
+    drop = [*empty_cols, *(c for c in DERIVED_COLS if rederive and c in names)]
+    values = None
+    if changed:
+        field = source.schema_arrow.field(DUPLICATE_GROUP_COL)
+        values = pa.array(groups.to_numpy(dtype=object), type=field.type)
+    tmp = pq_path.with_suffix(".tmp")
+    writer, schema = None, None
+    offset = 0
+    try:
+        for i in range(source.num_row_groups):
+            table = source.read_row_group(i)
+            if values is not None:
+                table = table.set_column(
+                    table.schema.get_field_index(DUPLICATE_GROUP_COL),
+                    field,
+                    values.slice(offset, table.num_rows),
+                )
+            offset += table.num_rows
+            table = table.drop_columns(drop)
+            if rederive:
+                table = to_arrow_table(add_derived_columns(from_arrow_table(table)))
+            if writer is None:
+                schema = table.schema
+                writer = pq.ParquetWriter(tmp, schema, **parquet_options(find_output(outputs, "parquet")))
+            writer.write_table(conform_table(table, schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    tmp.replace(pq_path)
+    return changed
+
+
+def _write_csv_from_parquet(pq_path: Path, csv_path: Path, csv_spec: OutputSpec) -> None:
+    """Render a Parquet file as CSV one row group at a time."""
+    source = pq.ParquetFile(pq_path)
+    new_file(csv_path)
+    for i in range(source.num_row_groups):
+        to_csv_frame(from_arrow_table(source.read_row_group(i))).to_csv(
+            csv_path, mode="a" if i else "w", header=not i, index=False, **csv_options(csv_spec)
+        )
+
+
+def run_pipeline_in_memory(
+    raw_path: Path = RAW_JOB_MARKET_PATH,
+    outputs: List[OutputSpec] = PH2_OUTPUTS,
+    checkpoints: List[str] = PIPELINE_CHECKPOINTS,
+    partitioned: bool = PH2_WRITE_DATASET,
+    partition_cols: List[str] = PH2_PARTITION_COLS,
+    text_cache: bool = PH2_TEXT_CACHE,
+    low_memory: bool = PH2_LOW_MEMORY,
+    memory_budget_mb: Optional[float] = PH2_MEMORY_BUDGET_MB,
+    title_lookup: bool = PH2_TITLE_LOOKUP,
+    backend: str = PH2_BACKEND,
+    quality_mode: str = PH2_QUALITY_MODE,
+) -> pd.DataFrame:
+    """
+    Ingest and clean the raw CSV in memory; returns the clean frame.
+
+    The structured frame goes straight from Phase 1 to Phase 2. It is
+    written (PH1_OUTPUTS) only with the "structured" checkpoint, and the
+    category tables only with "categories".
+    """
+    report = RunReport("Pipeline", source=str(raw_path))
+    with report.stage("load_raw") as metrics:
+        df = load_raw_data(raw_path)
+        metrics.output(df)
+    df = report.run("parse_categories", parse_categories_column, df)
+    with report.stage("check_nullability", df):
+        check_nullability(df)
+
+    PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    if "structured" in checkpoints:
+        with report.stage("save_structured", df):
+            save_outputs(
+                df,
+                {"parquet": PH1_STRUCTURED_PQ_PATH, "csv": PH1_STRUCTURED_CSV_PATH},
+                PH1_OUTPUTS,
+                "Phase 1",
+            )
+    if "categories" in checkpoints:
+        with report.stage("category_tables", df):
+            write_category_tables(df)
+    # Hashed before Phase 2 consumes the frame
+    postings = summarize_postings(posting_hashes(df)) if "structured" in checkpoints else None
+
+    cache = TextCache() if text_cache else None
+    lookup = TitleLookup() if title_lookup else None
+    df_clean = clean_frame(
+        df, cache, report, low_memory, memory_budget_mb, lookup, backend, quality_mode
+    )
+    del df
+    if cache is not None:
+        cache.save()
+    if lookup is not None:
+        lookup.save()
+
+    with report.stage("save_outputs", df_clean):
+        save_clean_data(df_clean, outputs=outputs)
+    if partitioned:
+        with report.stage("write_dataset", df_clean):
+            write_partitioned_dataset(df_clean, partition_cols=partition_cols)
+    if PH2_CUBE:
+        with report.stage("cube", df_clean) as metrics:
+            metrics.output(materialize_cube(df_clean))
+    with report.stage("metadata", df_clean) as metrics:
+        metrics.output(rows=materialize_metadata(df_clean)["rows"])
+
+    _record_run(raw_path, postings)
+    report.write()
+    return df_clean
+
+
+def run_pipeline_chunked(
+    raw_path: Path = RAW_JOB_MARKET_PATH,
+    chunksize: int = INGEST_CHUNK_SIZE,
+    outputs: List[OutputSpec] = PH2_OUTPUTS,
+    checkpoints: List[str] = PIPELINE_CHECKPOINTS,
+    text_cache: bool = PH2_TEXT_CACHE,
+    low_memory: bool = PH2_LOW_MEMORY,
+    memory_budget_mb: Optional[float] = PH2_MEMORY_BUDGET_MB,
+    title_lookup: bool = PH2_TITLE_LOOKUP,
+    backend: str = PH2_BACKEND,
+    quality_mode: str = PH2_QUALITY_MODE,
+) -> int:
+    """
+    Ingest and clean the raw CSV `chunksize` rows at a time, so peak memory
+    depends on the chunk size only. Returns the number of clean rows.
+
+    Each chunk is structured, conformed to the stream's structured schema
+    (the column types of a full run, see plan_raw_stream), cleaned and
+    appended to the clean Parquet file as a row group. Postings whose ID
+    appeared in an earlier chunk are dropped before cleaning, as the job ID
+    dedup of a full run would. Chunks keep their all-NaN columns (numeric
+    ones filled with 0): whether a column is all-NaN is decided over the
+    whole file. Each chunk is grouped into near-duplicates alone, so the
+    groups are then recomputed over the written file, which also drops the
+    columns empty in every chunk (see _finish_written), and the CSV, if
+    selected in `outputs`, is rendered from it (Feather is not supported).
+    The "structured" checkpoint is written the same way
+    (Parquet only); "categories" needs the whole dataset and is not
+    supported here.
+    """
+    report = RunReport("Pipeline", source=str(raw_path))
+    print(f"[Pipeline] Streaming raw data from: {raw_path} (chunksize={chunksize:,})")
+    text_dtypes, structured_schema = plan_raw_stream(raw_path, chunksize)
+
+    PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    clean_pq_path = output_path(PH2_CLEANED_PQ_PATH, OutputSpec("parquet"))
+    csv_spec = find_output(outputs, "csv")
+    clean_csv_path = output_path(PH2_CLEANED_PQ_PATH, csv_spec) if csv_spec else None
+    structured_writer = (
+        pq.ParquetWriter(
+            new_file(PH1_STRUCTURED_PQ_PATH),
+            structured_schema,
+            **parquet_options(find_output(PH1_OUTPUTS, "parquet")),
+        )
+        if "structured" in checkpoints
+        else None
+    )
+
+    cache = TextCache() if text_cache else None
+    lookup = TitleLookup() if title_lookup else None
+    seen_ids: Set[Optional[str]] = set()  # job IDs of the earlier chunks
+    filled: Set[str] = set()  # columns with a value in some chunk's kept rows
+    postings: List[pd.DataFrame] = []
+    clean_writer, clean_schema = None, None
+    total_rows = 0
+    try:
+        for chunk in iter_raw_chunks(raw_path, chunksize, dtype=text_dtypes):
+            with report.stage("chunk", chunk) as metrics:
+                chunk = structure_chunk(chunk)
+                check_nullability(chunk)
+                # The column types of a full run, whatever this chunk holds
+                table = conform_table(to_arrow_table(chunk), structured_schema)
+                if structured_writer is not None:
+                    structured_writer.write_table(table)
+                    postings.append(summarize_postings(posting_hashes(chunk)))
+                chunk = from_arrow_table(table)
+                del table
+
+                ids = chunk[JOB_ID_COL].to_numpy(dtype=object, na_value=None)
+                repeated = np.fromiter(map(seen_ids.__contains__, ids), dtype=bool, count=len(ids))
+                if repeated.any():
+                    chunk = chunk[~repeated]
+                seen_ids.update(ids)
+
+                # All-NaN columns are dropped over the whole file at the end, as
+                # a full run drops them, so chunks are cleaned keeping them
+                keep = row_mask(chunk)
+                filled.update(chunk.columns[chunk.notna().to_numpy()[keep].any(axis=0)])
+                clean = clean_frame(
+                    chunk,
+                    cache,
+                    None,
+                    low_memory,
+                    memory_budget_mb,
+                    lookup,
+                    backend,
+                    quality_mode,
+                    drop_empty_columns=False,
+                )
+                del chunk
+                metrics.output(clean)
+                if clean.empty:
+                    continue
+
+                table = to_arrow_table(clean)
+                if clean_writer is None:
+                    clean_schema = table.schema
+                    clean_writer = pq.ParquetWriter(
+                        new_file(clean_pq_path), clean_schema, **parquet_options(find_output(outputs, "parquet"))
+                    )
+                table = conform_table(table, clean_schema)
+                clean_writer.write_table(table)
+                total_rows += len(clean)
+                print(f"[Pipeline] {total_rows:,} clean rows written")
+    finally:
+        for writer in (structured_writer, clean_writer):
+            if writer is not None:
+                writer.close()
+
+    if cache is not None:
+        cache.save()
+    if lookup is not None:
+        lookup.save()
+    if total_rows:
+        empty_cols = [col for col in clean_schema.names if col in structured_schema.names and col not in filled]
+        with report.stage("finish_clean_file") as metrics:
+            metrics.output(rows=_finish_written(clean_pq_path, outputs, empty_cols))
+        if clean_csv_path is not None:
+            # Rendered once the groups are final
+            with report.stage("save_csv") as metrics:
+                _write_csv_from_parquet(clean_pq_path, clean_csv_path, csv_spec)
+                metrics.output(rows=total_rows)
+        # The outlier bounds depend on every chunk: built from the written output
+        if PH2_CUBE:
+            with report.stage("cube") as metrics:
+                metrics.output(materialize_cube(path=clean_pq_path))
+        with report.stage("metadata") as metrics:
+            metrics.output(rows=materialize_metadata(path=clean_pq_path)["rows"])
+    _record_run(
+        raw_path, summarize_postings(pd.concat(postings, ignore_index=True)) if postings else None
+    )
+    report.write()
+    print(f"[Pipeline] Done. {total_rows:,} clean rows written to {clean_pq_path}")
+    return total_rows
+
+
+def check_options(
+    outputs: List[OutputSpec],
+    checkpoints: List[str],
+    chunksize: Optional[int],
+    partitioned: bool,
+) -> None:
+    """Raise ValueError for option combinations the pipeline cannot run."""
+    unknown = set(checkpoints) - set(CHECKPOINTS)
+    if unknown:
+        raise ValueError(f"Unknown checkpoints {sorted(unknown)}; expected some of {CHECKPOINTS}")
+    if chunksize is None:
+        return
+    if partitioned or "categories" in checkpoints:
+        raise ValueError("--partitioned and the categories checkpoint need the in-memory pipeline")
+    if find_output(outputs, "feather") is not None:
+        raise ValueError("The chunked pipeline writes Parquet and CSV only")
+
+
+def run_pipeline(
+    raw_path: Path = RAW_JOB_MARKET_PATH,
+    outputs: List[OutputSpec] = PH2_OUTPUTS,
+    checkpoints: List[str] = PIPELINE_CHECKPOINTS,
+    chunksize: Optional[int] = PIPELINE_CHUNK_SIZE,
+    partitioned: bool = PH2_WRITE_DATASET,
+    partition_cols: List[str] = PH2_PARTITION_COLS,
+    text_cache: bool = PH2_TEXT_CACHE,
+    low_memory: bool = PH2_LOW_MEMORY,
+    memory_budget_mb: Optional[float] = PH2_MEMORY_BUDGET_MB,
+    title_lookup: bool = PH2_TITLE_LOOKUP,
+    backend: str = PH2_BACKEND,
+    quality_mode: str = PH2_QUALITY_MODE,
+    build_cache: bool = BUILD_CACHE,
+) -> Union[pd.DataFrame, int]:
+    """
+    Run Phase 1 and Phase 2 as one pipeline: in memory (returns the clean
+    frame) or, with `chunksize`, chunk by chunk (returns the clean row count).
+    With build_cache=True a run whose raw file, settings and code are
+    unchanged restores its outputs from the build cache and returns the
+    same from them: the clean frame read back, or its row count.
+    """
+    check_options(outputs, checkpoints, chunksize, partitioned)
+    builds = BuildCache() if build_cache else None
+    settings = {
+        "outputs": outputs,
+        "checkpoints": sorted(checkpoints),
+        "chunksize": chunksize,
+        "partitioned": partitioned,
+        "partition_cols": partition_cols,
+        "quality_mode": quality_mode,
+    }
+    key = builds.key("pipeline", [raw_path], settings) if builds else None
+    if key is not None and builds.restore("pipeline", key):
+        if "structured" in checkpoints:
+            PH1_DELTA_PQ_PATH.unlink(missing_ok=True)
+        if chunksize is not None:
+            return pq.ParquetFile(output_path(PH2_CLEANED_PQ_PATH, OutputSpec("parquet"))).metadata.num_rows
+        typed = next((spec for spec in outputs if spec.format != "csv"), outputs[0])
+        return load_clean_data(output_path(PH2_CLEANED_PQ_PATH, typed))
+
+    if chunksize is None:
+        result = run_pipeline_in_memory(
+            raw_path, outputs, checkpoints, partitioned, partition_cols,
+            text_cache, low_memory, memory_budget_mb, title_lookup, backend, quality_mode,
+        )
+    else:
+        result = run_pipeline_chunked(
+            raw_path, chunksize, outputs, checkpoints, text_cache, low_memory, memory_budget_mb,
+            title_lookup, backend, quality_mode,
+        )
+    if key is not None:
+        builds.store_when_written("pipeline", key, _pipeline_outputs(outputs, checkpoints, chunksize, partitioned))
+    return result
+
+
+def _pipeline_outputs(
+    outputs: List[OutputSpec], checkpoints: List[str], chunksize: Optional[int], partitioned: bool
+) -> List[Path]:
+    """Files a pipeline run writes: the clean dataset and its checkpoints."""
+    paths = clean_outputs(outputs, partitioned)
+    if "structured" in checkpoints:
+        if chunksize is None:
+            structured = {"parquet": PH1_STRUCTURED_PQ_PATH, "csv": PH1_STRUCTURED_CSV_PATH}
+            paths += output_paths(structured, PH1_OUTPUTS)
+        else:
+            paths.append(PH1_STRUCTURED_PQ_PATH)
+        paths += [PH1_MANIFEST_PATH, PH1_POSTING_HASHES_PQ_PATH]
+    if "categories" in checkpoints:
+        paths += [PH1_CATEGORY_MEMBERSHIP_PQ_PATH, PH1_CATEGORIES_PQ_PATH]
+    return paths
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Raw data -> clean dataset in one pass (Phase 1 + 2)")
+    parser.add_argument(
+        "--raw",
+        type=Path,
+        default=RAW_JOB_MARKET_PATH,
+        help="raw CSV to ingest",
+    )
+    parser.add_argument(
+        "--outputs",
+        type=parse_output_specs,
+        default=PH2_OUTPUTS,
+        metavar="FORMAT[:CODEC[:LEVEL]],...",
+        help='clean dataset formats, e.g. "parquet:zstd,csv"',
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="append",
+        choices=CHECKPOINTS,
+        default=list(PIPELINE_CHECKPOINTS),
+        help="also write this intermediate output (repeatable)",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=PIPELINE_CHUNK_SIZE,
+        help="ingest and clean this many rows at a time (default: whole file in memory)",
+    )
+    parser.add_argument(
+        "--partitioned",
+        action="store_true",
+        default=PH2_WRITE_DATASET,
+        help="also write the Hive-partitioned clean dataset",
+    )
+    parser.add_argument(
+        "--partition-by",
+        type=lambda text: [col.strip() for col in text.split(",")],
+        default=PH2_PARTITION_COLS,
+        metavar="COL[,COL]",
+        help="partition columns (implies --partitioned)",
+    )
+    parser.add_argument(
+        "--text-cache",
+        action="store_true",
+        default=PH2_TEXT_CACHE,
+        help="reuse normalized titles / company names from previous runs",
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        default=PH2_LOW_MEMORY,
+        help="select the clean rows once, column by column",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=float,
+        default=PH2_MEMORY_BUDGET_MB,
+        metavar="MB",
+        help="fail if cleaning would add more than MB of memory (implies --low-memory)",
+    )
+    parser.add_argument(
+        "--no-title-lookup",
+        dest="title_lookup",
+        action="store_false",
+        default=PH2_TITLE_LOOKUP,
+        help=f"recompute canonical titles instead of reusing {PH2_TITLE_LOOKUP_PATH.name}",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=PH2_BACKEND,
+        help="engine for the Phase 2 row selection (dedup and filters)",
+    )
+    parser.add_argument(
+        "--quality",
+        dest="quality_mode",
+        choices=QUALITY_MODES,
+        default=PH2_QUALITY_MODE,
+        help="flag or drop the rows failing a data-quality rule, or skip the checks",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="build_cache",
+        action="store_false",
+        default=BUILD_CACHE,
+        help="run even if the build cache holds the outputs of an identical run",
+    )
+    args = parser.parse_args(argv)
+    partitioned = args.partitioned or args.partition_by != PH2_PARTITION_COLS
+    try:
+        check_options(args.outputs, args.checkpoint, args.chunksize, partitioned)
+    except ValueError as e:
+        parser.error(str(e))
+    run_pipeline(
+        raw_path=args.raw,
+        outputs=args.outputs,
+        checkpoints=args.checkpoint,
+        chunksize=args.chunksize,
+        partitioned=partitioned,
+        partition_cols=args.partition_by,
+        text_cache=args.text_cache,
+        low_memory=args.low_memory,
+        memory_budget_mb=args.memory_budget,
+        title_lookup=args.title_lookup,
+        backend=args.backend,
+        quality_mode=args.quality_mode,
+        build_cache=args.build_cache,
+    )
+    wait_for_outputs()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# src/quality_rules.py
+# Data-quality rules for the clean dataset, declared in QUALITY_RULES and
+# evaluated as vectorized masks in one pass over the frame. Each rule's
+# violations are counted and sampled (job IDs) in the quality report
+# (QUALITY_REPORT_PATH, JSON lines); offending rows are then dropped or
+# flagged in the quality_flags column (bit i set = QUALITY_RULES[i] failed).
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config import (
+    JOB_ID_COL,
+    QUALITY_FLAGS_COL,
+    QUALITY_MAX_YEARS_EXPERIENCE,
+    QUALITY_MODES,
+    QUALITY_REPORT_PATH,
+    QUALITY_SAMPLE_SIZE,
+)
+
+
+@dataclass(frozen=True)
+class QualityRule:
+    """A check on some columns; `violation` maps them to a boolean mask of bad rows."""
+    name: str
+    description: str
+    columns: Tuple[str, ...]
+    violation: Callable[..., pd.Series]
+
+
+def _is_true(mask: pd.Series) -> np.ndarray:
+    """Boolean array of a (nullable) mask, missing = False."""
+    return mask.to_numpy(dtype=bool, na_value=False)
+
+
+def in_range(col: str, low: Optional[float] = None, high: Optional[float] = None) -> QualityRule:
+    """`col` between `low` and `high` (inclusive) where present."""
+    bounds = f"[{'-inf' if low is None else low}, {'inf' if high is None else high}]"
+
+    def violation(values: pd.Series) -> pd.Series:
+        bad = pd.Series(False, index=values.index)
+        if low is not None:
+            bad |= values < low
+        if high is not None:
+            bad |= values > high
+        return bad
+
+    return QualityRule(f"{col}_range", f"{col} outside {bounds}", (col,), violation)
+
+
+def ordered(first: str, second: str) -> QualityRule:
+    """`first` <= `second` where both are present."""
+    return QualityRule(
+        f"{first}_le_{second}",
+        f"{first} after {second}",
+        (first, second),
+        lambda a, b: a > b,
+    )
+
+
+def not_null(col: str) -> QualityRule:
+    """`col` present."""
+    return QualityRule(f"{col}_missing", f"{col} missing", (col,), lambda values: values.isna())
+
+
+# Rules run on every Phase 2 run, in this order (a rule's bit in quality_flags
+# is its position; append new rules at the end). Rules whose columns are
+# absent are skipped.
+QUALITY_RULES: List[QualityRule] = [
+    ordered("salary_minimum", "salary_maximum"),
+    ordered("metadata_originalPostingDate", "metadata_expiryDate"),
+    in_range("minimumYearsExperience", 0, QUALITY_MAX_YEARS_EXPERIENCE),
+]
+
+
+@dataclass
+class RuleResult:
+    rule: str
+    description: str
+    violations: int
+    sample_ids: List[str]
+
+
+def evaluate_rules(
+    df: pd.DataFrame, rules: Sequence[QualityRule] = QUALITY_RULES
+) -> Tuple[np.ndarray, List[RuleResult]]:
+    """
+    Violation bitmask of each row (bit i set = rules[i] failed) and each
+    rule's violation count with up to QUALITY_SAMPLE_SIZE sample job IDs.
+    """
+    if len(rules) > 32:
+        raise ValueError("At most 32 quality rules fit in the quality_flags bitmask")
+    flags = np.zeros(len(df), dtype=np.uint32)
+    results = []
+    ids = df[JOB_ID_COL] if JOB_ID_COL in df.columns else None
+    for bit, rule in enumerate(rules):
+        if not set(rule.columns).issubset(df.columns):
+            continue
+        bad = _is_true(rule.violation(*(df[col] for col in rule.columns)))
+        flags |= bad.astype(np.uint32) << np.uint32(bit)
+        rows = np.flatnonzero(bad)
+        sample = rows[:QUALITY_SAMPLE_SIZE]
+        sample_ids = ids.iloc[sample].astype(str).tolist() if ids is not None else [str(i) for i in sample]
+        results.append(RuleResult(rule.name, rule.description, len(rows), sample_ids))
+    return flags, results
+
+
+def write_quality_report(
+    results: List[RuleResult],
+    n_rows: int,
+    mode: str,
+    run_id: Optional[str] = None,
+    path: Path = QUALITY_REPORT_PATH,
+) -> None:
+    """Append one JSON line per rule to the quality report."""
+    written_at = datetime.now().isoformat(timespec="seconds")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for result in results:
+            record = {"run_id": run_id, "written_at": written_at, "rows": n_rows, "mode": mode, **vars(result)}
+            f.write(json.dumps(record) + "\n")
+
+
+def apply_quality_rules(
+    df: pd.DataFrame,
+    mode: str = "flag",
+    rules: Sequence[QualityRule] = QUALITY_RULES,
+    run_id: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Evaluate `rules` on `df` and report their violations. mode="drop"
+    removes the rows that fail any rule; mode="flag" keeps them and adds
+    the quality_flags bitmask column (0 = passes every rule); mode="off"
+    returns `df` unchecked.
+    """
+    if mode not in QUALITY_MODES:
+        raise ValueError(f"Unknown quality mode {mode!r}; expected one of {QUALITY_MODES}")
+    if mode == "off":
+        return df
+    flags, results = evaluate_rules(df, rules)
+    write_quality_report(results, len(df), mode, run_id)
+
+    failing = int(np.count_nonzero(flags))
+    summary = ", ".join(f"{r.rule} {r.violations:,}" for r in results if r.violations)
+    print(
+        f"[Phase 2] Quality rules: {failing:,} of {len(df):,} rows fail at least one "
+        f"({'dropped' if mode == 'drop' else 'flagged'})" + (f": {summary}" if summary else "")
+    )
+    if mode == "drop":
+        return df.take(np.flatnonzero(flags == 0)) if failing else df
+    df[QUALITY_FLAGS_COL] = flags
+    return df
+
+
+def rule_violations(flags: pd.Series, rule_name: str, rules: Sequence[QualityRule] = QUALITY_RULES) -> pd.Series:
+    """Boolean mask of the rows flagged for `rule_name` in a quality_flags column."""
+    bit = [rule.name for rule in rules].index(rule_name)
+    values = flags.to_numpy(dtype=np.uint32)
+    return pd.Series((values >> np.uint32(bit)) & 1 == 1, index=flags.index)
+
+
+def load_quality_report(path: Path = QUALITY_REPORT_PATH) -> pd.DataFrame:
+    """The quality report as a frame, one row per rule and run."""
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_json(path, lines=True)
@@ -0,0 +1,329 @@
+# src/synthetic.py
+# Synthetic SGJobData raw files for benchmarks: same columns and value
+# formats as data/raw/SGJobData.csv, at any size.
+#
+#   uv run python -m src.synthetic --rows 1000000 --out data/raw/SGJobData_1m.csv
+
+import argparse
+import json
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Raw column order of SGJobData.csv
+RAW_COLUMNS = [
+    "categories",
+    "employmentTypes",
+    "metadata_expiryDate",
+    "metadata_isPostedOnBehalf",
+    "metadata_jobPostId",
+    "metadata_newPostingDate",
+    "metadata_originalPostingDate",
+    "metadata_repostCount",
+    "metadata_totalNumberJobApplication",
+    "metadata_totalNumberOfView",
+    "minimumYearsExperience",
+    "numberOfVacancies",
+    "occupationId",
+    "positionLevels",
+    "postedCompany_name",
+    "salary_maximum",
+    "salary_minimum",
+    "salary_type",
+    "status_id",
+    "status_jobStatus",
+    "title",
+]
+
+MCF_CATEGORIES = [
+    "Accounting / Auditing / Taxation",
+    "Admin / Secretarial",
+    "Advertising / Media",
+    "Architecture / Interior Design",
+    "Banking and Finance",
+    "Building and Construction",
+    "Consulting",
+    "Customer Service",
+    "Design",
+    "Education and Training",
+    "Engineering",
+    "Environment / Health",
+    "Events / Promotions",
+    "F&B",
+    "General Management",
+    "General Work",
+    "Healthcare / Pharmaceutical",
+    "Hospitality",
+    "Human Resources",
+    "Information Technology",
+    "Insurance",
+    "Legal",
+    "Logistics / Supply Chain",
+    "Manufacturing",
+    "Marketing / Public Relations",
+    "Medical / Therapy Services",
+    "Others",
+    "Personal Care / Beauty",
+    "Public / Civil Service",
+    "Purchasing / Merchandising",
+    "Real Estate / Property Management",
+    "Repair and Maintenance",
+    "Risk Management",
+    "Sales / Retail",
+    "Sciences / Laboratory / R&D",
+    "Security and Investigation",
+    "Social Services",
+    "Telecommunications",
+    "Travel / Tourism",
+    "Wholesale Trade",
+]
+
+# Raw spellings, including the variants Phase 2 standardizes
+EMPLOYMENT_TYPES = [
+    "Full Time", "Permanent", "Contract", "Part Time", "Temporary",
+    "Internship", "Freelance", "Flexi-work", "full time", "Full-Time", "temp",
+]
+EMPLOYMENT_WEIGHTS = [40, 25, 15, 6, 4, 3, 1, 1, 2, 2, 1]
+
+POSITION_LEVELS = [
+    "Fresh/entry level", "Non-executive", "Junior Executive", "Executive",
+    "Senior Executive", "Professional", "Manager", "Middle Management",
+    "Senior Management",
+]
+POSITION_WEIGHTS = [6, 14, 8, 22, 12, 16, 12, 6, 4]
+
+_TITLE_PREFIXES = ["", "Senior ", "Junior ", "Assistant ", "Lead ", "Principal ", "Deputy ", "Chief ", "Associate ", "Head of "]
+_TITLE_FIELDS = [
+    "", "Software ", "Data ", "Finance ", "Accounts ", "Sales ", "Marketing ", "HR ", "IT ",
+    "Operations ", "Project ", "Quality ", "Logistics ", "Procurement ", "Admin ", "Customer Service ",
+    "R&D ", "Mechanical ", "Electrical ", "Civil ", "Clinical ", "F&B ", "Retail ", "Facilities ",
+    "Business Development ", "Security ", "Legal ", "Production ", "Warehouse ", "Design ",
+]
+_TITLE_ROLES = [
+    "Engineer", "Executive", "Manager", "Officer", "Analyst", "Assistant", "Technician", "Specialist",
+    "Consultant", "Coordinator", "Supervisor", "Administrator", "Associate", "Developer", "Architect",
+    "Scientist", "Nurse", "Chef", "Cook", "Driver", "Cleaner", "Teacher", "Accountant", "Clerk",
+    "Storekeeper", "Planner", "Designer", "Counsel", "Operator", "Representative",
+]
+_TITLE_SUFFIXES = [
+    "", " (Contract)", " - Night Shift", " (1 Year Contract)", " / Team Lead", " (Java)",
+    " (Regional)", " - West", " - East", " (Healthcare)", " (Banking)", " [Immediate]",
+    " (5 Days)", " - Jurong", " - Tuas", " (Entry Level)",
+]
+_URGENT = "URGENT HIRING!!! "
+
+_COMPANY_WORDS_A = [
+    "Trust", "Golden", "Asia", "Pacific", "Lion", "Merlion", "Orchid", "Harbour", "Summit", "Vertex",
+    "Prime", "Unity", "Eastern", "Global", "Silver", "Blue", "Red", "Green", "Nova", "Apex",
+    "PU TIEN", "Kim", "Tan", "Lee", "Ng", "Lim", "Wong", "Raffles", "Sentosa", "Jurong",
+    "Bukit", "Marina", "Kallang", "Tampines", "Bedok", "Changi", "Keppel", "Straits", "Temasek", "Pioneer",
+]
+_COMPANY_WORDS_B = [
+    "Recruit", "Services", "Engineering", "Logistics", "Holdings", "Technologies", "Solutions",
+    "Resources", "Trading", "Construction", "Healthcare", "Consulting", "Capital", "Systems",
+    "Foods", "Hospitality", "Security", "Facilities", "Manpower", "Electronics", "Marine",
+    "Education", "Design", "Properties", "Retail", "Networks", "Labs", "Partners", "Works", "Group",
+]
+_COMPANY_SUFFIXES = ["Pte. Ltd.", "Pte Ltd", "Private Limited", "LLP", "Limited", "Enterprise"]
+
+FIRST_POSTING_DATE = np.datetime64("2022-01-01")
+POSTING_DAYS = 730
+
+
+def _mixed_radix(index: np.ndarray, parts: List[List[str]]) -> List[str]:
+    """Strings made of one item of each of `parts`, numbered by `index`."""
+    digits = []
+    for items in parts:
+        digits.append(index % len(items))
+        index = index // len(items)
+    return ["".join(p[d] for p, d in zip(parts, row)) for row in zip(*digits)]
+
+
+def _skewed(rng: np.random.Generator, n_values: int, size: int, skew: float = 3.0) -> np.ndarray:
+    """Indices in [0, n_values) with a long tail: low indices are far more frequent."""
+    return np.minimum((n_values * rng.random(size) ** skew).astype(np.int64), n_values - 1)
+
+
+def _vocabulary(n_values: int, parts: List[List[str]], rng: np.random.Generator) -> np.ndarray:
+    """`n_values` distinct names, in a random popularity order."""
+    capacity = int(np.prod([len(p) for p in parts]))
+    index = rng.permutation(capacity)[: min(n_values, capacity)]
+    return np.array(_mixed_radix(index, parts), dtype=object)
+
+
+def _case_variants(values: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Lower-case (code 1), upper-case (code 2) or padded (code 3) spellings of `values`."""
+    out = values.copy()
+    for code, fn in [(1, str.lower), (2, str.upper), (3, lambda s: f" {s}  ")]:
+        mask = codes == code
+        out[mask] = [fn(v) for v in values[mask]]
+    return out
+
+
+def _category_strings(rng: np.random.Generator, n_variants: int = 4000) -> np.ndarray:
+    """Distinct JSON categories strings with 0-3 categories each."""
+    variants = []
+    for _ in range(n_variants):
+        k = rng.choice(4, p=[0.02, 0.55, 0.30, 0.13])
+        ids = np.unique(_skewed(rng, len(MCF_CATEGORIES), k, skew=1.8))
+        variants.append(
+            json.dumps(
+                [{"id": int(i) + 1, "category": MCF_CATEGORIES[i]} for i in ids],
+                separators=(",", ":"),
+            )
+        )
+    return np.array(variants, dtype=object)
+
+
+def _dates(days: np.ndarray) -> np.ndarray:
+    return (FIRST_POSTING_DATE + days.astype("timedelta64[D]")).astype(str).astype(object)
+
+
+def _dirty(values: np.ndarray, rng: np.random.Generator, rate: float, junk: List) -> np.ndarray:
+    """Replace a `rate` fraction of `values` with items of `junk` (None = blank)."""
+    out = values.astype(object)
+    mask = rng.random(len(out)) < rate
+    out[mask] = np.array(junk, dtype=object)[rng.integers(0, len(junk), mask.sum())]
+    return out
+
+
+class SyntheticJobs:
+    """
+    Generator of raw SGJobData rows.
+
+    Titles and companies are drawn with a long-tailed popularity from
+    vocabularies sized like the real data (about one distinct title per 4
+    postings, one company per 20), with lower/upper-case and padded
+    spellings. Salaries, dates and experience carry blanks, zeros and
+    unparseable values, and about `duplicate_rate` of the postings repeat
+    the id of an earlier one.
+    """
+
+    def __init__(
+        self,
+        n_rows: int,
+        seed: int = 42,
+        n_titles: Optional[int] = None,
+        n_companies: Optional[int] = None,
+        duplicate_rate: float = 0.01,
+        dirty_rate: float = 0.005,
+    ):
+        rng = np.random.default_rng(seed)
+        self.seed = seed
+        self.duplicate_rate = duplicate_rate
+        self.dirty_rate = dirty_rate
+        self.titles = _vocabulary(
+            n_titles or max(1_000, n_rows // 4),
+            [_TITLE_PREFIXES, _TITLE_FIELDS, _TITLE_ROLES, _TITLE_SUFFIXES],
+            rng,
+        )
+        self.companies = _vocabulary(
+            n_companies or max(500, n_rows // 20),
+            [[f"{w} " for w in _COMPANY_WORDS_A], [f"{w} " for w in _COMPANY_WORDS_B],
+             _COMPANY_SUFFIXES, ["", " (Singapore)"]],
+            rng,
+        )
+        self.categories = _category_strings(rng)
+
+    def chunk(self, start: int, n_rows: int) -> pd.DataFrame:
+        """Rows start .. start + n_rows - 1 (deterministic for a given seed and start)."""
+        rng = np.random.default_rng([self.seed, start])
+        dirty = self.dirty_rate
+
+        # Postings ids; duplicates repeat an earlier posting's id
+        ids = np.arange(start, start + n_rows)
+        dup = rng.random(n_rows) < self.duplicate_rate
+        ids[dup] = rng.integers(0, np.maximum(ids[dup], 1))
+        job_ids = [f"MCF-{2022 + i % 3}-{i:07d}" for i in ids]
+
+        original = rng.integers(0, POSTING_DAYS, n_rows)
+        reposts = np.minimum(rng.geometric(0.7, n_rows) - 1, 5)
+        new = original + reposts * rng.integers(7, 31, n_rows)
+        expiry = new + rng.choice([14, 30, 30, 30, 45, 60], n_rows)
+
+        salary_min = np.round(rng.lognormal(8.2, 0.5, n_rows), -2).astype(np.int64)
+        salary_max = np.round(salary_min * rng.uniform(1.1, 1.9, n_rows), -2).astype(np.int64)
+
+        title_idx = _skewed(rng, len(self.titles), n_rows)
+        titles = _case_variants(
+            self.titles[title_idx], rng.choice(4, n_rows, p=[0.80, 0.10, 0.06, 0.04])
+        )
+        urgent = rng.random(n_rows) < 0.01
+        titles[urgent] = [_URGENT + t for t in titles[urgent]]
+        titles[rng.random(n_rows) < dirty / 5] = None
+
+        companies = _case_variants(
+            self.companies[_skewed(rng, len(self.companies), n_rows, skew=2.5)],
+            rng.choice(4, n_rows, p=[0.85, 0.08, 0.05, 0.02]),
+        )
+
+        status = rng.choice(3, n_rows, p=[0.55, 0.44, 0.01])
+
+        return pd.DataFrame(
+            {
+                "categories": self.categories[_skewed(rng, len(self.categories), n_rows, skew=2.0)],
+                "employmentTypes": rng.choice(
+                    EMPLOYMENT_TYPES, n_rows, p=np.divide(EMPLOYMENT_WEIGHTS, sum(EMPLOYMENT_WEIGHTS))
+                ),
+                "metadata_expiryDate": _dirty(_dates(expiry), rng, dirty, [None, "not a date"]),
+                "metadata_isPostedOnBehalf": rng.choice(["False", "True"], n_rows, p=[0.85, 0.15]),
+                "metadata_jobPostId": job_ids,
+                "metadata_newPostingDate": _dates(new),
+                "metadata_originalPostingDate": _dirty(_dates(original), rng, dirty / 5, [None]),
+                "metadata_repostCount": reposts,
+                "metadata_totalNumberJobApplication": rng.poisson(4, n_rows) * rng.integers(0, 4, n_rows),
+                "metadata_totalNumberOfView": rng.poisson(60, n_rows) * rng.integers(0, 4, n_rows),
+                "minimumYearsExperience": _dirty(
+                    np.minimum(rng.geometric(0.3, n_rows) - 1, 40), rng, dirty, [None, 99]
+                ),
+                "numberOfVacancies": np.minimum(rng.geometric(0.6, n_rows), 50),
+                "occupationId": None,
+                "positionLevels": rng.choice(
+                    POSITION_LEVELS, n_rows, p=np.divide(POSITION_WEIGHTS, sum(POSITION_WEIGHTS))
+                ),
+                "postedCompany_name": companies,
+                "salary_maximum": _dirty(salary_max, rng, dirty, [None, 0]),
+                "salary_minimum": _dirty(salary_min, rng, dirty, [None, 0, "abc"]),
+                "salary_type": rng.choice(["Monthly", "Annually", "Hourly"], n_rows, p=[0.98, 0.015, 0.005]),
+                "status_id": status,
+                "status_jobStatus": np.array(["Open", "Closed", "Re-open"])[status],
+                "title": titles,
+            },
+            columns=RAW_COLUMNS,
+        )
+
+
+def generate_raw(n_rows: int, seed: int = 42, **kwargs) -> pd.DataFrame:
+    """A synthetic raw SGJobData frame of `n_rows` rows."""
+    return SyntheticJobs(n_rows, seed, **kwargs).chunk(0, n_rows)
+
+
+def write_raw_csv(
+    path: Path,
+    n_rows: int,
+    seed: int = 42,
+    chunk_size: int = 500_000,
+    **kwargs,
+) -> Path:
+    """
+    Write `n_rows` synthetic rows to `path` chunk by chunk, so files larger
+    than memory (e.g. 10M rows) can be generated.
+    """
+    gen = SyntheticJobs(n_rows, seed, **kwargs)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for start in range(0, n_rows, chunk_size):
+        chunk = gen.chunk(start, min(chunk_size, n_rows - start))
+        chunk.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    print(f"[Synthetic] Wrote {n_rows:,} rows to {path} ({path.stat().st_size / 1e6:.1f} MB)")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic SGJobData raw CSV")
+    parser.add_argument("--rows", type=int, default=100_000, help="Number of rows (e.g. 100000, 1000000, 10000000).")
+    parser.add_argument("--out", type=Path, required=True, help="Output CSV path.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    write_raw_csv(args.out, args.rows, args.seed)
@@ -0,0 +1,124 @@
+# src/text_normalization.py
+# Title Case normalization of free-text columns (title, postedCompany_name),
+# computed once per distinct value and optionally cached across runs.
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.config import PH2_TEXT_CACHE_PATH
+from src.outputs import as_arrow
+
+# Bump when normalize_text changes: cached forms from older versions are dropped
+NORMALIZER_VERSION = "1"
+
+# ASCII control characters str.split() treats as whitespace but Arrow's
+# ASCII kernels do not; values containing them take the Python path
+_PY_ONLY_WHITESPACE = "[\x1c-\x1f]"
+
+
+def normalize_text(s):
+    """
+    Strip, lower-case and capitalize each word, e.g. " senior r&d ENGINEER "
+    -> "Senior R&d Engineer". One-letter words are upper-cased so acronyms
+    like 'R & D' stay uppercase. Non-strings are returned unchanged.
+    """
+    if isinstance(s, str):
+        s = s.strip().lower()
+        return " ".join([w.capitalize() if len(w) > 1 else w.upper() for w in s.split()])
+    return s
+
+
+def normalize_text_array(values: pa.Array) -> pa.Array:
+    """
+    normalize_text over an Arrow string array: ASCII values with Arrow
+    kernels, the others (rare) in Python so Unicode case rules match.
+    """
+    values = values.cast(pa.string())
+    words = pc.ascii_split_whitespace(pc.ascii_lower(pc.ascii_trim_whitespace(values)))
+    flat = pc.list_flatten(words)
+    flat = pc.if_else(
+        pc.greater(pc.binary_length(flat), 1), pc.ascii_capitalize(flat), pc.ascii_upper(flat)
+    )
+    offsets = pc.list_value_length(words).fill_null(0).to_numpy().cumsum()
+    words = pa.ListArray.from_arrays(
+        pa.array(np.concatenate([[0], offsets]), pa.int32()), flat, mask=pc.is_null(values)
+    )
+    normalized = pc.binary_join(words, " ")
+
+    python_only = pc.or_kleene(
+        pc.invert(pc.string_is_ascii(values)),
+        pc.match_substring_regex(values, _PY_ONLY_WHITESPACE),
+    ).fill_null(False)
+    if not pc.any(python_only).as_py():
+        return normalized
+    out = normalized.to_numpy(zero_copy_only=False)
+    mask = python_only.to_numpy(zero_copy_only=False)
+    out[mask] = [normalize_text(v) for v in values.filter(python_only).to_pylist()]
+    return pa.array(out, pa.string(), from_pandas=True)
+
+
+class TextCache:
+    """
+    Normalized forms of text values, persisted between Phase 2 runs in a
+    two-column Parquet file (raw, normalized) so each run only normalizes
+    values it has not seen before.
+    """
+
+    def __init__(self, path: Path = PH2_TEXT_CACHE_PATH):
+        self.path = path
+        self.raw = pa.array([], pa.string())
+        self.normalized = pa.array([], pa.string())
+        self.hits = self.misses = 0
+        if path.exists():
+            table = pq.read_table(path)
+            version = (table.schema.metadata or {}).get(b"normalizer_version", b"").decode()
+            if version == NORMALIZER_VERSION:
+                self.raw = table["raw"].combine_chunks()
+                self.normalized = table["normalized"].combine_chunks()
+            else:
+                print(f"[Phase 2] Text cache {path.name} is from another normalizer version; rebuilding it.")
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def normalize(self, values: pa.Array) -> pa.Array:
+        """Normalized forms of distinct `values`, computing only the unseen ones."""
+        values = values.cast(pa.string())
+        known = pc.is_in(values, value_set=self.raw)
+        new = values.filter(pc.and_(pc.invert(known), pc.is_valid(values)))
+        self.misses += len(new)
+        self.hits += len(values) - len(new) - values.null_count
+        if len(new):
+            self.raw = pa.concat_arrays([self.raw, new])
+            self.normalized = pa.concat_arrays([self.normalized, normalize_text_array(new)])
+        return self.normalized.take(pc.index_in(values, value_set=self.raw))
+
+    def save(self) -> None:
+        table = pa.table({"raw": self.raw, "normalized": self.normalized})
+        table = table.replace_schema_metadata({"normalizer_version": NORMALIZER_VERSION})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, self.path)
+        print(
+            f"[Phase 2] Text cache: reused {self.hits:,} and added {self.misses:,} "
+            f"normalized values ({len(self):,} cached in {self.path.name})"
+        )
+
+
+def normalize_text_column(values: pd.Series, cache: Optional[TextCache] = None) -> pd.Series:
+    """
+    normalize_text applied to a column, computed once per distinct value
+    and mapped back through the dictionary codes. Returns an object column
+    as Series.apply(normalize_text) would.
+    """
+    encoded = pc.dictionary_encode(as_arrow(values))
+    normalized = (cache.normalize if cache is not None else normalize_text_array)(encoded.dictionary)
+    out = normalized.take(encoded.indices).to_numpy(zero_copy_only=False)
+    missing = pc.is_null(encoded.indices).to_numpy(zero_copy_only=False)
+    if missing.any():
+        out[missing] = values.to_numpy(dtype=object)[missing]
+    return pd.Series(out, index=values.index, name=values.name)
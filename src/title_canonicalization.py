@@ -0,0 +1,239 @@
+# src/title_canonicalization.py
+# Canonical job titles: noise (urgency, brackets, shifts, locations after a
+# dash, seniority) is stripped from each title, which is then mapped to a
+# canonical role by regex rules or by the token index of CANONICAL_TITLES.
+# Titles matching no role keep their cleaned form. Computed once per
+# distinct title; the title -> canonical_title mapping is persisted in a
+# lookup table so later runs only process titles they have not seen.
+import hashlib
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.config import PH2_TITLE_LOOKUP_PATH
+from src.near_duplicates import title_tokens
+from src.outputs import as_arrow
+from src.text_normalization import normalize_text_array
+
+# Bump when the cleaning rules change; changes to CANONICAL_TITLES or
+# TITLE_RULES invalidate the lookup table on their own
+CANONICALIZER_VERSION = "1"
+
+# Applied in order to the lower-cased title
+_BRACKETS = r"\([^)]*\)?|\[[^\]]*\]?|\{[^}]*\}?"
+_AFTER_SEPARATOR = r"\s+[-–—|]+\s.*$"
+_NOISE = (
+    r"\b(?:urgent(?:ly)?|hiring|immediate(?:ly)?|start|wanted|needed|vacanc(?:y|ies)"
+    r"|walk[- ]?in|interview|up to|attractive|salary|bonus|per month|fresh grad(?:uate)?s?"
+    r"|entry[- ]level|no experience|full[- ]time|part[- ]time|permanent|contract|temp(?:orary)?"
+    r"|night shift|day shift|rotating shift|shift|\d+ days?|\d+ years?|wfh|hybrid|remote"
+    r"|senior|snr|sr|junior|jr|principal)\b"
+    r"|\$?\d[\d,.]*k?\b|[!*#~^]+"
+)
+# Abbreviation -> full word, so variants meet on the same tokens
+_ABBREVIATIONS = {
+    "mgr": "manager",
+    "asst": "assistant",
+    "exec": "executive",
+    "engr": "engineer",
+    "eng": "engineer",
+    "dev": "developer",
+    "acct": "accounts",
+    "accts": "accounts",
+    "ops": "operations",
+    "tech": "technician",
+    "rep": "representative",
+    "cust": "customer",
+    "svc": "service",
+    "svcs": "services",
+    "admin": "administrative",
+}
+
+# Regex rules over the cleaned title, checked before the token index; the
+# first rule that matches wins
+TITLE_RULES: List[Tuple[str, str]] = [
+    (r"\b(?:full ?stack|back ?end|front ?end|web|java|python|mobile|ios|android)\s+(?:developer|engineer|programmer)\b", "Software Engineer"),
+    (r"\b(?:programmer|software developer)\b", "Software Engineer"),
+    (r"\b(?:staff|registered|enrolled) nurse\b", "Nurse"),
+    (r"\b(?:sous|commis|head|executive|pastry) chef\b|\bchef de partie\b", "Chef"),
+    (r"\b(?:delivery|despatch|dispatch|lorry|bus|van) driver\b", "Driver"),
+    (r"\b(?:security (?:guard|officer|supervisor)|sso)\b", "Security Officer"),
+    (r"\b(?:call cent(?:re|er)|contact cent(?:re|er)) (?:agent|officer|executive)\b", "Customer Service Officer"),
+    (r"\b(?:cleaning|housekeeping) (?:crew|attendant|operative)\b", "Cleaner"),
+]
+
+# Canonical roles. A title maps to the role with the most tokens that are
+# all in the cleaned title (ties: earliest in this list). Generic heads
+# such as "Engineer" or "Manager" are deliberately absent, so e.g.
+# "Quantum Engineer" keeps its own name instead of collapsing into them.
+CANONICAL_TITLES: List[str] = [
+    # Technology
+    "Software Engineer", "Data Engineer", "Data Scientist", "Data Analyst", "Business Analyst",
+    "Systems Analyst", "IT Support Engineer", "IT Executive", "IT Manager", "Network Engineer",
+    "DevOps Engineer", "Cloud Engineer", "Solutions Architect", "QA Engineer", "UI/UX Designer",
+    "Project Manager", "Product Manager", "Cyber Security Engineer",
+    # Engineering & production
+    "Mechanical Engineer", "Electrical Engineer", "Civil Engineer", "Process Engineer",
+    "Quality Engineer", "R&D Engineer", "Production Supervisor", "Production Operator",
+    "Maintenance Technician", "Electrical Technician", "Quality Inspector", "Site Supervisor",
+    "Quantity Surveyor",
+    # Finance & administration
+    "Accountant", "Accounts Assistant", "Accounts Executive", "Finance Manager", "Finance Executive",
+    "Audit Associate", "Auditor", "Administrative Assistant", "Administrative Executive",
+    "Office Manager", "Receptionist", "Clerk", "Secretary", "Personal Assistant",
+    # People, sales & marketing
+    "HR Executive", "HR Manager", "Recruiter", "Sales Executive", "Sales Manager",
+    "Sales Representative", "Business Development Manager", "Business Development Executive",
+    "Account Manager", "Marketing Executive", "Marketing Manager", "Customer Service Officer",
+    "Customer Service Executive", "Retail Assistant", "Store Manager", "Cashier",
+    # Operations & logistics
+    "Operations Executive", "Operations Manager", "Logistics Executive", "Logistics Coordinator",
+    "Procurement Executive", "Purchasing Executive", "Warehouse Assistant", "Warehouse Supervisor",
+    "Storekeeper", "Forklift Operator", "Driver", "Facilities Executive", "Property Manager",
+    "Security Officer", "Cleaner",
+    # Healthcare, education & hospitality
+    "Nurse", "Clinical Research Coordinator", "Pharmacist", "Physiotherapist", "Doctor",
+    "Healthcare Assistant", "Teacher", "Preschool Teacher", "Tutor", "Chef", "Cook",
+    "Kitchen Assistant", "Service Crew", "Waiter", "Barista", "Restaurant Manager",
+    # Legal & design
+    "Legal Counsel", "Lawyer", "Paralegal", "Graphic Designer", "Interior Designer",
+]
+
+
+def clean_titles(titles: pa.Array) -> pa.Array:
+    """Lower-cased titles without noise, abbreviations expanded, whitespace squashed."""
+    text = pc.utf8_lower(titles.cast(pa.string()))
+    for pattern in (_BRACKETS, _AFTER_SEPARATOR, _NOISE):
+        text = pc.replace_substring_regex(text, pattern, " ")
+    for short, full in _ABBREVIATIONS.items():
+        text = pc.replace_substring_regex(text, rf"\b{short}\b\.?", full)
+    text = pc.replace_substring_regex(text, r"^[\s&/,.+:-]+|[\s&/,.+:-]+$", "")
+    return pc.replace_substring_regex(text, r"\s+", " ")
+
+
+def _rule_matches(cleaned: pa.Array) -> np.ndarray:
+    """Index into TITLE_RULES of the first rule matching each title (-1: none)."""
+    match = np.full(len(cleaned), -1)
+    for i, (pattern, _) in enumerate(TITLE_RULES):
+        hit = pc.match_substring_regex(cleaned, pattern).fill_null(False).to_numpy(zero_copy_only=False)
+        match[(match < 0) & hit] = i
+    return match
+
+
+def _index_matches(cleaned: pa.Array) -> np.ndarray:
+    """
+    Index into CANONICAL_TITLES of the role matched by each title through
+    the token index (-1: none): the longest role whose tokens are all in
+    the title, ties broken by list order.
+    """
+    titles_tok = title_tokens(cleaned)
+    roles_tok = title_tokens(pa.array(CANONICAL_TITLES))
+    title_flat, role_flat = pc.list_flatten(titles_tok), pc.list_flatten(roles_tok)
+    codes = pc.dictionary_encode(pa.concat_arrays([title_flat, role_flat])).indices.to_numpy()
+    titles = pd.DataFrame(
+        {"title": pc.list_parent_indices(titles_tok).to_numpy(), "token": codes[: len(title_flat)]}
+    ).drop_duplicates()
+    roles = pd.DataFrame(
+        {"role": pc.list_parent_indices(roles_tok).to_numpy(), "token": codes[len(title_flat):]}
+    ).drop_duplicates()
+    role_size = np.bincount(roles["role"].to_numpy(), minlength=len(CANONICAL_TITLES))
+
+    hits = titles.merge(roles, on="token").groupby(["title", "role"]).size().reset_index(name="n")
+    hits = hits[hits["n"].to_numpy() == role_size[hits["role"].to_numpy()]]
+    best = hits.assign(size=-hits["n"]).sort_values(["title", "size", "role"]).drop_duplicates("title")
+    match = np.full(len(cleaned), -1)
+    match[best["title"].to_numpy()] = best["role"].to_numpy()
+    return match
+
+
+def canonicalize_titles(titles: pa.Array) -> pa.Array:
+    """
+    Canonical form of each title: the role of the first matching rule in
+    TITLE_RULES, else the role matched through the CANONICAL_TITLES token
+    index, else the cleaned title in Title Case (the original title in
+    Title Case when nothing is left after cleaning). Nulls stay null.
+    """
+    titles = titles.cast(pa.string())
+    cleaned = clean_titles(titles)
+    rule, role = _rule_matches(cleaned), _index_matches(cleaned)
+    fallback = normalize_text_array(
+        pc.if_else(pc.greater(pc.utf8_length(cleaned), 0), cleaned, titles)
+    ).to_numpy(zero_copy_only=False)
+
+    out = fallback.astype(object)
+    out[role >= 0] = np.asarray(CANONICAL_TITLES, dtype=object)[role[role >= 0]]
+    rule_roles = np.asarray([canonical for _, canonical in TITLE_RULES], dtype=object)
+    out[rule >= 0] = rule_roles[rule[rule >= 0]]
+    return pa.array(out, pa.string(), mask=pc.is_null(titles).to_numpy(zero_copy_only=False))
+
+
+def _lookup_version() -> str:
+    """CANONICALIZER_VERSION plus a fingerprint of the rules and dictionary."""
+    digest = hashlib.sha1(repr((TITLE_RULES, CANONICAL_TITLES)).encode()).hexdigest()[:12]
+    return f"{CANONICALIZER_VERSION}-{digest}"
+
+
+class TitleLookup:
+    """
+    title -> canonical_title mapping, persisted between Phase 2 runs in a
+    two-column Parquet file so each run only canonicalizes titles it has
+    not seen before.
+    """
+
+    def __init__(self, path: Path = PH2_TITLE_LOOKUP_PATH):
+        self.path = path
+        self.title = pa.array([], pa.string())
+        self.canonical = pa.array([], pa.string())
+        self.hits = self.misses = 0
+        if path.exists():
+            table = pq.read_table(path)
+            version = (table.schema.metadata or {}).get(b"canonicalizer_version", b"").decode()
+            if version == _lookup_version():
+                self.title = table["title"].combine_chunks()
+                self.canonical = table["canonical_title"].combine_chunks()
+            else:
+                print(f"[Phase 2] Title lookup {path.name} is from other rules; rebuilding it.")
+
+    def __len__(self) -> int:
+        return len(self.title)
+
+    def canonicalize(self, values: pa.Array) -> pa.Array:
+        """Canonical forms of distinct `values`, computing only the unseen ones."""
+        values = values.cast(pa.string())
+        known = pc.is_in(values, value_set=self.title)
+        new = values.filter(pc.and_(pc.invert(known), pc.is_valid(values)))
+        self.misses += len(new)
+        self.hits += len(values) - len(new) - values.null_count
+        if len(new):
+            self.title = pa.concat_arrays([self.title, new])
+            self.canonical = pa.concat_arrays([self.canonical, canonicalize_titles(new)])
+        return self.canonical.take(pc.index_in(values, value_set=self.title))
+
+    def save(self) -> None:
+        table = pa.table({"title": self.title, "canonical_title": self.canonical})
+        table = table.replace_schema_metadata({"canonicalizer_version": _lookup_version()})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, self.path)
+        n_canonical = len(pc.unique(self.canonical))
+        print(
+            f"[Phase 2] Title lookup: reused {self.hits:,} and added {self.misses:,} titles "
+            f"({len(self):,} titles -> {n_canonical:,} canonical titles in {self.path.name})"
+        )
+
+
+def canonical_title_column(titles: pd.Series, lookup: Optional[TitleLookup] = None) -> pd.Series:
+    """
+    canonical_title of each posting, computed once per distinct title (via
+    `lookup` when given) and mapped back through the dictionary codes.
+    """
+    encoded = pc.dictionary_encode(as_arrow(titles))
+    canonical = (lookup.canonicalize if lookup is not None else canonicalize_titles)(
+        encoded.dictionary
+    )
+    out = canonical.take(encoded.indices).to_numpy(zero_copy_only=False)
+    return pd.Series(out, index=titles.index, name="canonical_title")
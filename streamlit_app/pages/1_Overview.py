@@ -3,27 +3,43 @@
 
 import streamlit as st
 import altair as alt
-import pandas as pd
 
-from utils.data import get_job_data
-from utils.filters import apply_base_filters
+from utils.aggregations import (
+    cube_overview_kpis,
+    cube_postings_by,
+    overview_kpis,
+    postings_by,
+    share_table,
+    title_key,
+    top_with_others,
+)
+from utils.data import get_cube, get_filter_cache, get_filter_index, get_filter_metadata, get_job_data
+from utils.filters import sidebar_filters
 
 
 def main():
     st.title("📊 Overview")
 
     df = get_job_data()
-    df_filt, top_n = apply_base_filters(df)
+    df_filt, top_n, cube_filter = sidebar_filters(
+        df, get_filter_index(), get_filter_cache(), get_filter_metadata()
+    )
+    # Postings per sector, employment type and position level come from the
+    # Phase 2 cube when it can answer the selection; companies and titles
+    # (not cube dimensions) from the rows
+    cube = get_cube() if cube_filter is not None else None
+
+    def counts_by(col):
+        if cube is not None and col in cube.columns:
+            return cube_postings_by(cube, cube_filter, col)
+        return postings_by(df_filt, col)
 
     # --- Matrics ---
-    total_posts = df_filt["metadata_jobPostId"].nunique()
-    total_companies = df_filt["postedCompany_name"].nunique()
-    total_sectors = df_filt["primary_category"].nunique()
-    avg_salary = (
-        df_filt["average_salary"].mean()
-        if "average_salary" in df_filt.columns
-        else None
-    )
+    kpis = cube_overview_kpis(cube, cube_filter, df_filt) if cube is not None else overview_kpis(df_filt)
+    total_posts = kpis["total_posts"]
+    total_companies = kpis["total_companies"]
+    total_sectors = kpis["total_sectors"]
+    avg_salary = kpis["avg_salary"]
 
     # ================================
     # --- Matrics ---
@@ -40,25 +56,7 @@ def main():
     st.subheader("Top Hiring Sectors")
 
     if "primary_category" in df_filt.columns:
-        sector_counts = (
-            df_filt.groupby("primary_category")["metadata_jobPostId"]
-            .nunique()
-            .sort_values(ascending=False)
-        )
-
-        top_sector_counts = sector_counts.head(top_n)
-        other_count = sector_counts.iloc[top_n:].sum()
-
-        top_sector_counts.index.name = "Sector"
-        bar_df = top_sector_counts.reset_index(name="job_count")
-
-        pie_counts = top_sector_counts.copy()
-        if other_count > 0:
-            pie_counts = pd.concat([pie_counts, pd.Series({"Others": other_count})])
-        pie_counts.index.name = "Sector"
-        pie_df = pie_counts.reset_index(name="job_count")
-        pie_df["pct"] = (pie_df["job_count"] / pie_df["job_count"].sum()) * 100
-        pie_df["label"] = pie_df["Sector"] + " (" + pie_df["pct"].round(1).astype(str) + "%)"
+        bar_df, pie_df = top_with_others(counts_by("primary_category"), top_n, "Sector")
 
         col1, col2 = st.columns([2, 1])
 
@@ -102,25 +100,7 @@ def main():
     st.subheader("Top Hiring Companies")
 
     if "postedCompany_name" in df_filt.columns:
-        company_counts = (
-            df_filt.groupby("postedCompany_name")["metadata_jobPostId"]
-            .nunique()
-            .sort_values(ascending=False)
-        )
-
-        top_company_counts = company_counts.head(top_n)
-        other_count = company_counts.iloc[top_n:].sum()
-
-        top_company_counts.index.name = "Company"
-        bar_df = top_company_counts.reset_index(name="job_count")
-
-        pie_counts = top_company_counts.copy()
-        if other_count > 0:
-            pie_counts = pd.concat([pie_counts, pd.Series({"Others": other_count})])
-        pie_counts.index.name = "Company"
-        pie_df = pie_counts.reset_index(name="job_count")
-        pie_df["pct"] = (pie_df["job_count"] / pie_df["job_count"].sum()) * 100
-        pie_df["label"] = pie_df["Company"] + " (" + pie_df["pct"].round(1).astype(str) + "%)"
+        bar_df, pie_df = top_with_others(postings_by(df_filt, "postedCompany_name"), top_n, "Company")
 
         col1, col2 = st.columns([2, 1])
 
@@ -157,25 +137,7 @@ def main():
     st.subheader("Top Hiring Job Titles")
 
     if "title" in df_filt.columns:
-        title_counts = (
-            df_filt.groupby("title")["metadata_jobPostId"]
-            .nunique()
-            .sort_values(ascending=False)
-        )
-
-        top_title_counts = title_counts.head(top_n)
-        other_count = title_counts.iloc[top_n:].sum()
- 
-        top_title_counts.index.name = "Title"
-        bar_df = top_title_counts.reset_index(name="job_count")
-
-        pie_counts = top_title_counts.copy()
-        if other_count > 0:
-            pie_counts = pd.concat([pie_counts, pd.Series({"Others": other_count})])
-        pie_counts.index.name = "Title"
-        pie_df = pie_counts.reset_index(name="job_count")
-        pie_df["pct"] = (pie_df["job_count"] / pie_df["job_count"].sum()) * 100
-        pie_df["label"] = pie_df["Title"] + " (" + pie_df["pct"].round(1).astype(str) + "%)"
+        bar_df, pie_df = top_with_others(postings_by(df_filt, title_key(df_filt)), top_n, "Title")
 
         col1, col2 = st.columns([2, 1])
 
@@ -227,14 +189,7 @@ def main():
     )
 
     if emp_col:
-        emp_counts = (
-            df_filt.groupby(emp_col)["metadata_jobPostId"]
-            .nunique()
-            .sort_values(ascending=False)
-        )
-        pie_df = emp_counts.reset_index(name="job_count")
-        pie_df["pct"] = (pie_df["job_count"] / pie_df["job_count"].sum()) * 100
-        pie_df["label"] = pie_df[emp_col] + " (" + pie_df["pct"].round(1).astype(str) + "%)"
+        pie_df = share_table(counts_by(emp_col), emp_col)
 
         emp_chart = (
             alt.Chart(pie_df)
@@ -262,14 +217,7 @@ def main():
     )
 
     if pos_col:
-        pos_counts = (
-            df_filt.groupby(pos_col)["metadata_jobPostId"]
-            .nunique()
-            .sort_values(ascending=False)
-        )
-        pie_df = pos_counts.reset_index(name="job_count")
-        pie_df["pct"] = (pie_df["job_count"] / pie_df["job_count"].sum()) * 100
-        pie_df["label"] = pie_df[pos_col] + " (" + pie_df["pct"].round(1).astype(str) + "%)"
+        pie_df = share_table(counts_by(pos_col), pos_col)
 
         pos_chart = (
             alt.Chart(pie_df)
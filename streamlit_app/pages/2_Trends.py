@@ -8,11 +8,26 @@
 # - Category vs position level heatmap
 
 import streamlit as st
-import pandas as pd
 import altair as alt
 
-from utils.data import get_job_data
-from utils.filters import apply_base_filters
+from utils.aggregations import (
+    cube_duration_trend,
+    cube_interest_trend,
+    cube_postings_trend,
+    cube_salary_trend,
+    cube_sector_position_counts,
+    cube_top_sectors,
+    cube_vacancy_trend,
+    duration_trend,
+    interest_trend,
+    postings_trend,
+    salary_trend,
+    sector_position_counts,
+    top_sectors,
+    vacancy_trend,
+)
+from utils.data import get_cube, get_filter_cache, get_filter_index, get_filter_metadata, get_job_data
+from utils.filters import sidebar_filters
 from utils.charts import postings_over_time_by_sector
 
 
@@ -20,17 +35,22 @@ def main():
     st.title("🏭 Industry Trends")
 
     df = get_job_data()
-    df_filt, top_n = apply_base_filters(df)
+    df_filt, top_n, cube_filter = sidebar_filters(
+        df, get_filter_index(), get_filter_cache(), get_filter_metadata()
+    )
+    # Every chart comes from the Phase 2 cube when it can answer the
+    # selection, else from the top sectors' rows
+    cube = get_cube() if cube_filter is not None else None
+    columns = set(df_filt.columns)
 
     # Identify top N sectors
-    if "primary_category" in df_filt.columns:
-        top_sectors = (
-            df_filt["primary_category"]
-            .value_counts()
-            .head(top_n)
-            .index
-        )
-        df_top = df_filt[df_filt["primary_category"].isin(top_sectors)]
+    if "primary_category" in columns:
+        if cube is not None:
+            sectors = cube_top_sectors(cube, cube_filter, top_n)
+            where_top = {**cube_filter, "primary_category": sectors}
+        else:
+            sectors = top_sectors(df_filt, top_n)
+            df_top = df_filt[df_filt["primary_category"].isin(sectors)]
     else:
         st.warning("No primary_category field found.")
         return
@@ -40,8 +60,9 @@ def main():
     # ================================
     st.subheader(f"📈 Job Postings Over Time (Top {top_n} Sectors)")
 
-    if "posting_month" in df_top.columns:
-        chart = postings_over_time_by_sector(df_top)
+    if "posting_month" in columns:
+        trend = cube_postings_trend(cube, where_top) if cube is not None else postings_trend(df_top)
+        chart = postings_over_time_by_sector(trend)
         st.altair_chart(chart, width="stretch")
     else:
         st.info("No posting date information available.")
@@ -49,17 +70,12 @@ def main():
     # ================================
     # --- Salary trend over time ---
     # ================================
-    if "average_salary" in df_top.columns and "posting_month" in df_top.columns:
+    if "average_salary" in columns and "posting_month" in columns:
         st.subheader(f"💰 Average Salary Trend Over Time (Top {top_n} Sectors)")
 
-        salary_trend = (
-            df_top.groupby(["posting_month", "primary_category"])["average_salary"]
-            .mean()
-            .reset_index()
-        )
-
+        trend = cube_salary_trend(cube, where_top) if cube is not None else salary_trend(df_top)
         line = (
-            alt.Chart(salary_trend)
+            alt.Chart(trend)
             .mark_line(point=True)
             .encode(
                 x=alt.X("posting_month:T", title="Month"),
@@ -84,27 +100,12 @@ def main():
         "posting_month",
         "metadata_totalNumberJobApplication",
         "metadata_totalNumberOfView",
-    } <= set(df_top.columns):
+    } <= columns:
         st.subheader("👀 Application Interest Trend (Views & Applications per Posting)")
 
-        interest = (
-            df_top.groupby("posting_month")
-            .agg(
-                total_apps=("metadata_totalNumberJobApplication", "sum"),
-                total_views=("metadata_totalNumberOfView", "sum"),
-                postings=("metadata_jobPostId", "nunique"),
-            )
-            .reset_index()
-        )
-        interest["apps_per_post"] = interest["total_apps"] / interest["postings"]
-        interest["views_per_post"] = interest["total_views"] / interest["postings"]
-
-        # Melt for Altair long format
-        interest_long = interest.melt(
-            id_vars="posting_month",
-            value_vars=["apps_per_post", "views_per_post"],
-            var_name="metric",
-            value_name="value",
+        # Long format for Altair
+        interest_long = (
+            cube_interest_trend(cube, where_top) if cube is not None else interest_trend(df_top)
         )
         metric_labels = {
             "apps_per_post": "Applications per Posting",
@@ -141,20 +142,10 @@ def main():
     # ================================
     # --- Vacancy vs postings trend ---
     # ================================
-    if {"posting_month", "numberOfVacancies"} <= set(df_top.columns):
+    if {"posting_month", "numberOfVacancies"} <= columns:
         st.subheader("🏗️ Hiring Intensity: Vacancies vs Postings Trend")
 
-        vac_trend = (
-            df_top.groupby("posting_month")
-            .agg(
-                total_vacancies=("numberOfVacancies", "sum"),
-                total_postings=("metadata_jobPostId", "nunique"),
-            )
-            .reset_index()
-        )
-        vac_trend["vacancies_per_posting"] = (
-            vac_trend["total_vacancies"] / vac_trend["total_postings"]
-        )
+        vac_trend = cube_vacancy_trend(cube, where_top) if cube is not None else vacancy_trend(df_top)
 
         line_vac = (
             alt.Chart(vac_trend)
@@ -192,19 +183,16 @@ def main():
     # ================================
     # --- Posting Duration Trend ---
     # ================================
-    if {"posting_month", "posting_duration"} <= set(df_top.columns):
+    if {"posting_month", "posting_duration"} <= columns:
         st.subheader("⏳ Average Posting Duration Over Time (Days)")
 
-        # Filter out negative or unrealistically long durations
-        df_dur = df_top[df_top["posting_duration"].between(0, 180)]
-
-        # Average posting duration by month and sector (limit to top_n)
+        # Average posting duration by month and sector (limit to top_n),
+        # without negative or unrealistically long durations
         dur_trend = (
-            df_dur.groupby(["posting_month", "primary_category"])["posting_duration"]
-            .mean()
-            .reset_index()
+            cube_duration_trend(cube, where_top, sectors)
+            if cube is not None
+            else duration_trend(df_top, sectors)
         )
-        dur_trend = dur_trend[dur_trend["primary_category"].isin(top_sectors)]
 
         chart = (
             alt.Chart(dur_trend)
@@ -235,15 +223,11 @@ def main():
     # ================================
     st.subheader(f"📊 Sector vs Position Level (Top {top_n} Sectors)")
 
-    if {"primary_category", "positionLevels"} <= set(df_top.columns):
+    if {"primary_category", "positionLevels"} <= columns:
         cross = (
-            pd.crosstab(df_top["primary_category"], df_top["positionLevels"])
-            .reset_index()
-            .melt(
-                id_vars="primary_category",
-                var_name="positionLevels",
-                value_name="count",
-            )
+            cube_sector_position_counts(cube, where_top)
+            if cube is not None
+            else sector_position_counts(df_top)
         )
 
         heat = (
@@ -252,7 +236,7 @@ def main():
             .encode(
                 x=alt.X("positionLevels:N", title="Position Level"),
                 y=alt.Y(
-                    "primary_category:N", title="Sector", sort=top_sectors.tolist()
+                    "primary_category:N", title="Sector", sort=sectors.tolist()
                 ),
                 color=alt.Color("count:Q", title="Number of Postings"),
                 tooltip=["primary_category", "positionLevels", "count"],
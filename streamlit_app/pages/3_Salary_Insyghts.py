@@ -6,7 +6,8 @@ import pandas as pd
 import numpy as np
 import altair as alt
 
-from utils.data import get_job_data
+from utils.aggregations import mean_salary_order, postings_by, title_key
+from utils.data import get_filter_cache, get_filter_index, get_filter_metadata, get_job_data
 from utils.filters import apply_base_filters
 from utils.charts import salary_by_sector_bar, salary_by_title_bar
 from streamlit_app.utils.dark_catplot import DarkCatplotTheme
@@ -16,7 +17,9 @@ def main():
 
     # 1) Load + base filters
     df = get_job_data()
-    df_filt, top_n = apply_base_filters(df)
+    df_filt, top_n = apply_base_filters(
+        df, get_filter_index(), get_filter_cache(), get_filter_metadata()
+    )
 
     if df_filt.empty:
         st.info("No job postings match the current global filters.")
@@ -26,8 +29,8 @@ def main():
         st.warning("Salary information (average_salary) not available.")
         return
 
-    # Work on a copy to avoid chained assignment issues
-    df_work = df_filt.copy()
+    # Work on a (copy-on-write) copy to avoid chained assignment issues
+    df_work = df_filt.copy(deep=False)
 
     # Ensure average_salary is numeric and drop rows without it
     df_work["average_salary"] = pd.to_numeric(
@@ -108,11 +111,7 @@ def main():
         st.warning("Average salary is not numeric; cannot draw salary charts.")
     else:
         # Determine top_n sectors by unique job postings (within the locally filtered df_work)
-        sector_counts = (
-            df_work.groupby("primary_category")["metadata_jobPostId"]
-            .nunique()
-            .sort_values(ascending=False)
-        )
+        sector_counts = postings_by(df_work, "primary_category")
 
         if sector_counts.empty:
             st.info("No sector data available to build salary chart.")
@@ -138,11 +137,7 @@ def main():
 
     if "primary_category" in df_work.columns:
         # Top N categories by posting count (to limit noise)
-        cat_counts = (
-            df_work.groupby("primary_category")["metadata_jobPostId"]
-            .nunique()
-            .sort_values(ascending=False)
-        )
+        cat_counts = postings_by(df_work, "primary_category")
 
         if not cat_counts.empty:
             top_for_box = min(top_n, len(cat_counts))
@@ -159,25 +154,20 @@ def main():
 
             if not df_box.empty:
                 # order by mean salary
-                mean_salary_order = (
-                    df_box.groupby("primary_category")["average_salary"]
-                    .mean()
-                    .sort_values(ascending=True)
-                    .index
-                )
+                salary_order = mean_salary_order(df_box, "primary_category")
                 df_box["primary_category"] = pd.Categorical(
                     df_box["primary_category"],
-                    categories=list(mean_salary_order),
+                    categories=list(salary_order),
                     ordered=True,
                 )
 
-                n_cats = len(mean_salary_order)
+                n_cats = len(salary_order)
                 height = max(4, 0.35 * n_cats + 1)
 
                 theme = DarkCatplotTheme()
                 fig, ax = theme.salary_catplot(
                     df=df_box,
-                    order=mean_salary_order.tolist(),
+                    order=salary_order.tolist(),
                     height=height,
                     top_n=top_for_box,
                     x_col="average_salary",
@@ -201,17 +191,14 @@ def main():
         st.warning("Average salary is not numeric; cannot draw salary charts.")
     else:
         # Determine top_n titles by unique job postings (within the locally filtered df_work)
-        title_counts = (
-            df_work.groupby("title")["metadata_jobPostId"]
-            .nunique()
-            .sort_values(ascending=False)
-        )
+        title_col = title_key(df_work)
+        title_counts = postings_by(df_work, title_col)
 
         if title_counts.empty:
             st.info("No job title data available to build salary chart.")
         else:
             top_title_names = title_counts.head(top_n).index
-            df_title = df_work[df_work["title"].isin(top_title_names)].copy()
+            df_title = df_work[df_work[title_col].isin(top_title_names)].copy()
 
             metric = st.radio("Metric", ["median", "mean"], horizontal=True)
 
@@ -2,10 +2,15 @@
 # Scatter: experience vs salary, plus countplot-style bar for roles by level & experience.
 
 import streamlit as st
-import pandas as pd
 import altair as alt
 
-from utils.data import get_job_data
+from utils.aggregations import (
+    EXPERIENCE_COLS,
+    EXPERIENCE_LABELS,
+    experience_salary_frame,
+    level_experience_counts,
+)
+from utils.data import get_filter_cache, get_filter_index, get_filter_metadata, get_job_data
 from utils.filters import apply_base_filters
 
 
@@ -16,45 +21,21 @@ def main():
     st.title("👩‍💼 Experience & Roles")
 
     df = get_job_data()
-    df_filt, _ = apply_base_filters(df)
-
-    required_cols = {
-        "minimumYearsExperience",
-        "average_salary",
-        "positionLevels",
-        "title",
-        "primary_category",
-    }
-    missing = required_cols - set(df_filt.columns)
+    df_filt, _ = apply_base_filters(
+        df, get_filter_index(), get_filter_cache(), get_filter_metadata()
+    )
+
+    missing = set(EXPERIENCE_COLS) - set(df_filt.columns)
     if missing:
         st.warning(f"Missing columns: {', '.join(sorted(missing))}")
         return
 
-    df_exp = (
-        df_filt[list(required_cols)]
-        .dropna(subset=["minimumYearsExperience", "average_salary"])
-        .copy()
-    )
-
-    if df_exp.empty:
+    if df_filt[["minimumYearsExperience", "average_salary"]].dropna().empty:
         st.info("No records with both experience and salary available after filtering.")
         return
 
-    # --- Clean and filter numeric values ---
-    df_exp["minimumYearsExperience"] = pd.to_numeric(
-        df_exp["minimumYearsExperience"], errors="coerce"
-    )
-    df_exp = df_exp[
-        (df_exp["minimumYearsExperience"] >= 0)
-        & (df_exp["minimumYearsExperience"] <= 20)
-    ]
-
-    # Clip salary outliers (1–99 percentile)
-    sal_low, sal_high = df_exp["average_salary"].quantile([0.01, 0.99])
-    df_exp = df_exp[
-        (df_exp["average_salary"] >= sal_low)
-        & (df_exp["average_salary"] <= sal_high)
-    ]
+    # 0–20 years of experience, salary outliers (1–99 percentile) clipped
+    df_exp = experience_salary_frame(df_filt)
 
     if df_exp.empty:
         st.info("No data left after removing outliers.")
@@ -108,27 +89,13 @@ def main():
     # --------------------------------------------
     st.subheader("Roles by Level and Experience Band")
 
-    bins = [-1, 2, 5, 10, 20]
-    labels = ["0–2", "3–5", "6–10", "11–20"]
-    df_exp["experience_band"] = pd.cut(
-        df_exp["minimumYearsExperience"], bins=bins, labels=labels
-    )
-
-    crosstab = (
-        pd.crosstab(df_exp["positionLevels"], df_exp["experience_band"])
-        .reset_index()
-        .melt(
-            id_vars="positionLevels",
-            var_name="experience_band",
-            value_name="count",
-        )
-    )
+    crosstab = level_experience_counts(df_exp)
 
     bar = (
         alt.Chart(crosstab)
         .mark_bar()
         .encode(
-            x=alt.X("experience_band:N", title="Experience Band (Years)", sort=labels),
+            x=alt.X("experience_band:N", title="Experience Band (Years)", sort=EXPERIENCE_LABELS),
             y=alt.Y("count:Q", title="Number of Postings"),
             color=alt.Color("positionLevels:N", title="Position Level"),
             tooltip=["positionLevels", "experience_band", "count"],
@@ -0,0 +1,341 @@
+# streamlit_app/utils/aggregations.py
+# The aggregations behind each page's charts, free of Streamlit calls so
+# they can be reused (and timed by benchmarks/run_benchmarks.py). The cube_*
+# variants compute the same frames from the Phase 2 aggregate cube
+# (src/cube.py) for a {column: value} filter of the sidebar selection.
+
+from pathlib import Path
+import sys
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+from src.cube import query_cube
+
+ID_COL = "metadata_jobPostId"
+# Near-duplicate group written by Phase 2 (src/near_duplicates.py): reposts
+# of a job share it, so counting it counts each job once
+DUPLICATE_GROUP_COL = "duplicate_group_id"
+# Canonical job title written by Phase 2 (src/title_canonicalization.py)
+CANONICAL_TITLE_COL = "canonical_title"
+
+# Experience bands (years) on the Experience & Roles page
+EXPERIENCE_BINS = [-1, 2, 5, 10, 20]
+EXPERIENCE_LABELS = ["0–2", "3–5", "6–10", "11–20"]
+
+
+# ================================
+# --- Shared ---
+# ================================
+def posting_key(df: pd.DataFrame) -> str:
+    """Column counted as one posting: the near-duplicate group if present, else the job ID."""
+    return DUPLICATE_GROUP_COL if DUPLICATE_GROUP_COL in df.columns else ID_COL
+
+
+def title_key(df: pd.DataFrame) -> str:
+    """Column grouped on for job titles: the canonical title if present, else the raw title."""
+    return CANONICAL_TITLE_COL if CANONICAL_TITLE_COL in df.columns else "title"
+
+
+def postings_by(df: pd.DataFrame, col) -> pd.Series:
+    """Unique postings per value of `col` (or per combination of columns), largest first."""
+    return (
+        df.groupby(col, observed=True)[posting_key(df)]
+        .nunique()
+        .sort_values(ascending=False)
+    )
+
+
+def salary_stats_by(df: pd.DataFrame, col: str) -> pd.DataFrame:
+    """Mean / median / count of average_salary per value of `col`."""
+    return (
+        df.groupby(col, observed=True)["average_salary"]
+          .agg(mean="mean", median="median", count="count")
+          .reset_index()
+    )
+
+
+def share_table(counts: pd.Series, col: str) -> pd.DataFrame:
+    """Pie data: job_count, pct and a "value (pct%)" label per row of `counts`."""
+    counts = counts.copy()
+    counts.index.name = col
+    pie_df = counts.reset_index(name="job_count")
+    pie_df["pct"] = (pie_df["job_count"] / pie_df["job_count"].sum()) * 100
+    pie_df["label"] = pie_df[col].astype(str) + " (" + pie_df["pct"].round(1).astype(str) + "%)"
+    return pie_df
+
+
+# ================================
+# --- Overview ---
+# ================================
+def overview_kpis(df: pd.DataFrame) -> Dict[str, Optional[float]]:
+    return {
+        "total_posts": df[posting_key(df)].nunique(),
+        "total_companies": df["postedCompany_name"].nunique(),
+        "total_sectors": df["primary_category"].nunique(),
+        "avg_salary": df["average_salary"].mean() if "average_salary" in df.columns else None,
+    }
+
+
+def top_with_others(counts: pd.Series, top_n: int, label: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Bar data for the top `top_n` rows of `counts` and pie data with the
+    remaining rows aggregated as "Others".
+    """
+    top_counts = counts.head(top_n).copy()
+    other_count = counts.iloc[top_n:].sum()
+
+    top_counts.index.name = label
+    bar_df = top_counts.reset_index(name="job_count")
+
+    pie_counts = top_counts.copy()
+    if other_count > 0:
+        pie_counts = pd.concat([pie_counts, pd.Series({"Others": other_count})])
+    return bar_df, share_table(pie_counts, label)
+
+
+# ================================
+# --- Industry Trends ---
+# ================================
+def top_sectors(df: pd.DataFrame, top_n: int) -> pd.Index:
+    return df["primary_category"].value_counts().head(top_n).index
+
+
+def postings_trend(df: pd.DataFrame) -> pd.DataFrame:
+    """Unique postings (job_count) by month and sector."""
+    return (
+        df.groupby(["posting_month", "primary_category"], observed=True)[posting_key(df)]
+          .nunique()
+          .reset_index(name="job_count")
+    )
+
+
+def salary_trend(df: pd.DataFrame) -> pd.DataFrame:
+    return (
+        df.groupby(["posting_month", "primary_category"], observed=True)["average_salary"]
+        .mean()
+        .reset_index()
+    )
+
+
+def interest_trend(df: pd.DataFrame) -> pd.DataFrame:
+    """Applications and views per posting by month, in long format."""
+    interest = (
+        df.groupby("posting_month")
+        .agg(
+            total_apps=("metadata_totalNumberJobApplication", "sum"),
+            total_views=("metadata_totalNumberOfView", "sum"),
+            postings=(posting_key(df), "nunique"),
+        )
+        .reset_index()
+    )
+    return _interest_long(interest)
+
+
+def _interest_long(interest: pd.DataFrame) -> pd.DataFrame:
+    interest["apps_per_post"] = interest["total_apps"] / interest["postings"]
+    interest["views_per_post"] = interest["total_views"] / interest["postings"]
+
+    return interest.melt(
+        id_vars="posting_month",
+        value_vars=["apps_per_post", "views_per_post"],
+        var_name="metric",
+        value_name="value",
+    )
+
+
+def vacancy_trend(df: pd.DataFrame) -> pd.DataFrame:
+    vac_trend = (
+        df.groupby("posting_month")
+        .agg(
+            total_vacancies=("numberOfVacancies", "sum"),
+            total_postings=(posting_key(df), "nunique"),
+        )
+        .reset_index()
+    )
+    return _vacancies_per_posting(vac_trend)
+
+
+def _vacancies_per_posting(vac_trend: pd.DataFrame) -> pd.DataFrame:
+    vac_trend["vacancies_per_posting"] = (
+        vac_trend["total_vacancies"] / vac_trend["total_postings"]
+    )
+    return vac_trend
+
+
+def duration_trend(df: pd.DataFrame, sectors: pd.Index) -> pd.DataFrame:
+    """Mean posting duration (0–180 days only) by month and sector."""
+    df_dur = df[df["posting_duration"].between(0, 180)]
+    dur_trend = (
+        df_dur.groupby(["posting_month", "primary_category"], observed=True)["posting_duration"]
+        .mean()
+        .reset_index()
+    )
+    return dur_trend[dur_trend["primary_category"].isin(sectors)]
+
+
+def sector_position_counts(df: pd.DataFrame) -> pd.DataFrame:
+    return _melt_sector_position(pd.crosstab(df["primary_category"], df["positionLevels"]))
+
+
+def _melt_sector_position(cross: pd.DataFrame) -> pd.DataFrame:
+    return (
+        cross.reset_index()
+        .melt(
+            id_vars="primary_category",
+            var_name="positionLevels",
+            value_name="count",
+        )
+    )
+
+
+# ================================
+# --- Cube (src/cube.py) ---
+# ================================
+# Unique postings come from the cube's jobs measure, which counts a repost
+# group spanning several cells once per result row, as nunique does
+def cube_postings_by(cube: pd.DataFrame, where: Dict[str, str], col: str) -> pd.Series:
+    """postings_by from the cube (`col` a cube dimension)."""
+    totals = query_cube(cube, [col], where)
+    return totals.set_index(col)["jobs"].sort_values(ascending=False)
+
+
+def cube_overview_kpis(
+    cube: pd.DataFrame, where: Dict[str, str], df: pd.DataFrame
+) -> Dict[str, Optional[float]]:
+    """overview_kpis from the cube; companies, not a cube dimension, are counted from the rows `df`."""
+    totals = query_cube(cube, where=where)
+    return {
+        "total_posts": int(totals["jobs"].iloc[0]),
+        "total_companies": df["postedCompany_name"].nunique(),
+        "total_sectors": len(query_cube(cube, ["primary_category"], where)),
+        "avg_salary": totals["salary_mean"].iloc[0] if "average_salary" in df.columns else None,
+    }
+
+
+def cube_top_sectors(cube: pd.DataFrame, where: Dict[str, str], top_n: int) -> pd.Index:
+    """top_sectors from the cube."""
+    totals = query_cube(cube, ["primary_category"], where)
+    # Stable, as value_counts: tied sectors keep their order
+    totals = totals.sort_values("postings", ascending=False, kind="stable")
+    return pd.Index(totals["primary_category"].head(top_n))
+
+
+def cube_salary_trend(cube: pd.DataFrame, where: Dict[str, str]) -> pd.DataFrame:
+    """salary_trend from the cube."""
+    totals = query_cube(cube, ["posting_month", "primary_category"], where)
+    return totals[["posting_month", "primary_category", "salary_mean"]].rename(
+        columns={"salary_mean": "average_salary"}
+    )
+
+
+def cube_postings_trend(cube: pd.DataFrame, where: Dict[str, str]) -> pd.DataFrame:
+    """postings_trend from the cube."""
+    totals = query_cube(cube, ["posting_month", "primary_category"], where)
+    return totals[["posting_month", "primary_category", "jobs"]].rename(columns={"jobs": "job_count"})
+
+
+def cube_interest_trend(cube: pd.DataFrame, where: Dict[str, str]) -> pd.DataFrame:
+    """interest_trend from the cube."""
+    totals = query_cube(cube, ["posting_month"], where)
+    interest = totals[["posting_month", "applications", "views", "jobs"]].rename(
+        columns={"applications": "total_apps", "views": "total_views", "jobs": "postings"}
+    )
+    return _interest_long(interest)
+
+
+def cube_vacancy_trend(cube: pd.DataFrame, where: Dict[str, str]) -> pd.DataFrame:
+    """vacancy_trend from the cube."""
+    totals = query_cube(cube, ["posting_month"], where)
+    vac_trend = totals[["posting_month", "vacancies", "jobs"]].rename(
+        columns={"vacancies": "total_vacancies", "jobs": "total_postings"}
+    )
+    return _vacancies_per_posting(vac_trend)
+
+
+def cube_duration_trend(cube: pd.DataFrame, where: Dict[str, str], sectors: pd.Index) -> pd.DataFrame:
+    """duration_trend from the cube."""
+    totals = query_cube(cube, ["posting_month", "primary_category"], where)
+    totals = totals[(totals["duration_count"] > 0) & totals["primary_category"].isin(sectors)]
+    return totals[["posting_month", "primary_category", "duration_mean"]].rename(
+        columns={"duration_mean": "posting_duration"}
+    )
+
+
+def cube_sector_position_counts(cube: pd.DataFrame, where: Dict[str, str]) -> pd.DataFrame:
+    """sector_position_counts from the cube."""
+    totals = query_cube(cube, ["primary_category", "positionLevels"], where)
+    cross = totals.set_index(["primary_category", "positionLevels"])["postings"].unstack(fill_value=0)
+    return _melt_sector_position(cross)
+
+
+# ================================
+# --- Salary Insights ---
+# ================================
+def mean_salary_order(df: pd.DataFrame, col: str = "primary_category") -> pd.Index:
+    """Values of `col` ordered by mean average_salary, lowest first."""
+    return (
+        df.groupby(col, observed=True)["average_salary"]
+        .mean()
+        .sort_values(ascending=True)
+        .index
+    )
+
+
+# ================================
+# --- Experience & Roles ---
+# ================================
+EXPERIENCE_COLS: List[str] = [
+    "minimumYearsExperience",
+    "average_salary",
+    "positionLevels",
+    "title",
+    "primary_category",
+]
+
+
+def experience_salary_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Postings with 0–20 years of experience and a salary inside the 1–99
+    percentile range.
+    """
+    df_exp = (
+        df[EXPERIENCE_COLS]
+        .dropna(subset=["minimumYearsExperience", "average_salary"])
+        .copy()
+    )
+    if df_exp.empty:
+        return df_exp
+
+    df_exp["minimumYearsExperience"] = pd.to_numeric(
+        df_exp["minimumYearsExperience"], errors="coerce"
+    )
+    df_exp = df_exp[
+        (df_exp["minimumYearsExperience"] >= 0)
+        & (df_exp["minimumYearsExperience"] <= 20)
+    ]
+
+    sal_low, sal_high = df_exp["average_salary"].quantile([0.01, 0.99])
+    return df_exp[
+        (df_exp["average_salary"] >= sal_low)
+        & (df_exp["average_salary"] <= sal_high)
+    ]
+
+
+def level_experience_counts(df_exp: pd.DataFrame) -> pd.DataFrame:
+    """Postings per position level and experience band, in long format."""
+    bands = pd.cut(
+        df_exp["minimumYearsExperience"], bins=EXPERIENCE_BINS, labels=EXPERIENCE_LABELS
+    )
+    return (
+        pd.crosstab(df_exp["positionLevels"], bands.rename("experience_band"))
+        .reset_index()
+        .melt(
+            id_vars="positionLevels",
+            var_name="experience_band",
+            value_name="count",
+        )
+    )
@@ -4,10 +4,12 @@
 import altair as alt
 import pandas as pd
 
+from utils.aggregations import posting_key, salary_stats_by, title_key
+
 
 def top_sectors_bar(df: pd.DataFrame, top_n: int = 10) -> alt.Chart:
     data = (
-        df.groupby("primary_category")["metadata_jobPostId"]
+        df.groupby("primary_category", observed=True)[posting_key(df)]
           .nunique()
           .reset_index(name="job_count")
           .sort_values("job_count", ascending=False)
@@ -26,16 +28,11 @@ def top_sectors_bar(df: pd.DataFrame, top_n: int = 10) -> alt.Chart:
     return chart
 
 
-def postings_over_time_by_sector(df: pd.DataFrame) -> alt.Chart:
-    if "posting_month" not in df.columns:
+def postings_over_time_by_sector(data: pd.DataFrame) -> alt.Chart:
+    """Line chart of job_count by month and sector (postings_trend)."""
+    if "posting_month" not in data.columns:
         return alt.Chart(pd.DataFrame({"x": [], "y": []})).mark_line()
 
-    data = (
-        df.groupby(["posting_month", "primary_category"])["metadata_jobPostId"]
-          .nunique()
-          .reset_index(name="job_count")
-    )
-
     chart = (
         alt.Chart(data)
         .mark_line()
@@ -50,11 +47,7 @@ def postings_over_time_by_sector(df: pd.DataFrame) -> alt.Chart:
 
 
 def salary_by_sector_bar(df: pd.DataFrame, metric: str = "median") -> alt.Chart:
-    data = (
-        df.groupby("primary_category")["average_salary"]
-          .agg(mean="mean", median="median", count="count")
-          .reset_index()
-    )
+    data = salary_stats_by(df, "primary_category")
 
     chart = (
         alt.Chart(data)
@@ -74,11 +67,8 @@ def salary_by_sector_bar(df: pd.DataFrame, metric: str = "median") -> alt.Chart:
 
 
 def salary_by_title_bar(df: pd.DataFrame, metric: str = "median") -> alt.Chart:
-    data = (
-        df.groupby("title")["average_salary"]
-          .agg(mean="mean", median="median", count="count")
-          .reset_index()
-    )
+    col = title_key(df)
+    data = salary_stats_by(df, col).rename(columns={col: "title"})
 
     chart = (
         alt.Chart(data)
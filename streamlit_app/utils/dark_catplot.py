@@ -72,7 +72,7 @@ class DarkCatplotTheme:
 
         # medians as white dots – use numpy array to keep type checker happy
         medians = (
-            df.groupby(y_col)[x_col]
+            df.groupby(y_col, observed=True)[x_col]
             .median()
             .reindex(order_index)
             .to_numpy(dtype="float64")
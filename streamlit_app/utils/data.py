@@ -1,11 +1,22 @@
 # -----------------------------
 # streamlit_app/utils/data.py
-# loader for the cleaned CSV (Phase 2/3 output) 
+# loader for the cleaned dataset (Phase 2 Parquet output, typed)
 # a few helper columns.
+# The loaded dataset is kept as an uncompressed Arrow snapshot, memory-mapped
+# once per process and shared by every session (st.cache_resource); pages
+# get zero-copy views of it. The Phase 2 aggregate cube (src/cube.py) and
+# the sidebar filters' bitmap index (utils/filter_index.py) and cache of
+# filtered frames (utils/filter_cache.py) are shared the same way. Outlier
+# bounds, filter options and slider quantiles come from the Phase 2
+# metadata sidecar (src/dataset_metadata.py) when it is current.
 # ------------------------------
 
+import hashlib
+import json
+import os
 from pathlib import Path
 import sys
+from typing import Dict, Optional, Tuple
 
 # Ensure project root (sgjob_v2) is on sys.path
 # This file lives at: sgjob_v2/streamlit_app/utils/data.py
@@ -13,47 +24,303 @@ ROOT = Path(__file__).resolve().parents[2]  # → sgjob_v2
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 import streamlit as st
-from src.config import PH2_CLEANED_CSV_PATH
+from src.config import (
+    DASHBOARD_SNAPSHOT_DIR,
+    PH2_CLEANED_CSV_PATH,
+    PH2_CLEANED_PQ_PATH,
+    PH2_CUBE_PQ_PATH,
+)
+from src.cube import CUBE_MEASURES, SPAN_COL, dashboard_rows, load_cube, rollup
+from src.data_cleaning import load_clean_data
+from src.dataset_metadata import load_metadata, sidecar_path
+from src.outputs import to_arrow_table
+from utils.filter_cache import FilteredFrameCache
+from utils.filter_index import FilterIndex
 
-@st.cache_data(show_spinner="Loading job postings data...")
-def get_job_data(remove_outliers: bool = True) -> pd.DataFrame:
+
+def _source_path(data_path: Path) -> Path:
+    """The dataset file to read: `data_path`, or the CSV export if that is all there is."""
+    if not data_path.exists() and PH2_CLEANED_CSV_PATH.exists():
+        st.warning(
+            f"`{data_path.name}` not found; reading the CSV export instead "
+            "(rerun Phase 2 for the faster, typed Parquet output)."
+        )
+        return PH2_CLEANED_CSV_PATH
+    return data_path
+
+
+def _file_version(path: Path) -> Optional[Tuple[int, int]]:
+    """Size and modification time of `path` (None if missing)."""
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _current_version(path: Path, data_path: Path) -> Optional[Tuple[int, int]]:
+    """Version of a file derived from the dataset; None if missing or older than the dataset file."""
+    version, data_version = _file_version(path), _file_version(data_path)
+    if version is None or (data_version is not None and data_version[1] > version[1]):
+        return None
+    return version
+
+
+def _current_metadata(data_path: Path) -> Optional[Dict]:
+    """The dataset's metadata sidecar, if it is current."""
+    path = sidecar_path(data_path)
+    return load_metadata(path) if _current_version(path, data_path) else None
+
+
+def _read_job_data(data_path: Path, remove_outliers: bool) -> Tuple[pd.DataFrame, int]:
     """
-    Load the pre-cleaned Singapore job dataset.
-    Optionally remove salary outliers (1st–99th percentile).
+    Load the pre-cleaned dataset, optionally without salary outliers
+    (1st–99th percentile) and rows failing a data-quality rule (see
+    src.cube.dashboard_rows, which the Phase 2 cube is built from too).
+    The outlier bounds are read from the metadata sidecar when current.
+    Returns the frame and the number of rows before outlier removal.
     """
-    data_path = PH2_CLEANED_CSV_PATH
+    df = load_clean_data(data_path)
+    original_len = len(df)
+    if remove_outliers:
+        meta = _current_metadata(data_path)
+        bounds = meta["outlier_bounds"].get("average_salary") if meta else None
+        if bounds is not None:
+            bounds = tuple(np.nan if bound is None else bound for bound in bounds)
+        df = dashboard_rows(df, bounds)
+    return df, original_len
+
+
+def _snapshot_prefix(source: Path, remove_outliers: bool) -> str:
+    """File name prefix shared by the snapshots of one dataset file."""
+    location = hashlib.sha1(str(source.resolve()).encode()).hexdigest()[:8]
+    return f"{source.stem}_{location}_{'filtered' if remove_outliers else 'all'}"
 
-    st.write(f"📂 Loading dataset from: `{data_path}`")
-    df = pd.read_csv(data_path)
-    
-    # --- Salary & minyrexp outlier removal (consistent with EDA) ----------------------
-    if remove_outliers and "average_salary" in df.columns:
-        lower_thr = df["average_salary"].quantile(0.01)
-        upper_thr = df["average_salary"].quantile(0.99)
-
-        # Ensure experience is numeric for clean filtering
-        if "minimumYearsExperience" in df.columns:
-            df["minimumYearsExperience"] = pd.to_numeric(
-                df["minimumYearsExperience"], errors="coerce"
-            )
-
-        original_len = len(df)
-        df = df[
-            (df["average_salary"] >= lower_thr)
-            & (df["average_salary"] <= upper_thr)
-            & (
-                ~df["minimumYearsExperience"].isna()
-                & df["minimumYearsExperience"].between(0, 30, inclusive="both")
-            )
-        ].copy()
 
+def _snapshot_path(source: Path, remove_outliers: bool) -> Path:
+    """Snapshot of one version (size, mtime) of the dataset file."""
+    version = hashlib.sha1(str(_file_version(source)).encode()).hexdigest()[:12]
+    return DASHBOARD_SNAPSHOT_DIR / f"{_snapshot_prefix(source, remove_outliers)}_{version}.arrow"
+
+
+def _snapshot_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Arrow table of `df` laid out so pandas can use its buffers in place:
+    text as large_string, and missing values of float and date columns
+    stored as NaN / NaT rather than as nulls.
+    """
+    table = to_arrow_table(df)
+    for i, field in enumerate(table.schema):
+        column = table.column(i)
+        if pa.types.is_string(field.type):
+            table = table.set_column(i, field.name, column.cast(pa.large_string()))
+        elif not column.null_count or not isinstance(df[field.name].dtype, np.dtype):
+            continue
+        elif pa.types.is_floating(field.type):
+            table = table.set_column(i, field.name, pc.fill_null(column, np.nan))
+        elif pa.types.is_timestamp(field.type):
+            nat = pc.fill_null(column.cast(pa.int64()), np.iinfo(np.int64).min)
+            table = table.set_column(i, field.name, nat.cast(field.type))
+    return table
+
+
+def _write_snapshot(table: pa.Table, path: Path) -> None:
+    """Write an uncompressed Arrow IPC file, replacing older snapshots of the same dataset."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+    prefix = path.stem.rsplit("_", 1)[0]  # _snapshot_prefix
+    for stale in path.parent.glob(f"{prefix}_*.arrow"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+def open_snapshot(path: Path) -> pa.Table:
+    """Arrow table whose buffers are a read-only memory map of the snapshot file."""
+    return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+def _list_dtype(arrow_type: pa.DataType) -> Optional[pd.ArrowDtype]:
+    """Keep list columns (categories_list) as Arrow arrays instead of objects."""
+    return pd.ArrowDtype(arrow_type) if pa.types.is_list(arrow_type) else None
+
+
+def snapshot_frame(table: pa.Table) -> pd.DataFrame:
+    """
+    Frame over the buffers of a mapped snapshot. to_pandas copies nullable
+    integer / float columns (Int64, Float64); those without missing values
+    are rebuilt over the mapped values with one shared, read-only mask.
+    """
+    df = table.to_pandas(split_blocks=True, types_mapper=_list_dtype)
+    no_missing = np.zeros(len(df), dtype=bool)
+    no_missing.flags.writeable = False
+    columns = {}
+    for col in df.columns:
+        values, chunks = df[col].array, table.column(col)
+        if (
+            isinstance(values, (pd.arrays.IntegerArray, pd.arrays.FloatingArray))
+            and chunks.null_count == 0
+            and chunks.num_chunks == 1
+        ):
+            mapped = chunks.chunk(0).to_numpy(zero_copy_only=True)
+            if mapped.dtype == values.dtype.numpy_dtype:
+                values = type(values)(mapped, no_missing)
+        columns[col] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_job_frame(remove_outliers: bool = True, data_path: Path = PH2_CLEANED_PQ_PATH) -> pd.DataFrame:
+    """
+    The dashboard's dataset as a frame backed by the memory-mapped snapshot
+    of `data_path` (written on first use of each version of the file).
+    Numeric, date, text and categorical columns are zero-copy, read-only
+    views of the mapped file.
+    """
+    source = _source_path(data_path)
+    st.write(f"📂 Loading dataset from: `{source}`")
+    snapshot = _snapshot_path(source, remove_outliers) if source.exists() else None
+    if snapshot is None or not snapshot.exists():
+        df, original_len = _read_job_data(source, remove_outliers)
+        table = _snapshot_table(df)
+        del df
+        meta = {"rows_before_outliers": original_len}
+        _write_snapshot(
+            table.replace_schema_metadata({**table.schema.metadata, b"dashboard": json.dumps(meta).encode()}),
+            snapshot,
+        )
+        del table
+
+    table = open_snapshot(snapshot)
+    original_len = json.loads(table.schema.metadata[b"dashboard"])["rows_before_outliers"]
+    df = snapshot_frame(table)
+
+    if remove_outliers and "average_salary" in df.columns:
         st.info(
             f"Filtered salary outliers (outside [1%, 99%]) and "
-            f"experience anomalies (<0 or >30 years). "
+            f"rows failing data-quality rules (e.g. experience <0 or >30 years). "
             f"Rows kept: {len(df):,} "
-            f"({100 * len(df) / original_len:.1f}% of original)."
+            f"({100 * len(df) / max(original_len, 1):.1f}% of original)."
         )
-        
     return df
+
+
+@st.cache_resource(show_spinner="Loading job postings data...", max_entries=4)
+def _shared_job_data(
+    remove_outliers: bool, data_path: Path, version: Optional[Tuple[int, int]]
+) -> pd.DataFrame:
+    """One frame per process and version of the dataset file, shared by all sessions."""
+    return load_job_frame(remove_outliers, data_path)
+
+
+def get_job_data(remove_outliers: bool = True, data_path: Path = PH2_CLEANED_PQ_PATH) -> pd.DataFrame:
+    """
+    Load the pre-cleaned Singapore job dataset.
+    Optionally remove salary outliers (1st–99th percentile).
+    The Parquet output keeps the Phase 2 dtypes (dates, nullable numbers,
+    categoricals for CATEGORICAL_COLS); the CSV export is read only when
+    there is no Parquet output.
+
+    The frame is shared by all sessions and reruns rather than copied (see
+    load_job_frame); it is reloaded when the dataset file changes. Each call
+    returns a shallow copy: with copy-on-write, a page that modifies it
+    copies only the columns it modifies.
+    """
+    version = _file_version(data_path) or _file_version(PH2_CLEANED_CSV_PATH)
+    return _shared_job_data(remove_outliers, data_path, version).copy(deep=False)
+
+
+@st.cache_resource(show_spinner="Indexing the filters...", max_entries=4)
+def _shared_filter_index(
+    remove_outliers: bool, data_path: Path, version: Optional[Tuple[int, int]]
+) -> FilterIndex:
+    """The FilterIndex of one version of the shared frame, built once per process."""
+    return FilterIndex(_shared_job_data(remove_outliers, data_path, version))
+
+
+def get_filter_index(remove_outliers: bool = True, data_path: Path = PH2_CLEANED_PQ_PATH) -> FilterIndex:
+    """
+    Bitmap index of get_job_data()'s rows for the sidebar filters (pass it
+    to apply_base_filters), shared by all sessions and rebuilt when the
+    dataset file changes.
+    """
+    version = _file_version(data_path) or _file_version(PH2_CLEANED_CSV_PATH)
+    return _shared_filter_index(remove_outliers, data_path, version)
+
+
+@st.cache_resource(max_entries=4)
+def _shared_filter_cache(
+    remove_outliers: bool, data_path: Path, version: Optional[Tuple[int, int]]
+) -> FilteredFrameCache:
+    """An empty cache per version of the shared frame (its frames are views of that version)."""
+    return FilteredFrameCache()
+
+
+def get_filter_cache(remove_outliers: bool = True, data_path: Path = PH2_CLEANED_PQ_PATH) -> FilteredFrameCache:
+    """
+    LRU cache of get_job_data()'s filtered frames by sidebar selection
+    (pass it to apply_base_filters), shared by all pages and sessions and
+    emptied when the dataset file changes.
+    """
+    version = _file_version(data_path) or _file_version(PH2_CLEANED_CSV_PATH)
+    return _shared_filter_cache(remove_outliers, data_path, version)
+
+
+# Cube dimensions the pages filter and group by (the sidebar selection and
+# the posting month)
+PAGE_CUBE_DIMENSIONS = [
+    "posting_month",
+    "primary_category",
+    "positionLevels",
+    "employmentTypes",
+    "experienceTypes",
+]
+
+
+@st.cache_resource(max_entries=2)
+def _shared_cube(path: Path, version: Optional[Tuple[int, int]]) -> Optional[pd.DataFrame]:
+    """
+    The cube rolled up to PAGE_CUBE_DIMENSIONS: far fewer cells to scan per
+    query. None if it lacks a measure (written by an older version).
+    """
+    cube = load_cube(path)
+    if not {SPAN_COL, *CUBE_MEASURES} <= set(cube.columns):
+        return None
+    return rollup(cube, [dim for dim in PAGE_CUBE_DIMENSIONS if dim in cube.columns])
+
+
+def get_cube(
+    cube_path: Path = PH2_CUBE_PQ_PATH, data_path: Path = PH2_CLEANED_PQ_PATH
+) -> Optional[pd.DataFrame]:
+    """
+    The aggregate cube of get_job_data()'s rows written by Phase 2 (see
+    src/cube.py), rolled up to PAGE_CUBE_DIMENSIONS and shared by all
+    sessions. None if there is no cube, if it is older than the dataset file
+    (a run that skipped it) or lacks a measure; pages then aggregate the rows.
+    """
+    version = _current_version(cube_path, data_path)
+    return None if version is None else _shared_cube(cube_path, version)
+
+
+@st.cache_resource(max_entries=2)
+def _shared_metadata(path: Path, version: Optional[Tuple[int, int]]) -> Dict:
+    return load_metadata(path)
+
+
+def get_filter_metadata(remove_outliers: bool = True, data_path: Path = PH2_CLEANED_PQ_PATH) -> Optional[Dict]:
+    """
+    Filter values with counts and quantiles of get_job_data()'s rows from
+    the Phase 2 metadata sidecar (see src/dataset_metadata.py; pass it to
+    apply_base_filters). None if there is no sidecar or it is older than
+    the dataset file; the sidebar then derives them from the rows.
+    """
+    path = sidecar_path(data_path)
+    version = _current_version(path, data_path)
+    if version is None:
+        return None
+    return _shared_metadata(path, version)["dashboard" if remove_outliers else "all"]
@@ -0,0 +1,89 @@
+# streamlit_app/utils/filter_cache.py
+# LRU cache of the sidebar filters' frames (utils/filters.py), one per
+# dataset version and shared by every page and session: moving between
+# pages with the same selection reuses the filtered frame instead of
+# filtering again.
+
+from collections import OrderedDict
+from pathlib import Path
+import sys
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+from src.config import DASHBOARD_FILTER_CACHE_BYTES, DASHBOARD_FILTER_CACHE_ENTRIES
+
+SalaryRange = Optional[Tuple[float, float]]
+
+
+def filter_key(selection: Dict[str, str], salary_range: SalaryRange) -> Tuple[Hashable, ...]:
+    """Normalized selection: the active {column: value} filters in column order, and the salary range."""
+    return tuple(sorted(selection.items())), salary_range
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """Memory held by `df`'s columns (text buffers not counted for object columns)."""
+    return int(df.memory_usage(index=True, deep=False).sum())
+
+
+class FilteredFrameCache:
+    """
+    Filtered frames by filter_key, least recently used evicted first once
+    there are more than `max_entries` or their size exceeds `max_bytes`.
+    Thread-safe: Streamlit runs each session in its own thread.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DASHBOARD_FILTER_CACHE_ENTRIES,
+        max_bytes: int = DASHBOARD_FILTER_CACHE_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._frames: "OrderedDict[Tuple[Hashable, ...], Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[pd.DataFrame]:
+        """The cached frame of `key` (now the most recently used), or None."""
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple[Hashable, ...], df: pd.DataFrame) -> None:
+        """Cache `df` under `key`, evicting the least recently used frames over the bounds."""
+        size = frame_bytes(df)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._frames:
+                self.bytes -= self._frames.pop(key)[1]
+            self._frames[key] = (df, size)
+            self.bytes += size
+            while len(self._frames) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted) = self._frames.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Hit / miss / eviction counters and the current number of frames and bytes."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._frames),
+                "bytes": self.bytes,
+            }
@@ -0,0 +1,80 @@
+# streamlit_app/utils/filter_index.py
+# Bitmap index behind the sidebar filters (utils/filters.py), built once per
+# dataset load: a packed bitmap of the rows holding each value of the
+# select-box columns, and the row order by salary for the range slider. A
+# selection is the AND of one bitmap per active filter followed by a single
+# take, so its cost barely grows with the number of active filters.
+
+from functools import reduce
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Select-box filters (value == selection); experienceTypes is compared as text
+FILTER_COLS: List[str] = ["primary_category", "experienceTypes", "positionLevels", "employmentTypes"]
+SALARY_COL = "average_salary"
+
+
+def _value_bitmaps(values: pd.Series) -> Dict[str, np.ndarray]:
+    """Packed bitmap of the rows of each distinct (non-missing) value, keyed by its text."""
+    codes, uniques = pd.factorize(values)
+    return {str(value): np.packbits(codes == code) for code, value in enumerate(uniques)}
+
+
+class FilterIndex:
+    """Row bitmaps per filter value and salary order of one dataset frame."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.n_rows = len(df)
+        self.bitmaps: Dict[str, Dict[str, np.ndarray]] = {
+            col: _value_bitmaps(df[col]) for col in FILTER_COLS if col in df.columns
+        }
+        self.salary_order: Optional[np.ndarray] = None
+        self.sorted_salary: Optional[np.ndarray] = None
+        if SALARY_COL in df.columns:
+            salary = pd.to_numeric(df[SALARY_COL], errors="coerce").to_numpy(
+                dtype="float64", na_value=np.nan
+            )
+            # Missing salaries sort last and never fall in a range
+            order = np.argsort(salary, kind="stable")
+            self.salary_order = order.astype(np.int32) if self.n_rows < 2**31 else order
+            self.sorted_salary = salary[order]
+
+    def options(self, col: str) -> List[str]:
+        """Distinct values of `col`, sorted (the select-box options)."""
+        return sorted(self.bitmaps.get(col, {}))
+
+    def _empty(self) -> np.ndarray:
+        return np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+
+    def salary_bitmap(self, low: float, high: float) -> np.ndarray:
+        """Packed bitmap of the rows with low <= average_salary <= high."""
+        start = np.searchsorted(self.sorted_salary, low, side="left")
+        stop = np.searchsorted(self.sorted_salary, high, side="right")
+        in_range = np.zeros(self.n_rows, dtype=bool)
+        in_range[self.salary_order[start:stop]] = True
+        return np.packbits(in_range)
+
+    def salary_keeps_all(self, low: float, high: float) -> bool:
+        """Whether every row has low <= average_salary <= high (True without salaries)."""
+        if self.sorted_salary is None or self.n_rows == 0:
+            return True
+        # Missing salaries sort last, so the last value is NaN if any is missing
+        return bool(self.sorted_salary[0] >= low and self.sorted_salary[-1] <= high)
+
+    def select(
+        self, selection: Dict[str, str], salary_range: Optional[Tuple[float, float]] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Positions, in row order, of the rows holding every {column: value} of
+        `selection` and a salary within `salary_range`; None if nothing is
+        selected (every row).
+        """
+        bitmaps = [self.bitmaps[col].get(value, self._empty()) for col, value in selection.items()]
+        if salary_range is not None and self.salary_order is not None:
+            bitmaps.append(self.salary_bitmap(*salary_range))
+        if not bitmaps:
+            return None
+        bits = reduce(np.bitwise_and, bitmaps)
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
@@ -2,11 +2,33 @@
 # Global sidebar filters: Sector, Experience, Position Level,
 # Salary range, Employment Type – with styled sidebar.
 
+from typing import Dict, List, Optional
+
 import streamlit as st
 import pandas as pd
 
+from utils.filter_cache import FilteredFrameCache, filter_key
+from utils.filter_index import FilterIndex
+from src.dataset_metadata import quantile
+
+
+def apply_base_filters(
+    df: pd.DataFrame,
+    index: Optional[FilterIndex] = None,
+    cache: Optional[FilteredFrameCache] = None,
+    meta: Optional[Dict] = None,
+) -> tuple[pd.DataFrame, int]:
+    """The filtered rows and Top N of the sidebar filters (see sidebar_filters)."""
+    filtered, top_n, _ = sidebar_filters(df, index, cache, meta)
+    return filtered, top_n
+
 
-def apply_base_filters(df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+def sidebar_filters(
+    df: pd.DataFrame,
+    index: Optional[FilterIndex] = None,
+    cache: Optional[FilteredFrameCache] = None,
+    meta: Optional[Dict] = None,
+) -> tuple[pd.DataFrame, int, Optional[Dict[str, str]]]:
     """
     Sidebar filters shared across pages, using the new styled layout:
     - Top N selector for charts/lists
@@ -15,10 +37,22 @@ def apply_base_filters(df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
     - Position (positionLevels)
     - Salary range (average_salary, 1st–99th percentile, padded to ≥ 15k)
     - Employment Type (employmentTypes)
-    """
 
-    df_raw = df.copy()
-    filtered = df.copy()
+    Rows are selected through `index`, the FilterIndex of `df` (built here
+    if None; pass get_filter_index() to reuse the one shared across reruns).
+    With a `cache` of `df`'s filtered frames (get_filter_cache()), a
+    selection already filtered on any page or session is not filtered again.
+    The select-box options and the slider's 99th percentile are read from
+    `meta`, the metadata sidecar's summary of `df` (get_filter_metadata()),
+    if given, instead of being derived from the rows.
+
+    Also returns the selection as a filter on the Phase 2 cube's dimensions
+    ({column: value}, see src/cube.py), or None when the salary range drops
+    some rows (salary bins do not line up with the slider).
+    """
+    if index is None:
+        index = FilterIndex(df)
+    df_raw = df
 
     # Default Top N (used if widget not rendered for some reason)
     top_n = 20
@@ -39,93 +73,87 @@ def apply_base_filters(df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
         )
 
         # -------- Sector (primary_category) --------
-        if "primary_category" in df_raw.columns:
-            cat_series = df_raw["primary_category"].dropna()
-            if not cat_series.empty:
-                sector_options = ["All"] + sorted(cat_series.unique().tolist())
-                sel_sector = st.selectbox("Sector", sector_options, index=0)
-            else:
-                sel_sector = "All"
-        else:
-            sel_sector = "All"
+        sel_sector = _select_box("Sector", _options("primary_category", index, meta))
 
         # -------- Experience band (experienceTypes) --------
-        if "experienceTypes" in df_raw.columns:
-            exp_series = df_raw["experienceTypes"].dropna()
-            if not exp_series.empty:
-                exp_options = ["All"] + sorted(exp_series.astype(str).unique().tolist())
-                sel_exp = st.selectbox("Experience Band", exp_options, index=0)
-            else:
-                sel_exp = "All"
-        else:
-            sel_exp = "All"
+        sel_exp = _select_box("Experience Band", _options("experienceTypes", index, meta))
 
         # -------- Position level (positionLevels) --------
-        pos_col = "positionLevels" if "positionLevels" in df_raw.columns else None
-        if pos_col:
-            pos_series = df_raw[pos_col].dropna()
-            if not pos_series.empty:
-                pos_options = ["All"] + sorted(pos_series.unique().tolist())
-                sel_pos = st.selectbox("Position Level", pos_options, index=0)
-            else:
-                sel_pos = "All"
-        else:
-            sel_pos = "All"
+        sel_pos = _select_box("Position Level", _options("positionLevels", index, meta))
 
         # -------- Salary range (average_salary) --------
         sel_salary = None
-        if "average_salary" in df_raw.columns:
-            sal_series = pd.to_numeric(df_raw["average_salary"], errors="coerce").dropna()
-            if not sal_series.empty:
-                salary_min = int(sal_series.quantile(0.01))
-                salary_max = int(sal_series.quantile(0.99))
-                max_slider = max(15000, salary_max)
-
-                st.markdown("Monthly Salary Range (SGD)")
-                sel_salary = st.slider(
-                    "",
-                    min_value=0,
-                    max_value=max_slider,
-                    value=(0, max_slider),
-                    step=250,
-                )
+        max_slider = None
+        salary_max = _salary_max(df_raw, meta)
+        if salary_max is not None:
+            max_slider = max(15000, salary_max)
+
+            st.markdown("Monthly Salary Range (SGD)")
+            sel_salary = st.slider(
+                "",
+                min_value=0,
+                max_value=max_slider,
+                value=(0, max_slider),
+                step=250,
+            )
 
         # -------- Employment type (employmentTypes) --------
-        emp_col = "employmentTypes" if "employmentTypes" in df_raw.columns else None
-        if emp_col:
-            emp_series = df_raw[emp_col].dropna()
-            if not emp_series.empty:
-                emp_options = ["All"] + sorted(emp_series.unique().tolist())
-                sel_emp = st.selectbox("Employment Type", emp_options, index=0)
-            else:
-                sel_emp = "All"
-        else:
-            sel_emp = "All"
+        sel_emp = _select_box("Employment Type", _options("employmentTypes", index, meta))
 
     # ------------- Apply filters -------------
-    # Sector
-    if sel_sector != "All" and "primary_category" in filtered.columns:
-        filtered = filtered[filtered["primary_category"] == sel_sector]
-
-    # Experience band
-    if sel_exp != "All" and "experienceTypes" in filtered.columns:
-        filtered = filtered[filtered["experienceTypes"].astype(str) == sel_exp]
-
-    # Position level
-    if sel_pos != "All" and pos_col and pos_col in filtered.columns:
-        filtered = filtered[filtered[pos_col] == sel_pos]
-
-    # Salary range
-    if sel_salary is not None and "average_salary" in filtered.columns:
-        min_sal, max_sal = sel_salary
-        sal_series_f = pd.to_numeric(filtered["average_salary"], errors="coerce")
-        filtered = filtered[
-            (sal_series_f >= min_sal) & (sal_series_f <= max_sal)
-        ]
-
-    # Employment type
-    if sel_emp != "All" and emp_col and emp_col in filtered.columns:
-        filtered = filtered[filtered[emp_col] == sel_emp]
+    selection = {
+        "primary_category": sel_sector,
+        "experienceTypes": sel_exp,
+        "positionLevels": sel_pos,
+        "employmentTypes": sel_emp,
+    }
+    selection = {col: value for col, value in selection.items() if value != "All"}
+
+    # Salary range: min <= average_salary <= max, which drops missing salaries;
+    # skipped when every row's salary is already within it
+    salary_range = None
+    if sel_salary is not None and not index.salary_keeps_all(*sel_salary):
+        salary_range = tuple(sel_salary)
+
+    # One bitmap intersection and a single take, however many filters are set
+    filtered = df
+    if selection or salary_range is not None:
+        key = filter_key(selection, salary_range)
+        cached = cache.get(key) if cache is not None else None
+        if cached is None:
+            rows = index.select(selection, salary_range)
+            cached = df if rows is None else df.take(rows)
+            if cache is not None:
+                cache.put(key, cached)
+        # Shallow copy: a page adding columns must not change the cached frame
+        filtered = cached.copy(deep=False)
 
     st.sidebar.caption(f"{len(filtered):,} records after filtering")
-    return filtered, int(top_n)
+
+    cube_filter = None if salary_range is not None else selection
+    return filtered, int(top_n), cube_filter
+
+
+def _options(col: str, index: FilterIndex, meta: Optional[Dict]) -> List[str]:
+    """Sorted distinct values of `col`: from the metadata sidecar, else from the index."""
+    if meta is not None:
+        return list(meta["values"].get(col, {}))
+    return index.options(col)
+
+
+def _salary_max(df: pd.DataFrame, meta: Optional[Dict]) -> Optional[int]:
+    """99th percentile of average_salary (None without salaries): from the metadata sidecar, else from `df`."""
+    if meta is not None:
+        salary_max = quantile(meta, "average_salary", 0.99)
+        return None if salary_max is None else int(salary_max)
+    if "average_salary" not in df.columns:
+        return None
+    sal_series = pd.to_numeric(df["average_salary"], errors="coerce").dropna()
+    return None if sal_series.empty else int(sal_series.quantile(0.99))
+
+
+def _select_box(label: str, options: List[str]) -> str:
+    """A select box of "All" and `options`; "All" without a widget if there are none."""
+    if not options:
+        return "All"
+    return st.selectbox(label, ["All"] + options, index=0)